@@ -0,0 +1,128 @@
+"""
+CONTROL CHANNEL
+Non-GUI input for headless mode, where there is no OpenCV window to read keys from.
+
+Commands can come from:
+- stdin: type a command and press Enter
+- a local UDP socket: e.g.  echo -n g | nc -u -w0 127.0.0.1 47800
+- global hotkeys (optional, needs pynput): work while the game window is focused
+
+Commands:
+    g / toggle   - toggle control ON/OFF
+    + / up       - increase sensitivity
+    - / down     - decrease sensitivity
+    q / quit     - quit
+"""
+
+import socket
+import sys
+import threading
+
+DEFAULT_PORT = 47800
+
+# Text command -> command name passed to the handler
+COMMANDS = {
+    'g': 'toggle', 'toggle': 'toggle',
+    '+': 'sens_up', '=': 'sens_up', 'up': 'sens_up',
+    '-': 'sens_down', '_': 'sens_down', 'down': 'sens_down',
+    'q': 'quit', 'quit': 'quit', 'exit': 'quit', 'esc': 'quit',
+}
+
+# Global hotkeys (pynput format) -> command name
+HOTKEYS = {
+    '<ctrl>+<alt>+g': 'toggle',
+    '<ctrl>+<alt>+=': 'sens_up',
+    '<ctrl>+<alt>+-': 'sens_down',
+    '<ctrl>+<alt>+q': 'quit',
+}
+
+
+def parse_command(text):
+    """Map a line of text to a command name (None if unknown)"""
+    return COMMANDS.get(text.strip().lower())
+
+
+class ControlChannel:
+    """Reads control commands from stdin, a local UDP socket and/or global hotkeys"""
+    def __init__(self, handler, use_stdin=True, port=DEFAULT_PORT, hotkeys=False):
+        self.handler = handler  # Called with a command name: 'toggle', 'sens_up', 'sens_down', 'quit'
+        self.use_stdin = use_stdin
+        self.port = port
+        self.hotkeys = hotkeys
+        self.running = False
+        self.sock = None
+        self.hotkey_listener = None
+        self.threads = []
+
+    def start(self):
+        self.running = True
+        if self.use_stdin and sys.stdin and sys.stdin.isatty():
+            self._start_thread(self._stdin_loop, "control-stdin")
+            print("⌨️  Headless controls on stdin: g = toggle, +/- = sensitivity, q = quit")
+
+        if self.port:
+            try:
+                self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                self.sock.bind(('127.0.0.1', self.port))
+                self.sock.settimeout(0.5)
+                self._start_thread(self._socket_loop, "control-socket")
+                print(f"📡 Control socket listening on udp://127.0.0.1:{self.port}")
+            except OSError as e:
+                print(f"Could not open control socket on port {self.port}: {e}")
+                self.sock = None
+
+        if self.hotkeys:
+            try:
+                from pynput import keyboard
+                bindings = {combo: (lambda command=command: self._dispatch(command))
+                            for combo, command in HOTKEYS.items()}
+                self.hotkey_listener = keyboard.GlobalHotKeys(bindings)
+                self.hotkey_listener.start()
+                print(f"🔥 Global hotkeys: {', '.join(f'{k} = {v}' for k, v in HOTKEYS.items())}")
+            except Exception as e:
+                print(f"Global hotkeys unavailable (pip install pynput): {e}")
+                self.hotkey_listener = None
+
+    def _start_thread(self, target, name):
+        thread = threading.Thread(target=target, daemon=True, name=name)
+        thread.start()
+        self.threads.append(thread)
+
+    def _dispatch(self, command):
+        try:
+            self.handler(command)
+        except Exception as e:
+            print(f"Error handling command '{command}': {e}")
+
+    def _stdin_loop(self):
+        while self.running:
+            line = sys.stdin.readline()
+            if not line:
+                break  # stdin closed
+            command = parse_command(line)
+            if command:
+                self._dispatch(command)
+            elif line.strip():
+                print(f"Unknown command: {line.strip()} (g, +, -, q)")
+
+    def _socket_loop(self):
+        while self.running:
+            try:
+                data, _ = self.sock.recvfrom(256)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            command = parse_command(data.decode(errors='ignore'))
+            if command:
+                self._dispatch(command)
+
+    def stop(self):
+        self.running = False
+        if self.sock:
+            self.sock.close()
+            self.sock = None
+        if self.hotkey_listener:
+            self.hotkey_listener.stop()
+            self.hotkey_listener = None
+        # The stdin thread is a daemon blocked on readline; it exits with the process
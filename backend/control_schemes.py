@@ -0,0 +1,59 @@
+"""
+CONTROL SCHEMES
+Which body signals drive movement, and therefore which MediaPipe graphs have
+to run at all.
+
+    head-tilt   A/D from head tilt, W/S from head pitch, mouth-open scope   (hands + face)
+    body-lean   A/D from body lean, W/S from head pitch, mouth-open scope   (hands + face + pose)
+    hands-only  gun hand + left hand gestures, no movement keys or scope    (hands)
+
+The control system builds and schedules only the graphs in scheme.sources, so
+the default scheme no longer pays for a Pose graph whose landmarks were only
+ever drawn.
+"""
+
+SOURCES = ('hands', 'face', 'pose')
+
+
+class ControlScheme:
+    """A named set of landmark sources and how movement is derived from them"""
+    def __init__(self, name, description, sources, lateral=None, pitch=False):
+        unknown = set(sources) - set(SOURCES)
+        if unknown:
+            raise ValueError(f"Unknown landmark sources {sorted(unknown)} (expected {SOURCES})")
+        self.name = name
+        self.description = description
+        self.sources = tuple(source for source in SOURCES if source in sources)
+        self.lateral = lateral  # A/D input: 'head' (head tilt), 'body' (body lean) or None
+        self.pitch = pitch  # W/S from head pitch
+
+    def uses(self, source):
+        return source in self.sources
+
+    @property
+    def movement(self):
+        return self.lateral is not None or self.pitch
+
+    def __repr__(self):
+        return f"ControlScheme({self.name!r}, sources={self.sources})"
+
+
+CONTROL_SCHEMES = {
+    'head-tilt': ControlScheme('head-tilt', "Head tilt for A/D + head pose for W/S",
+                               ('hands', 'face'), lateral='head', pitch=True),
+    'body-lean': ControlScheme('body-lean', "Body lean for A/D + head pose for W/S",
+                               ('hands', 'face', 'pose'), lateral='body', pitch=True),
+    'hands-only': ControlScheme('hands-only', "Hands only (no movement keys, no scope)",
+                                ('hands',)),
+}
+DEFAULT_SCHEME = 'head-tilt'
+
+
+def get_scheme(scheme=None):
+    """Scheme by name (or pass a ControlScheme through); None = default scheme"""
+    if isinstance(scheme, ControlScheme):
+        return scheme
+    name = scheme or DEFAULT_SCHEME
+    if name not in CONTROL_SCHEMES:
+        raise ValueError(f"Unknown control scheme '{name}' (expected one of {list(CONTROL_SCHEMES)})")
+    return CONTROL_SCHEMES[name]
@@ -0,0 +1,869 @@
+"""
+CONTROLLERS
+Turn gestures into game input: sticky gun lock, thumb shooting, Krunker-style
+mouse, left hand gestures, WASD from head pose and mouth-open scope.
+
+ControlCore bundles all controllers and runs one frame of decisions and output.
+It doesn't depend on MediaPipe or OpenCV, so the same logic runs in the live
+pipeline and when replaying recorded landmark traces. The control scheme
+(control_schemes.py) decides where A/D and W/S come from.
+"""
+
+import time
+import threading
+
+from gestures import calculate_head_pose, calculate_lean_pose, detect_mouth_open, HandFeatures
+from gesture_table import default_gesture_table
+from input_sink import default_sink
+from control_schemes import get_scheme
+from cursor_predictor import build_predictor
+from cursor_clock import DeadlineClock
+
+class StickyGunDetector:
+    """Gun gesture detector with sticky behavior (from dual_hand_tracking.py)"""
+    def __init__(self, grace_period=30):
+        self.is_locked = False
+        self.lock_frames = 0
+        self.grace_period = grace_period
+        self.frames_without_hand = 0
+        
+    def update(self, hand):
+        """hand: the right hand's HandFeatures (None when not visible)"""
+        if hand is None:
+            if self.is_locked:
+                self.frames_without_hand += 1
+                if self.frames_without_hand > self.grace_period:
+                    self.is_locked = False
+                    self.lock_frames = 0
+                    self.frames_without_hand = 0
+                    print("🔫 Gun UNLOCKED! (no hand)")
+                    return False
+                else:
+                    return True
+            else:
+                self.frames_without_hand = 0
+                return False
+        
+        self.frames_without_hand = 0
+        gun_detected = hand.is_gun
+        bottom_fingers_curled = hand.bottom_curled
+        
+        if not self.is_locked:
+            if gun_detected:
+                self.is_locked = True
+                self.lock_frames = 0
+                print("🔫 Gun LOCKED!")
+                return True
+            else:
+                return False
+        else:
+            self.lock_frames += 1
+            if not bottom_fingers_curled:
+                self.is_locked = False
+                self.lock_frames = 0
+                print("🔫 Gun UNLOCKED!")
+                return False
+            else:
+                return True
+
+class ThumbShootingController:
+    """Mouse click controller based on thumb position (from dual_hand_tracking.py)"""
+    def __init__(self, output=None):
+        self.output = output or default_sink()
+        self.is_pressed = False
+        self.last_thumb_down = False
+        
+    def update(self, hand, gun_active):
+        if not gun_active or hand is None:
+            self.force_release()
+            return False, "Gun not active"
+        
+        thumb_down = hand.thumb_down
+        
+        # Detect thumb press (transition from up to down)
+        if thumb_down and not self.last_thumb_down:
+            if not self.is_pressed:
+                self.output.mouseDown()
+                self.is_pressed = True
+                return True, "FIRING!"
+        
+        # Detect thumb release (transition from down to up)
+        elif not thumb_down and self.last_thumb_down:
+            if self.is_pressed:
+                self.output.mouseUp()
+                self.is_pressed = False
+                return False, "Ready"
+        
+        self.last_thumb_down = thumb_down
+        
+        if self.is_pressed:
+            return True, "FIRING!"
+        else:
+            return False, "Ready"
+    
+    def force_release(self):
+        if self.is_pressed:
+            self.output.mouseUp()
+            self.is_pressed = False
+
+class KrunkerStyleMouseController:
+    """Mouse controller with high-frequency cursor thread for smooth finger gun tracking"""
+    def __init__(self, output=None, predictor=None, cursor_rate=120):
+        self.output = output or default_sink()
+        self.sensitivity = 2.5
+        self.last_x = None
+        self.last_y = None
+        self.debug_counter = 0
+        
+        # Target position (updated by hand tracking at 30 FPS)
+        self.target_delta_x = 0
+        self.target_delta_y = 0
+        
+        # Current interpolated position (updated by cursor thread at 120+ FPS)
+        self.current_delta_x = 0
+        self.current_delta_y = 0
+        
+        # Velocity for smooth interpolation
+        self.velocity_x = 0
+        self.velocity_y = 0
+        
+        # Dead zone for filtering hand tremors
+        self.dead_zone = 0.8  # Increased to prevent spasms from small hand movements
+        
+        # Thread control
+        self.cursor_thread = None
+        self.thread_running = False
+        self.thread_lock = threading.Lock()
+        
+        # Interpolation settings
+        self.cursor_update_rate = cursor_rate  # Hz - cursor updates per second (up to 1000)
+        self.interpolation_speed = 0.15  # How fast to interpolate (0-1, lower = smoother, less overshoot)
+        self.interpolation_rate = 120  # Hz the interpolation speed is tuned for (other rates drain at the same pace)
+        self.residual_x = 0.0  # Sub-pixel movement not emitted yet
+        self.residual_y = 0.0
+        
+        # Absolute-deadline pacing with live tick statistics (cursor_clock.py); raises ValueError on a bad rate
+        self.cursor_clock = DeadlineClock(cursor_rate)
+        
+        # Track discontinuations to prevent snapping after repositioning
+        self.last_update_time = None
+        self.discontinuation_threshold = 0.1  # 100ms - if no update for this long, treat as discontinuation
+        
+        # Optional fingertip estimator (cursor_predictor.KalmanPredictor): the cursor thread then
+        # follows the predicted fingertip between frames instead of draining per-frame deltas
+        self.predictor = predictor
+        self.emitted = None  # Fingertip position (px) the cursor has been moved to so far
+        self.observation_time = None  # Capture time of the latest observation
+        self.observation_arrival = None  # When it reached the controller (monotonic)
+        self.use_thread = True  # False: the caller drives _tick() itself (benchmarks)
+        
+    def _cursor_update_thread(self):
+        """High-frequency cursor update thread (runs at 120+ FPS)"""
+        # Ticks on absolute deadlines: a late tick doesn't push the later ones back
+        self.cursor_clock.start()
+        
+        while self.thread_running:
+            now = self.cursor_clock.wait()
+            
+            with self.thread_lock:
+                self._tick(now)
+    
+    def _tick(self, now):
+        """One cursor update (caller holds thread_lock)"""
+        if self.predictor is not None:
+            self._tick_predicted(now)
+            return
+        
+        # Check if there's any target movement to apply
+        if abs(self.target_delta_x) > 0.1 or abs(self.target_delta_y) > 0.1:
+            # Too small to matter even at the tuned rate: clear it to prevent buildup
+            if (abs(self.target_delta_x * self.interpolation_speed) < 1.0 and
+                    abs(self.target_delta_y * self.interpolation_speed) < 1.0):
+                self.target_delta_x = 0
+                self.target_delta_y = 0
+                self.residual_x = 0.0
+                self.residual_y = 0.0
+                return
+            
+            # Take a fraction of the target movement each tick for smoothness, scaled so the
+            # target drains at the same pace per second whatever the tick rate
+            fraction = 1.0 - (1.0 - self.interpolation_speed) ** (self.interpolation_rate / self.cursor_update_rate)
+            move_x = self.target_delta_x * fraction
+            move_y = self.target_delta_y * fraction
+            
+            # Subtract what we applied from the target (drain the queue)
+            self.target_delta_x -= move_x
+            self.target_delta_y -= move_y
+            
+            # Emit whole pixels; keep the sub-pixel remainder for the next tick
+            self.residual_x += move_x
+            self.residual_y += move_y
+            step_x = int(self.residual_x)
+            step_y = int(self.residual_y)
+            if step_x or step_y:
+                self.output.move_relative(step_x, step_y)
+                self.residual_x -= step_x
+                self.residual_y -= step_y
+    
+    def _tick_predicted(self, now):
+        """Move the cursor toward where the fingertip is estimated to be right now"""
+        if self.observation_arrival is None or not self.predictor.initialized:
+            return
+        # Extrapolate from the last capture by the time since it arrived
+        target = self.predictor.predict(self.observation_time + (now - self.observation_arrival))
+        if self.emitted is None:
+            self.emitted = target.copy()  # New baseline: no jump after (re)acquiring the hand
+            return
+        move_x = int((target[0] - self.emitted[0]) * self.sensitivity)
+        move_y = int((target[1] - self.emitted[1]) * self.sensitivity)
+        if move_x or move_y:
+            self.output.move_relative(move_x, move_y)
+            # Keep the sub-pixel remainder for the next tick
+            self.emitted[0] += move_x / self.sensitivity
+            self.emitted[1] += move_y / self.sensitivity
+    
+    def start_cursor_thread(self):
+        """Start the high-frequency cursor update thread"""
+        if not self.thread_running:
+            self.thread_running = True
+            self.cursor_thread = threading.Thread(target=self._cursor_update_thread, daemon=True)
+            self.cursor_thread.start()
+            print(f"🎯 Started cursor thread at {self.cursor_update_rate} Hz")
+    
+    def stop_cursor_thread(self):
+        """Stop the cursor update thread and clear all pending movements"""
+        # Immediately clear all pending movements
+        with self.thread_lock:
+            self.target_delta_x = 0
+            self.target_delta_y = 0
+            self.current_delta_x = 0
+            self.current_delta_y = 0
+            self.residual_x = 0.0
+            self.residual_y = 0.0
+            self._reset_prediction()
+        
+        if self.thread_running:
+            self.thread_running = False
+            if self.cursor_thread:
+                self.cursor_thread.join(timeout=0.5)
+            print(f"🎯 Stopped cursor thread ({self.cursor_clock.stats.describe()})")
+    
+    def _reset_prediction(self):
+        if self.predictor is not None:
+            self.predictor.reset()
+        self.emitted = None
+        self.observation_time = None
+        self.observation_arrival = None
+    
+    def update(self, hand, gun_active, timestamp=None, now=None):
+        """
+        Update target position from hand tracking (30 FPS) - cursor thread handles smooth movement (120 FPS).
+        hand: HandFeatures (only the index fingertip is read).
+        timestamp: capture time of the frame (monotonic); now: arrival time (defaults to time.monotonic(),
+        or to the capture time when the caller drives _tick() on its own clock).
+        """
+        if now is None:
+            now = timestamp if not self.use_thread and timestamp is not None else time.monotonic()
+        current_time = now
+        if timestamp is None:
+            timestamp = current_time
+        
+        if not gun_active or hand is None:
+            # Stop cursor thread when gun inactive and reset position for repositioning
+            self.stop_cursor_thread()
+            # Reset last_x and last_y to allow repositioning when gun is not locked
+            self.last_x = None
+            self.last_y = None
+            self.last_update_time = None  # Mark discontinuation
+            with self.thread_lock:
+                self.target_delta_x = 0
+                self.target_delta_y = 0
+                self.current_delta_x = 0
+                self.current_delta_y = 0
+            return
+        
+        # Start cursor thread if not running
+        if not self.thread_running and self.use_thread:
+            self.start_cursor_thread()
+            
+        try:
+            index_x, index_y = hand.index_tip
+            
+            # Convert to pixels for tracking
+            current_x = index_x * 1920
+            current_y = index_y * 1080
+            
+            # Check for discontinuation (gap in tracking)
+            is_discontinuation = (self.last_update_time is None or 
+                                 (current_time - self.last_update_time) > self.discontinuation_threshold)
+            
+            if self.predictor is not None:
+                # Feed the estimator; the cursor thread follows its prediction
+                with self.thread_lock:
+                    if is_discontinuation:
+                        self._reset_prediction()
+                    self.predictor.update(current_x, current_y, timestamp)
+                    self.observation_time = timestamp
+                    self.observation_arrival = current_time
+            elif self.last_x is not None and self.last_y is not None and not is_discontinuation:
+                # Calculate raw delta movement
+                raw_delta_x = (current_x - self.last_x) * self.sensitivity
+                raw_delta_y = (current_y - self.last_y) * self.sensitivity
+                
+                # Apply dead zone filter
+                movement_magnitude = (raw_delta_x**2 + raw_delta_y**2)**0.5
+                if movement_magnitude < self.dead_zone:
+                    raw_delta_x = 0
+                    raw_delta_y = 0
+                
+                # Update target for cursor thread to interpolate toward
+                with self.thread_lock:
+                    self.target_delta_x += raw_delta_x
+                    self.target_delta_y += raw_delta_y
+                
+                # Debug output
+                self.debug_counter += 1
+                if self.debug_counter % 30 == 0:
+                    print(f"📍 Cursor Thread: raw=({int(raw_delta_x)},{int(raw_delta_y)}) "
+                          f"target=({int(self.target_delta_x)},{int(self.target_delta_y)}) "
+                          f"current=({int(self.current_delta_x)},{int(self.current_delta_y)})")
+            if is_discontinuation:
+                # After discontinuation, just set baseline without applying delta
+                print("🔄 Discontinuation detected - resetting baseline for reswipe")
+            
+            # Update tracking state
+            self.last_x = current_x
+            self.last_y = current_y
+            self.last_update_time = current_time
+            
+        except Exception as e:
+            print(f"Mouse control error: {e}")
+
+class SmoothMouseController:
+    """Mouse controller using Krunker-style approach with smooth movement"""
+    def __init__(self, sensitivity=1.5, output=None, predictor=None, cursor_rate=120):
+        self.krunker_controller = KrunkerStyleMouseController(output, predictor=predictor, cursor_rate=cursor_rate)
+        self.krunker_controller.sensitivity = sensitivity
+        print(f"🎮 Using smooth Krunker-style mouse controller with sensitivity: {sensitivity}"
+              + (f" ({predictor.model} fingertip prediction)" if predictor is not None else ""))
+        
+    def update(self, hand, gun_active, timestamp=None):
+        """Use Krunker-style mouse controller for better browser compatibility"""
+        self.krunker_controller.update(hand, gun_active, timestamp)
+
+class LeftHandGestureController:
+    """Left hand gesture controller for crouch/jump"""
+    def __init__(self, output=None, gestures=None):
+        self.output = output or default_sink()
+        self.gestures = gestures or default_gesture_table()  # GestureTable from gesture_config.json
+        self.last_gesture = None
+        self.last_gesture_time = float('-inf')
+        self.gesture_debounce = 0.1
+        
+    def update(self, hand, control_enabled, now=None):
+        """hand: the left hand's HandFeatures; now: frame time for the debounce (defaults to time.monotonic())"""
+        try:
+            if not control_enabled or hand is None:
+                return None, "Control Disabled"
+            
+            current_time = now if now is not None else time.monotonic()
+            gesture_name, action_key = self.gestures.lookup(hand.finger_mask)
+            
+            # Handle gestures (crouch/jump) - single press
+            if action_key and gesture_name != self.last_gesture:
+                if current_time - self.last_gesture_time > self.gesture_debounce:
+                    self.output.press(action_key)
+                    self.last_gesture = gesture_name
+                    self.last_gesture_time = current_time
+                    return action_key, f"Pressed '{action_key}' - {gesture_name}"
+                else:
+                    return None, f"Gesture detected (debounced): {gesture_name}"
+            elif gesture_name == self.last_gesture:
+                return None, f"Holding: {gesture_name}"
+            else:
+                return None, "Left hand ready"
+                
+        except Exception as e:
+            print(f"Error in LeftHandGestureController: {e}")
+            return None, "Error"
+
+class WASDController:
+    """Hybrid controller: Head tilt for A/D, head pose for W/S"""
+    def __init__(self, lean_threshold=3, pitch_threshold=5, pitch_threshold_back=12, hysteresis=0.7, output=None):
+        self.output = output or default_sink()
+        self.lean_threshold = lean_threshold  # For A/D (left/right lean)
+        self.pitch_threshold = pitch_threshold  # For W (head forward)
+        self.pitch_threshold_back = pitch_threshold_back  # For S (head backward)
+        self.hysteresis = hysteresis  # Multiplier for release threshold
+        self.current_keys = set()  # Currently pressed keys
+        
+        # Gradual movement for A/D (left/right lean)
+        self.lean_press_timer = 0
+        self.small_lean_hold_duration = 1.0  # Hold key for 1 second for small leans
+        self.small_lean_wait_duration = 0.075  # Wait 75ms between presses
+        self.strong_lean_threshold = 8  # Threshold for holding down key (lowered for better response)
+        self.last_lean_press_time = {'a': float('-inf'), 'd': float('-inf')}
+        self.lean_key_state = {'a': False, 'd': False}  # Track if key is currently held
+        self.lean_key_press_start = {'a': 0, 'd': 0}  # Track when key was pressed
+        self.debug_counter = 0
+        
+    def update(self, head_yaw, head_pitch, control_enabled, now=None):
+        """
+        Update WASD keys based on head tilt (A/D) and head pose (W/S)
+        now: frame time for the small-lean hold/wait timers (defaults to time.monotonic())
+        Returns: (active_keys, key_states)
+        """
+        if not control_enabled:
+            # Release all keys if control disabled
+            self.release_all_keys()
+            # Also release small lean keys
+            if self.lean_key_state['a']:
+                self.output.keyUp('a')
+                self.lean_key_state['a'] = False
+            if self.lean_key_state['d']:
+                self.output.keyUp('d')
+                self.lean_key_state['d'] = False
+            return set(), {'w': False, 'a': False, 's': False, 'd': False}
+        
+        desired_keys = set()
+        current_time = now if now is not None else time.monotonic()
+        
+        # Calculate release thresholds (closer to center)
+        lean_release = self.lean_threshold * self.hysteresis
+        pitch_release = self.pitch_threshold * self.hysteresis
+        pitch_release_back = self.pitch_threshold_back * self.hysteresis
+        
+        # Release small lean keys if user returns to center
+        if head_yaw >= -self.lean_threshold and head_yaw <= self.lean_threshold:
+            if self.lean_key_state['a']:
+                self.output.keyUp('a')
+                self.lean_key_state['a'] = False
+                print(f"🔄 Returned to center - Released 'A'")
+            if self.lean_key_state['d']:
+                self.output.keyUp('d')
+                self.lean_key_state['d'] = False
+                print(f"🔄 Returned to center - Released 'D'")
+        
+        # Determine which keys should be pressed (with hysteresis)
+        # Left/Right tilt (A/D) - using head tilt with gradual movement
+        if 'a' in self.current_keys:
+            # Already pressing A
+            if head_yaw > -lean_release:
+                pass  # Release A
+            else:
+                desired_keys.add('a')  # Keep pressing A
+        elif head_yaw < -self.lean_threshold:
+            # Check if we should press A
+            if head_yaw < -self.strong_lean_threshold:
+                # Strong lean - hold down continuously
+                desired_keys.add('a')
+            else:
+                # Small lean - hold for 1 second, wait 75ms, repeat
+                if not self.lean_key_state['a']:
+                    # Key is not currently held - check if we can start a new press
+                    time_since_last_release = current_time - self.last_lean_press_time['a']
+                    if time_since_last_release >= self.small_lean_wait_duration:
+                        # Start holding the key
+                        self.output.keyDown('a')
+                        self.lean_key_state['a'] = True
+                        self.lean_key_press_start['a'] = current_time
+                        print(f"🔄 Small lean LEFT: {head_yaw:.1f}° - Holding 'A' for 1s")
+                else:
+                    # Key is currently held - check if we should release it
+                    hold_duration = current_time - self.lean_key_press_start['a']
+                    if hold_duration >= self.small_lean_hold_duration:
+                        # Release the key after 1 second
+                        self.output.keyUp('a')
+                        self.lean_key_state['a'] = False
+                        self.last_lean_press_time['a'] = current_time
+                        print(f"🔄 Small lean LEFT: {head_yaw:.1f}° - Released 'A', waiting 75ms")
+            
+        if 'd' in self.current_keys:
+            # Already pressing D
+            if head_yaw < lean_release:
+                pass  # Release D
+            else:
+                desired_keys.add('d')  # Keep pressing D
+        elif head_yaw > self.lean_threshold:
+            # Check if we should press D
+            if head_yaw > self.strong_lean_threshold:
+                # Strong lean - hold down continuously
+                desired_keys.add('d')
+            else:
+                # Small lean - hold for 1 second, wait 75ms, repeat
+                if not self.lean_key_state['d']:
+                    # Key is not currently held - check if we can start a new press
+                    time_since_last_release = current_time - self.last_lean_press_time['d']
+                    if time_since_last_release >= self.small_lean_wait_duration:
+                        # Start holding the key
+                        self.output.keyDown('d')
+                        self.lean_key_state['d'] = True
+                        self.lean_key_press_start['d'] = current_time
+                        print(f"🔄 Small lean RIGHT: {head_yaw:.1f}° - Holding 'D' for 1s")
+                else:
+                    # Key is currently held - check if we should release it
+                    hold_duration = current_time - self.lean_key_press_start['d']
+                    if hold_duration >= self.small_lean_hold_duration:
+                        # Release the key after 1 second
+                        self.output.keyUp('d')
+                        self.lean_key_state['d'] = False
+                        self.last_lean_press_time['d'] = current_time
+                        print(f"🔄 Small lean RIGHT: {head_yaw:.1f}° - Released 'D', waiting 75ms")
+            
+        # Forward/Backward (W/S) - using head pose (switched W and S)
+        if 'w' in self.current_keys:
+            # Already pressing W
+            if head_pitch < pitch_release_back:
+                pass  # Release W
+            else:
+                desired_keys.add('w')  # Keep pressing W
+        elif head_pitch > self.pitch_threshold_back:
+            desired_keys.add('w')  # Start pressing W (head backward)
+            
+        if 's' in self.current_keys:
+            # Already pressing S
+            if head_pitch > -pitch_release:
+                pass  # Release S
+            else:
+                desired_keys.add('s')  # Keep pressing S
+        elif head_pitch < -self.pitch_threshold:
+            desired_keys.add('s')  # Start pressing S (head forward)
+        
+        # Release keys that should no longer be pressed
+        keys_to_release = self.current_keys - desired_keys
+        for key in keys_to_release:
+            self.output.keyUp(key)
+            print(f"Released: {key.upper()}")
+        
+        # Press keys that should be pressed
+        keys_to_press = desired_keys - self.current_keys
+        for key in keys_to_press:
+            self.output.keyDown(key)
+            print(f"Pressed: {key.upper()}")
+            
+        # Continuously hold down keys that should remain pressed
+        for key in desired_keys:
+            self.output.keyDown(key)  # Keep pressing the key to ensure it stays down
+        
+        self.current_keys = desired_keys
+        
+        # Create key state dict for display
+        key_states = {
+            'w': 'w' in desired_keys,
+            'a': 'a' in desired_keys,
+            's': 's' in desired_keys,
+            'd': 'd' in desired_keys
+        }
+        
+        return desired_keys, key_states
+    
+    def release_all_keys(self):
+        """Release all currently pressed keys"""
+        for key in self.current_keys:
+            self.output.keyUp(key)
+        if self.current_keys:
+            print(f"Released all keys: {', '.join([k.upper() for k in self.current_keys])}")
+        self.current_keys = set()
+
+class TongueController:
+    """Mouth open detection controller for scope/right click (from tongue_tracking.py)"""
+    def __init__(self, sensitivity=0.015, debounce_frames=10, output=None):
+        self.output = output or default_sink()
+        self.sensitivity = sensitivity
+        self.debounce_frames = debounce_frames
+        self.frames_held = 0
+        self.is_scoped = False
+        
+    def update(self, face_landmarks, control_enabled):
+        if not control_enabled or face_landmarks is None:
+            self.frames_held = 0
+            if self.is_scoped:
+                self.output.mouseUp(button='right')
+                self.is_scoped = False
+            return False, "Control Disabled"
+        
+        mouth_open = detect_mouth_open(face_landmarks)
+        
+        if mouth_open:
+            self.frames_held += 1
+            if self.frames_held >= self.debounce_frames and not self.is_scoped:
+                self.output.mouseDown(button='right')
+                self.is_scoped = True
+                return True, "Scoping (right click held)!"
+        else:
+            self.frames_held = 0
+            if self.is_scoped:
+                self.output.mouseUp(button='right')
+                self.is_scoped = False
+        
+        return mouth_open, "Scope ready"
+
+
+class ControlCore:
+    """All controllers plus the per-frame decision/output logic"""
+    def __init__(self, output=None, scheme=None, cursor_predictor=None, landmark_filter=None, gesture_table=None,
+                 gesture_model=None, cursor_rate=120):
+        # Where controllers send keyboard/mouse input (real input unless recording/replaying)
+        self.output = output or default_sink()
+        
+        # Which landmark sources drive movement (head tilt, body lean or hands only)
+        self.scheme = get_scheme(scheme)
+        
+        # Sensitivity control (0.1 to 1.0)
+        self.sensitivity = 0.9
+        
+        # Initialize controllers
+        self.wasd_controller = WASDController(output=self.output)
+        self.gun_detector = StickyGunDetector()
+        self.shooting_controller = ThumbShootingController(output=self.output)
+        self.mouse_controller = SmoothMouseController(output=self.output,
+                                                      predictor=build_predictor(cursor_predictor),
+                                                      cursor_rate=cursor_rate)
+        self.left_hand_controller = LeftHandGestureController(output=self.output, gestures=gesture_table)
+        self.tongue_controller = TongueController(output=self.output)
+        
+        # Apply initial sensitivity to mouse controller
+        self.mouse_controller.krunker_controller.sensitivity = self.sensitivity * 2.5
+        
+        # One-Euro filtering of landmarks before any controller sees them (None = raw landmarks)
+        self.landmark_filter = landmark_filter
+        if landmark_filter is not None:
+            # The filter already removes hand tremor; a dead zone on top only adds stick-slip
+            self.mouse_controller.krunker_controller.dead_zone = 0.0
+        
+        # Learned finger states (gesture_model.GestureModel) instead of the angle/distance rules
+        self.gesture_model = gesture_model
+        
+        # Control state
+        self.control_enabled = False
+        
+        # act() runs on the output stage; toggles and sensitivity changes come from the render
+        # thread and the control channel. One lock keeps a command from landing mid-frame
+        # (e.g. control turned off while act() is still pressing keys)
+        self.control_lock = threading.Lock()
+    
+    def identify_hands(self, hand_landmarks_list):
+        """Identify which hand is left vs right based on position (from dual_hand_tracking.py)"""
+        if len(hand_landmarks_list) == 0:
+            return None, None
+        elif len(hand_landmarks_list) == 1:
+            # Only one hand detected, assume it's the right hand
+            return None, hand_landmarks_list[0]
+        else:
+            # Two hands detected, identify by x position
+            hand1 = hand_landmarks_list[0]
+            hand2 = hand_landmarks_list[1]
+            
+            # Get wrist positions
+            wrist1_x = hand1.landmark[0].x
+            wrist2_x = hand2.landmark[0].x
+            
+            # Left hand is on the left side of screen (lower x value)
+            if wrist1_x < wrist2_x:
+                return hand1, hand2  # hand1 is left, hand2 is right
+            else:
+                return hand2, hand1  # hand2 is left, hand1 is right
+    
+    def decide(self, face_landmarks, hand_landmarks_list, frame_width, frame_height, pose_landmarks=None,
+               timestamp=None):
+        """Decision: turn landmarks into head pose, body lean and left/right hand assignments"""
+        if not self.scheme.uses('face'):
+            face_landmarks = None  # e.g. a trace recorded with another scheme
+        if self.scheme.lateral != 'body':
+            pose_landmarks = None
+        
+        # Identify left and right hands (before filtering, so each filter follows one hand)
+        left_hand = right_hand = None
+        if hand_landmarks_list:
+            try:
+                left_hand, right_hand = self.identify_hands(hand_landmarks_list)
+            except Exception as e:
+                print(f"Error processing hands: {e}")
+        
+        # Smooth every landmark source on capture timestamps
+        if self.landmark_filter is not None and timestamp is not None:
+            left_hand = self.landmark_filter.hand('left', left_hand, timestamp)
+            right_hand = self.landmark_filter.hand('right', right_hand, timestamp)
+            face_landmarks = self.landmark_filter.face(face_landmarks, timestamp)
+            pose_landmarks = self.landmark_filter.pose(pose_landmarks, timestamp)
+        
+        # Finger states, thumb and fingertip of each hand, computed once for all hand controllers
+        left_features = right_features = None
+        try:
+            left_features = HandFeatures(left_hand, self.gesture_model) if left_hand is not None else None
+            right_features = HandFeatures(right_hand, self.gesture_model) if right_hand is not None else None
+        except Exception as e:
+            print(f"Error processing hands: {e}")
+        
+        state = {
+            'face_landmarks': face_landmarks,
+            'head_yaw': 0,
+            'head_pitch': 0,
+            'body_lean': 0,
+            'left_hand': left_hand,
+            'right_hand': right_hand,
+            'left_features': left_features,
+            'right_features': right_features,
+            'timestamp': timestamp,  # Capture time of the frame (used by cursor prediction)
+        }
+        
+        # Process pose for body lean (A/D in the body-lean scheme)
+        if pose_landmarks is not None:
+            state['body_lean'] = calculate_lean_pose(pose_landmarks, frame_width, frame_height)
+        
+        # Process face for head pose (W/S)
+        if face_landmarks is not None:
+            try:
+                state['head_yaw'], state['head_pitch'] = calculate_head_pose(
+                    face_landmarks, frame_width, frame_height
+                )
+            except Exception as e:
+                print(f"Error processing face: {e}")
+        
+        return state
+    
+    def act(self, state, now=None):
+        """
+        Output: update controllers, which inject keyboard/mouse input.
+        now: time the debounce and hold timers run on (default: the frame's capture timestamp,
+        so a replay presses keys exactly like the session it recorded)
+        """
+        if now is None:
+            now = state.get('timestamp')
+        if now is None:
+            now = time.monotonic()
+        with self.control_lock:
+            return self._act(state, now)
+    
+    def _act(self, state, now):
+        # Initialize status variables
+        gun_active = False
+        shoot_status = "No right hand"
+        left_status = "No left hand"
+        tongue_out = False
+        tongue_status = "No face"
+        
+        # Mouth open detection for scope
+        if state['face_landmarks'] is not None:
+            try:
+                tongue_out, tongue_status = self.tongue_controller.update(
+                    state['face_landmarks'], self.control_enabled
+                )
+            except Exception as e:
+                print(f"Error processing face: {e}")
+        
+        # Update WASD controller: A/D from head tilt or body lean, W/S from head pose
+        if self.scheme.movement:
+            lateral = {'head': state['head_yaw'], 'body': state['body_lean']}.get(self.scheme.lateral, 0)
+            pitch = state['head_pitch'] if self.scheme.pitch else 0
+            active_wasd_keys, wasd_states = self.wasd_controller.update(
+                lateral, pitch, self.control_enabled, now
+            )
+        else:
+            active_wasd_keys, wasd_states = set(), {'w': False, 'a': False, 's': False, 'd': False}
+        
+        # Process right hand (gun control)
+        right_hand = state['right_features']
+        if right_hand is not None:
+            try:
+                # Only detect gun gesture if controls are enabled
+                if self.control_enabled:
+                    gun_active = self.gun_detector.update(right_hand)
+                    
+                    if gun_active:
+                        # Thumb shooting
+                        is_shooting, shoot_status = self.shooting_controller.update(
+                            right_hand, gun_active
+                        )
+                        
+                        # Mouse movement
+                        self.mouse_controller.update(right_hand, gun_active, state.get('timestamp'))
+                    else:
+                        # Gun not active - release mouse if held
+                        self.shooting_controller.force_release()
+                else:
+                    # Controls disabled - force release everything and reset gun detector
+                    self.shooting_controller.force_release()
+                    self.gun_detector.is_locked = False  # Reset gun detector
+                    self.gun_detector.lock_frames = 0
+                    gun_active = False
+                    
+            except Exception as e:
+                print(f"Error processing right hand: {e}")
+        
+        # Process left hand (gesture controls)
+        left_hand = state['left_features']
+        if left_hand is not None:
+            try:
+                left_action, left_status = self.left_hand_controller.update(
+                    left_hand, self.control_enabled, now
+                )
+            except Exception as e:
+                print(f"Error processing left hand: {e}")
+        
+        state['active_wasd_keys'] = active_wasd_keys
+        state['wasd_states'] = wasd_states
+        state['gun_active'] = gun_active
+        state['shoot_status'] = shoot_status
+        state['left_status'] = left_status
+        state['tongue_out'] = tongue_out
+        state['tongue_status'] = tongue_status
+        return state
+    
+    def toggle_control(self):
+        """Turn gesture control ON/OFF (releases everything when turned off)"""
+        with self.control_lock:
+            self._set_control(not self.control_enabled)
+    
+    def set_control(self, enabled):
+        """Turn gesture control ON or OFF, like toggle_control (nothing happens if it already is)"""
+        with self.control_lock:
+            if enabled != self.control_enabled:
+                self._set_control(enabled)
+    
+    def _set_control(self, enabled):
+        # Caller holds control_lock
+        self.control_enabled = enabled
+        if not enabled:
+            self.shooting_controller.force_release()
+            self.wasd_controller.release_all_keys()
+        print(f"\n{'='*50}")
+        print(f"Control {'ENABLED ✓' if enabled else 'DISABLED ✗'}")
+        print(f"{'='*50}\n")
+    
+    def change_sensitivity(self, delta):
+        """Adjust mouse sensitivity (0.1 to 1.0)"""
+        with self.control_lock:
+            self.sensitivity = min(1.0, max(0.1, self.sensitivity + delta))
+            # Apply sensitivity to mouse controller (finger gun cursor)
+            self.mouse_controller.krunker_controller.sensitivity = self.sensitivity * 2.5
+        print(f"🎯 Mouse Sensitivity: {self.sensitivity:.1f} (multiplier: {self.mouse_controller.krunker_controller.sensitivity:.2f})")
+    
+    def results(self, state):
+        """JSON-friendly summary of one frame of controller output"""
+        return {
+            'control': self.control_enabled,
+            'head_yaw': round(float(state['head_yaw']), 3),
+            'head_pitch': round(float(state['head_pitch']), 3),
+            'body_lean': round(float(state['body_lean']), 3),
+            'wasd': sorted(state['active_wasd_keys']),
+            'gun_active': state['gun_active'],
+            'shoot_status': state['shoot_status'],
+            'left_status': state['left_status'],
+            'tongue_out': bool(state['tongue_out']),
+            'tongue_status': state['tongue_status'],
+        }
+    
+    def release_all(self):
+        """Release every key/button the controllers may be holding"""
+        with self.control_lock:
+            self.shooting_controller.force_release()
+            self.wasd_controller.release_all_keys()
+            # Release scope/right click if held
+            if self.tongue_controller.is_scoped:
+                self.output.mouseUp(button='right')
+            # Stop cursor thread
+            self.mouse_controller.krunker_controller.stop_cursor_thread()
+            # Clean up mouse controller
+            self.mouse_controller.krunker_controller.last_x = None
+            self.mouse_controller.krunker_controller.last_y = None
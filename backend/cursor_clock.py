@@ -0,0 +1,226 @@
+"""
+CURSOR CLOCK
+Paces the cursor thread on absolute monotonic deadlines instead of
+"sleep(interval - elapsed)".
+
+With sleep-for-the-remainder pacing, every sleep overshoot and every wait for
+the GIL (held by the CV loop) pushes all later ticks back, so the real rate
+drifts below the target and jitter is large. DeadlineClock instead schedules
+tick n at start + n x period:
+- It sleeps until shortly before the deadline, then spins the last stretch.
+  The spin calls sleep(0), so the GIL is released on every pass.
+- A late tick doesn't delay the next deadline.
+- If a tick is so late that whole periods went by, those deadlines count as
+  missed and are skipped. There is no burst of catch-up ticks.
+
+TickStats keeps live histograms of tick intervals and lateness, plus missed
+deadline counts. KrunkerStyleMouseController runs its cursor thread on it
+(--cursor-rate, up to 1000 Hz).
+
+Achieved rate and jitter, old vs new pacing, optionally with a CV-like load:
+    python3 cursor_clock.py --rates 120,500,1000 --load 2
+"""
+
+import time
+from bisect import bisect_right
+from collections import deque
+
+import numpy as np
+
+MAX_RATE = 1000  # Hz
+DEFAULT_SPIN = 0.0005  # Seconds before a deadline to stop sleeping and start spinning
+# Histogram bin edges (ms): tick intervals and lateness
+INTERVAL_EDGES_MS = (0.5, 1, 2, 4, 6, 8, 8.33, 9, 10, 12, 16, 25, 50)
+LATENESS_EDGES_MS = (0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 16)
+
+
+class TickStats:
+    """Live tick statistics: interval and lateness histograms, missed deadlines, recent intervals"""
+    def __init__(self, period, interval_edges_ms=INTERVAL_EDGES_MS, recent=4096):
+        self.period = period
+        self.interval_edges = [edge / 1000 for edge in interval_edges_ms]
+        self.lateness_edges = [edge / 1000 for edge in LATENESS_EDGES_MS]
+        self.interval_counts = [0] * (len(self.interval_edges) + 1)
+        self.lateness_counts = [0] * (len(self.lateness_edges) + 1)
+        self.intervals = deque(maxlen=recent)  # For percentiles
+        self.ticks = 0
+        self.missed = 0
+        self.max_interval = 0.0
+        self.elapsed = 0.0  # Sum of intervals (achieved rate)
+
+    def record(self, interval, lateness, missed):
+        self.ticks += 1
+        self.missed += missed
+        self.lateness_counts[bisect_right(self.lateness_edges, lateness)] += 1
+        if interval is None:
+            return  # First tick after a (re)start
+        self.interval_counts[bisect_right(self.interval_edges, interval)] += 1
+        self.intervals.append(interval)
+        self.elapsed += interval
+        if interval > self.max_interval:
+            self.max_interval = interval
+
+    def summary(self):
+        intervals = np.asarray(self.intervals)
+        jitter = np.abs(intervals - self.period) * 1000 if len(intervals) else np.zeros(1)
+        count = sum(self.interval_counts)
+        return {
+            'ticks': self.ticks,
+            'target_hz': 1.0 / self.period,
+            'achieved_hz': count / self.elapsed if self.elapsed else 0.0,
+            'jitter_p50_ms': float(np.percentile(jitter, 50)),
+            'jitter_p99_ms': float(np.percentile(jitter, 99)),
+            'max_interval_ms': self.max_interval * 1000,
+            'missed': self.missed,
+        }
+
+    def histogram(self, which='interval'):
+        """[(label, count)] for the interval or lateness histogram"""
+        edges, counts = ((self.interval_edges, self.interval_counts) if which == 'interval'
+                         else (self.lateness_edges, self.lateness_counts))
+        labels = [f"<{edges[0] * 1000:g}ms"]
+        labels += [f"{low * 1000:g}-{high * 1000:g}ms" for low, high in zip(edges, edges[1:])]
+        labels += [f">={edges[-1] * 1000:g}ms"]
+        return list(zip(labels, counts))
+
+    def describe(self):
+        s = self.summary()
+        return (f"{s['achieved_hz']:.1f}/{s['target_hz']:.0f} Hz | jitter p50 {s['jitter_p50_ms']:.2f}ms "
+                f"p99 {s['jitter_p99_ms']:.2f}ms | max interval {s['max_interval_ms']:.1f}ms | "
+                f"{s['missed']} missed deadlines")
+
+    def print_histogram(self, which='interval'):
+        rows = self.histogram(which)
+        total = max(sum(count for _, count in rows), 1)
+        for label, count in rows:
+            if count:
+                print(f"   {label:>12} {count:7d} {'█' * max(1, round(40 * count / total))}")
+
+
+class DeadlineClock:
+    """Ticks at absolute monotonic deadlines: wait() blocks until the next one and returns the tick time"""
+    def __init__(self, rate_hz=120, spin=DEFAULT_SPIN, stats=None):
+        if not 0 < rate_hz <= MAX_RATE:
+            raise ValueError(f"Cursor rate must be in (0, {MAX_RATE}] Hz, got {rate_hz}")
+        self.period = 1.0 / rate_hz
+        self.spin = min(spin, self.period / 2)
+        self.stats = stats if stats is not None else TickStats(self.period)
+        self.next_deadline = None
+        self.last_tick = None
+
+    def start(self, now=None):
+        """First deadline one period from now (call again after a pause)"""
+        now = time.monotonic() if now is None else now
+        self.next_deadline = now + self.period
+        self.last_tick = None
+
+    def wait(self):
+        if self.next_deadline is None:
+            self.start()
+        deadline = self.next_deadline
+        remaining = deadline - time.monotonic()
+        if remaining > self.spin:
+            time.sleep(remaining - self.spin)
+        # Spin the last stretch; sleep(0) lets the CV threads have the GIL meanwhile
+        while time.monotonic() < deadline:
+            time.sleep(0)
+        now = time.monotonic()
+        lateness = now - deadline
+        # Deadlines that passed entirely while we were late are skipped, not replayed
+        missed = int(lateness // self.period)
+        self.next_deadline = deadline + (missed + 1) * self.period
+        self.stats.record(None if self.last_tick is None else now - self.last_tick, lateness, missed)
+        self.last_tick = now
+        return now
+
+
+class SleepClock:
+    """The previous pacing, for comparison: sleep for whatever is left of the interval after the tick"""
+    def __init__(self, rate_hz=120, stats=None):
+        self.period = 1.0 / rate_hz
+        self.stats = stats if stats is not None else TickStats(self.period)
+        self.tick_start = None
+        self.last_tick = None
+
+    def start(self, now=None):
+        self.tick_start = None
+        self.last_tick = None
+
+    def wait(self):
+        if self.tick_start is not None:
+            elapsed = time.monotonic() - self.tick_start
+            time.sleep(max(0, self.period - elapsed))
+        now = time.monotonic()
+        lateness = 0.0 if self.last_tick is None else max(0.0, now - self.last_tick - self.period)
+        self.stats.record(None if self.last_tick is None else now - self.last_tick, lateness,
+                          int(lateness // self.period))
+        self.tick_start = self.last_tick = now
+        return now
+
+
+def _cv_load(stop, seed):
+    """Stand-in for the CV loop: OpenCV preprocessing (releases the GIL) plus per-frame Python/NumPy work"""
+    import cv2
+    from gestures import HandFeatures
+
+    rng = np.random.default_rng(seed)
+    frame = rng.integers(0, 255, (720, 1280, 3), dtype=np.uint8)
+    hands = rng.random((64, 21, 3))
+    n = 0
+    while not stop.is_set():
+        small = cv2.resize(cv2.cvtColor(cv2.flip(frame, 1), cv2.COLOR_BGR2RGB), (640, 360))
+        cv2.GaussianBlur(small, (5, 5), 0)
+        for hand in hands[n % 32:n % 32 + 2]:
+            HandFeatures(hand)
+        # Pure-Python decision work holds the GIL
+        sum(i * i for i in range(20000))
+        n += 1
+
+
+def _run(clock, seconds, work_s=0.0001):
+    clock.start()
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        clock.wait()
+        # A cursor tick's own work (lock, arithmetic, one input event)
+        spin_until = time.monotonic() + work_s
+        while time.monotonic() < spin_until:
+            pass
+    return clock.stats
+
+
+def benchmark(rates=(120, 500, 1000), seconds=3.0, load=0, spin=DEFAULT_SPIN):
+    """Achieved tick rate, jitter and missed deadlines: sleep-remainder vs deadline pacing"""
+    import os
+    import threading
+
+    stop = threading.Event()
+    workers = [threading.Thread(target=_cv_load, args=(stop, n), daemon=True) for n in range(load)]
+    for worker in workers:
+        worker.start()
+    print(f"{os.cpu_count()} CPUs | {load} CV load thread(s) | {seconds:.0f}s per run")
+    report = {}
+    try:
+        for rate in rates:
+            for name, clock in (('sleep', SleepClock(rate)), ('deadline', DeadlineClock(rate, spin))):
+                stats = _run(clock, seconds)
+                report[(name, rate)] = stats.summary()
+                print(f"{rate:5d} Hz {name:>9}: {stats.describe()}")
+    finally:
+        stop.set()
+        for worker in workers:
+            worker.join()
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark cursor tick pacing (sleep-remainder vs deadlines)")
+    parser.add_argument("--rates", default="120,500,1000", help="Comma-separated tick rates in Hz (default: 120,500,1000)")
+    parser.add_argument("--seconds", type=float, default=3.0, help="Duration of each run (default: 3)")
+    parser.add_argument("--load", type=int, default=0, help="CV-like load threads running alongside (default: 0)")
+    parser.add_argument("--spin-us", type=float, default=DEFAULT_SPIN * 1e6,
+                        help="Spin window before each deadline in µs (default: 500)")
+    args = parser.parse_args()
+    benchmark(tuple(int(rate) for rate in args.rates.split(',')), args.seconds, args.load, args.spin_us / 1e6)
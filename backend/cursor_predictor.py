@@ -0,0 +1,218 @@
+"""
+CURSOR PREDICTION
+Kalman estimator for the index fingertip (hand landmark 8) that lets the cursor
+thread move between camera frames instead of draining one delta per frame.
+
+    'cv'  constant velocity      state per axis: position, velocity
+    'ca'  constant acceleration  state per axis: position, velocity, acceleration
+
+update() corrects the state with a new observation at its capture timestamp;
+predict(t) extrapolates the position to any later time without changing the
+state. KrunkerStyleMouseController(predictor=...) calls predict() on every
+cursor tick, so the cursor keeps moving at the estimated velocity between
+frames and is pulled toward each new observation as it arrives.
+
+Benchmark on a landmark trace (added latency vs overshoot, per method):
+    python3 cursor_predictor.py run1.fgt
+"""
+
+import numpy as np
+
+PREDICTOR_MODELS = ('cv', 'ca')
+
+# Cursor coordinates are fingertip positions scaled to this virtual screen (as in the mouse controller)
+SCREEN_WIDTH = 1920
+SCREEN_HEIGHT = 1080
+
+
+class KalmanPredictor:
+    """Per-axis Kalman filter on 2D fingertip positions (both axes share one covariance)"""
+    def __init__(self, model='cv', process_noise=None, measurement_noise=2.0, max_horizon=0.05):
+        if model not in PREDICTOR_MODELS:
+            raise ValueError(f"Unknown predictor model '{model}' (expected one of {PREDICTOR_MODELS})")
+        self.model = model
+        self.order = 2 if model == 'cv' else 3
+        # White acceleration (cv, px/s^2) or jerk (ca, px/s^3) noise
+        if process_noise is None:
+            process_noise = 4000.0 if model == 'cv' else 60000.0
+        self.q = process_noise ** 2
+        self.r = measurement_noise ** 2  # Landmark jitter (px^2)
+        self.max_horizon = max_horizon  # Never extrapolate further than this past the last observation (s)
+        self.reset()
+
+    def reset(self):
+        self.x = None  # (order, 2): rows = position, velocity[, acceleration]; columns = x, y
+        self.P = None
+        self.t = None
+
+    @property
+    def initialized(self):
+        return self.x is not None
+
+    def _transition(self, dt):
+        if self.order == 2:
+            F = np.array([[1.0, dt], [0.0, 1.0]])
+            G = np.array([[dt * dt / 2], [dt]])
+        else:
+            F = np.array([[1.0, dt, dt * dt / 2], [0.0, 1.0, dt], [0.0, 0.0, 1.0]])
+            G = np.array([[dt ** 3 / 6], [dt * dt / 2], [dt]])
+        return F, self.q * (G @ G.T)
+
+    def update(self, x, y, t):
+        """Correct with an observation (px) captured at time t (s)"""
+        z = np.array([x, y], dtype=np.float64)
+        if self.x is None or t <= self.t:
+            if self.x is None:
+                self.x = np.zeros((self.order, 2))
+                self.P = np.diag([self.r] + [1e6] * (self.order - 1))
+            self.x[0] = z
+            self.t = t
+            return self.x[0]
+
+        F, Q = self._transition(t - self.t)
+        self.x = F @ self.x
+        self.P = F @ self.P @ F.T + Q
+
+        # H = [1, 0(, 0)]: only position is observed
+        S = self.P[0, 0] + self.r
+        K = self.P[:, 0] / S
+        self.x = self.x + np.outer(K, z - self.x[0])
+        self.P = self.P - np.outer(K, self.P[0, :])
+        self.t = t
+        return self.x[0]
+
+    def predict(self, t):
+        """Estimated position at time t (clamped to max_horizon past the last observation)"""
+        if self.x is None:
+            return None
+        dt = min(max(t - self.t, 0.0), self.max_horizon)
+        if self.order == 2:
+            return self.x[0] + self.x[1] * dt
+        return self.x[0] + self.x[1] * dt + self.x[2] * (dt * dt / 2)
+
+
+def build_predictor(model):
+    """'cv' / 'ca' -> KalmanPredictor, None / 'none' -> None (controller drains per-frame deltas)"""
+    if model in (None, 'none'):
+        return None
+    return KalmanPredictor(model)
+
+
+def _right_index_tips(reader):
+    """(timestamps, (N, 2) px) of landmark 8 of the right hand (rightmost wrist) per frame, NaN if absent"""
+    count = len(reader)
+    tips = np.full((count, 2), np.nan)
+    hands = np.asarray(reader.hands)
+    present = np.asarray(reader.hand_present).astype(bool)
+    for i in range(count):
+        slots = np.flatnonzero(present[i])
+        if len(slots) == 0:
+            continue
+        # Same rule as ControlCore.identify_hands: one hand = right hand, two = the one further right
+        slot = slots[np.argmax(hands[i, slots, 0, 0])]
+        tips[i] = hands[i, slot, 8, :2] * (SCREEN_WIDTH, SCREEN_HEIGHT)
+    return np.asarray(reader.timestamp, dtype=np.float64), tips
+
+
+def simulate(timestamps, tips, method, tick_rate=120, **predictor_args):
+    """
+    Replay fingertip observations through a cursor at tick_rate Hz.
+    method: 'drain' (current controller: 15% of the pending delta per 120 Hz tick), 'cv' or 'ca'.
+    Returns (tick times, (M, 2) cursor positions), in the same px units as tips.
+    """
+    from controllers import KrunkerStyleMouseController
+    from gestures import HandFeatures
+    from input_sink import RecordingSink
+
+    sink = RecordingSink()
+    predictor = None if method == 'drain' else KalmanPredictor(method, **predictor_args)
+    controller = KrunkerStyleMouseController(sink, predictor=predictor, cursor_rate=tick_rate)
+    controller.sensitivity = 1.0
+    controller.use_thread = False  # Ticks are driven here on the trace's clock
+
+    points = np.zeros((21, 3))  # Only the index fingertip moves
+    tick = 1.0 / tick_rate
+    ticks, cursor = [], []
+    position = None
+    valid = np.flatnonzero(~np.isnan(tips[:, 0]))
+    if len(valid) < 2:
+        return np.zeros(0), np.zeros((0, 2))
+    now = timestamps[valid[0]]
+    for n, i in enumerate(valid):
+        points[8, 0] = tips[i, 0] / SCREEN_WIDTH
+        points[8, 1] = tips[i, 1] / SCREEN_HEIGHT
+        controller.update(HandFeatures(points), True, timestamp=timestamps[i], now=timestamps[i])
+        if position is None:
+            position = tips[i].copy()
+        end = timestamps[valid[n + 1]] if n + 1 < len(valid) else timestamps[i] + 0.1
+        while now < end:
+            controller._tick(now)
+            for event in sink.drain():
+                if event[1] == 'move_relative':
+                    position += (event[2], event[3])
+            ticks.append(now)
+            cursor.append(position.copy())
+            now += tick
+    return np.asarray(ticks), np.asarray(cursor)
+
+
+def evaluate(timestamps, tips, ticks, cursor, max_lag=0.2):
+    """Added latency (best time shift vs the observed path) and overshoot past it"""
+    valid = ~np.isnan(tips[:, 0])
+    t_obs, obs = timestamps[valid], tips[valid]
+    if len(ticks) == 0 or len(t_obs) < 2:
+        return None
+
+    def truth(t):
+        return np.stack([np.interp(t, t_obs, obs[:, 0]), np.interp(t, t_obs, obs[:, 1])], axis=1)
+
+    # The cursor only follows relative motion: compare displacements from the start
+    cursor = cursor - cursor[0] + truth(ticks[:1])[0]
+    lags = np.arange(-0.05, max_lag + 1e-9, 0.002)
+    errors = [np.sqrt(np.mean(np.sum((cursor - truth(ticks - lag)) ** 2, axis=1))) for lag in lags]
+    best = int(np.argmin(errors))
+
+    # Overshoot: how far the cursor is ahead of the finger along the finger's recent direction of motion
+    reference = truth(ticks)
+    direction = reference - truth(ticks - 0.1)
+    norm = np.linalg.norm(direction, axis=1)
+    moving = norm > 1.0
+    ahead = np.zeros(len(ticks))
+    ahead[moving] = np.sum((cursor - reference)[moving] * direction[moving], axis=1) / norm[moving]
+    ahead = np.maximum(ahead, 0.0)
+    return {
+        'lag_ms': float(lags[best] * 1000),
+        'rms_error_px': float(errors[best]),
+        'overshoot_mean_px': float(ahead.mean()),
+        'overshoot_p95_px': float(np.percentile(ahead, 95)),
+    }
+
+
+def benchmark(path, methods=('drain',) + PREDICTOR_MODELS, tick_rate=120):
+    """Compare the current delta-draining cursor with the Kalman predictors on a landmark trace"""
+    from landmark_trace import TraceReader
+
+    reader = TraceReader(path)
+    timestamps, tips = _right_index_tips(reader)
+    print(f"{path}: {len(reader)} frames, right index tip in {int((~np.isnan(tips[:, 0])).sum())}")
+    report = {}
+    for method in methods:
+        ticks, cursor = simulate(timestamps, tips, method, tick_rate)
+        result = evaluate(timestamps, tips, ticks, cursor)
+        if result is None:
+            print("Not enough fingertip observations")
+            return None
+        report[method] = result
+        print(f"{method:>6}: added latency {result['lag_ms']:6.1f}ms | rms error {result['rms_error_px']:6.1f}px | "
+              f"overshoot mean {result['overshoot_mean_px']:5.1f}px p95 {result['overshoot_p95_px']:5.1f}px")
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark cursor prediction on a landmark trace")
+    parser.add_argument("trace", help="Landmark trace file (--trace)")
+    parser.add_argument("--tick-rate", type=int, default=120, help="Cursor thread rate in Hz (default: 120)")
+    args = parser.parse_args()
+    benchmark(args.trace, tick_rate=args.tick_rate)
@@ -0,0 +1,200 @@
+"""
+FACE KEYPOINT FLOW
+Carries the few FaceMesh landmarks the controllers use (1, 10, 13, 14, 33, 152,
+263: nose, forehead, lips, eyes, chin) forward on frames where FaceMesh is
+skipped, with pyramidal Lucas-Kanade optical flow on a small grayscale crop
+around the face.
+
+- anchor() takes every real FaceMesh result: it resets the points and the crop
+  box (face box + padding, fixed until the next anchor).
+- track() moves the points from the previous crop to the current one. It gives
+  up (returns None) if a point is lost, leaves the crop, or the anchor is too
+  old. The caller then falls back to the last FaceMesh result.
+
+The tracked result is a SparseFaceLandmarks: .landmark[i] works for the tracked
+indices, so calculate_head_pose / detect_mouth_open take it unchanged.
+
+Benchmark keypoint, pitch and mouth-state error vs FaceMesh on every frame:
+    python3 face_flow.py clip.mp4
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+from gestures import FACE_KEYPOINTS
+from landmark_trace import SparseFaceLandmarks
+
+
+class FaceKeypointTracker:
+    """Lucas-Kanade propagation of face keypoints between FaceMesh runs"""
+    def __init__(self, keypoints=FACE_KEYPOINTS, padding=0.25, crop_size=160, win_size=15,
+                 max_level=2, max_error=20.0, max_frames=10):
+        self.keypoints = list(keypoints)
+        self.padding = padding  # Crop margin around the face box, relative to its size
+        self.crop_size = crop_size  # Longest crop side after downscaling (px)
+        self.lk_params = dict(
+            winSize=(win_size, win_size),
+            maxLevel=max_level,
+            criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03),
+        )
+        self.max_error = max_error
+        self.max_frames = max_frames  # Don't extrapolate longer than this without an anchor
+
+        self.box = None  # (x0, y0, x1, y1) in pixels
+        self.frame_size = None  # (w, h) of the anchored frame
+        self.scale = 1.0
+        self.prev_gray = None
+        self.points = None  # (N, 1, 2) float32, crop pixel coordinates
+        self.z = None
+        self.frames_since_anchor = 0
+
+        self.tracked = 0
+        self.lost = 0
+
+    def reset(self):
+        self.prev_gray = None
+        self.points = None
+
+    def _crop(self, rgb_frame):
+        x0, y0, x1, y1 = self.box
+        gray = cv2.cvtColor(rgb_frame[y0:y1, x0:x1], cv2.COLOR_RGB2GRAY)
+        if self.scale != 1.0:
+            gray = cv2.resize(gray, (int(round((x1 - x0) * self.scale)), int(round((y1 - y0) * self.scale))),
+                              interpolation=cv2.INTER_AREA)
+        return gray
+
+    def anchor(self, rgb_frame, face_landmarks):
+        """Re-anchor on a real FaceMesh result (None = no face: stop tracking)"""
+        if face_landmarks is None:
+            self.reset()
+            return
+        h, w = rgb_frame.shape[:2]
+        landmarks = face_landmarks.landmark
+        points = landmarks.values() if isinstance(landmarks, dict) else landmarks  # Sparse or full mesh
+        xs = np.array([l.x for l in points]) * w
+        ys = np.array([l.y for l in points]) * h
+        pad = self.padding * max(xs.max() - xs.min(), ys.max() - ys.min())
+        x0, y0 = int(max(0, xs.min() - pad)), int(max(0, ys.min() - pad))
+        x1, y1 = int(min(w, xs.max() + pad)), int(min(h, ys.max() + pad))
+        if x1 - x0 < 16 or y1 - y0 < 16:
+            self.reset()
+            return
+
+        self.box = (x0, y0, x1, y1)
+        self.frame_size = (w, h)
+        self.scale = min(1.0, self.crop_size / float(max(x1 - x0, y1 - y0)))
+        self.prev_gray = self._crop(rgb_frame)
+        points = np.array([(landmarks[i].x * w - x0, landmarks[i].y * h - y0) for i in self.keypoints],
+                          dtype=np.float32) * self.scale
+        self.points = points.reshape(-1, 1, 2)
+        self.z = [landmarks[i].z for i in self.keypoints]
+        self.frames_since_anchor = 0
+
+    def track(self, rgb_frame):
+        """Propagate the keypoints to this frame. Returns SparseFaceLandmarks or None"""
+        if self.points is None or self.frames_since_anchor >= self.max_frames:
+            return None
+        if rgb_frame.shape[1::-1] != self.frame_size:
+            self.reset()
+            return None
+
+        gray = self._crop(rgb_frame)
+        points, status, error = cv2.calcOpticalFlowPyrLK(self.prev_gray, gray, self.points, None, **self.lk_params)
+        crop_h, crop_w = gray.shape[:2]
+        if (points is None or not status.all() or float(error.max()) > self.max_error
+                or (points < 0).any() or (points[..., 0] >= crop_w).any() or (points[..., 1] >= crop_h).any()):
+            self.lost += 1
+            self.reset()
+            return None
+
+        self.prev_gray = gray
+        self.points = points
+        self.frames_since_anchor += 1
+        self.tracked += 1
+
+        # Crop pixels -> full-frame normalized coordinates
+        x0, y0 = self.box[0], self.box[1]
+        w, h = self.frame_size
+        normalized = (points.reshape(-1, 2) / self.scale + (x0, y0)) / (w, h)
+        return SparseFaceLandmarks(self.keypoints, normalized, self.z)
+
+
+def benchmark(source, interval=3, max_frames=300):
+    """FaceMesh on every frame vs FaceMesh every `interval` frames + flow in between"""
+    from inference import build_models
+    from gestures import calculate_head_pose, detect_mouth_open
+
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        print(f"Error: Could not open {source}")
+        return None
+    face_mesh = build_models(('face',))['face']
+    tracker = FaceKeypointTracker()
+
+    mesh_times, flow_times, errors, pitch_errors = [], [], [], []
+    mouth_agree = mouth_total = 0
+    frames = 0
+    while frames < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        rgb_frame = cv2.cvtColor(cv2.flip(frame, 1), cv2.COLOR_BGR2RGB)
+        h, w = rgb_frame.shape[:2]
+
+        start = time.perf_counter()
+        results = face_mesh.process(rgb_frame)
+        mesh_times.append(time.perf_counter() - start)
+        face = results.multi_face_landmarks[0] if results.multi_face_landmarks else None
+
+        if frames % interval == 0:
+            tracker.anchor(rgb_frame, face)
+        else:
+            start = time.perf_counter()
+            tracked = tracker.track(rgb_frame)
+            flow_times.append(time.perf_counter() - start)
+            if tracked is not None and face is not None:
+                ref = np.array([(face.landmark[i].x * w, face.landmark[i].y * h) for i in tracker.keypoints])
+                est = np.array([(tracked.landmark[i].x * w, tracked.landmark[i].y * h) for i in tracker.keypoints])
+                errors.append(float(np.mean(np.linalg.norm(ref - est, axis=1))))
+                pitch_errors.append(abs(calculate_head_pose(face, w, h)[1] - calculate_head_pose(tracked, w, h)[1]))
+                mouth_agree += detect_mouth_open(face) == detect_mouth_open(tracked)
+                mouth_total += 1
+        frames += 1
+
+    cap.release()
+    face_mesh.close()
+    if not frames:
+        print("No frames read")
+        return None
+
+    report = {
+        'frames': frames,
+        'facemesh_ms': float(np.mean(mesh_times) * 1000),
+        'flow_ms': float(np.mean(flow_times) * 1000) if flow_times else None,
+        'tracked': tracker.tracked,
+        'lost': tracker.lost,
+        'keypoint_error_px': float(np.mean(errors)) if errors else None,
+        'pitch_error': float(np.mean(pitch_errors)) if pitch_errors else None,
+        'mouth_agreement': mouth_agree / mouth_total if mouth_total else None,
+    }
+    print(f"Frames: {frames} (FaceMesh every {interval}, flow in between)")
+    print(f"FaceMesh: {report['facemesh_ms']:.1f}ms/frame")
+    if flow_times:
+        print(f"Flow:     {report['flow_ms']:.2f}ms/frame ({tracker.tracked} tracked, {tracker.lost} lost)")
+    if errors:
+        print(f"Keypoint error vs FaceMesh: {report['keypoint_error_px']:.2f}px | "
+              f"pitch error {report['pitch_error']:.2f} | mouth state agreement {report['mouth_agreement'] * 100:.1f}%")
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark optical-flow face keypoints vs FaceMesh")
+    parser.add_argument("source", help="Recorded video clip")
+    parser.add_argument("--interval", type=int, default=3, help="FaceMesh every N frames (default: 3)")
+    parser.add_argument("--frames", type=int, default=300, help="Max frames to use (default: 300)")
+    args = parser.parse_args()
+    benchmark(args.source, args.interval, args.frames)
@@ -0,0 +1,275 @@
+"""
+MINIMAL FACE KEYPOINTS
+Head tilt, pitch and mouth state without running FaceMesh on every face frame.
+
+The controllers read seven of FaceMesh's 468 landmarks. MediaPipe FaceDetection
+(BlazeFace, short range) is much cheaper and gives six keypoints per face: eyes,
+nose tip, mouth center and ear tragions. MinimalFaceModel maps those onto the
+FaceMesh indices that calculate_head_pose and detect_mouth_open read:
+
+    33 / 263  eye corners: the eye centers spread apart by eye_corner_ratio
+    1         nose tip
+    10 / 152  forehead / chin: on the eye -> mouth line, forehead_ratio and
+              chin_ratio eye-to-mouth distances beyond the eyes / mouth
+    13 / 14   lips: both at the mouth center (closed), unless FaceMesh ran
+
+A detector can't see the lip gap. When the mouth keypoint drops further below
+the nose than usual (the jaw opening), or while the mouth is confirmed open,
+FaceMesh runs on that frame and only its lip landmarks are used. Head pose
+always comes from the detector, so it doesn't jump between the two models.
+
+The result is a SparseFaceLandmarks in the FaceMesh result shape, so it is a
+drop-in 'face' model: LeaningControlSystem --face-model minimal.
+
+Agreement with FaceMesh and speed on recorded video (fits the ratios too):
+    python3 face_keypoints.py clip.mp4
+"""
+
+import time
+
+import numpy as np
+
+from gestures import FACE_KEYPOINTS, detect_mouth_open
+from landmark_trace import LegacyResults, SparseFaceLandmarks
+
+FACE_MODELS = ('mesh', 'minimal')
+
+# FaceDetection keypoint order
+RIGHT_EYE, LEFT_EYE, NOSE_TIP, MOUTH_CENTER = 0, 1, 2, 3
+
+
+def build_face_detection():
+    """BlazeFace short-range detector (faces within ~2m of the camera)"""
+    import mediapipe as mp
+    return mp.solutions.face_detection.FaceDetection(model_selection=0, min_detection_confidence=0.5)
+
+
+def detection_keypoints(detection):
+    """(6, 2) normalized keypoints of one FaceDetection detection"""
+    return np.array([(k.x, k.y) for k in detection.location_data.relative_keypoints], dtype=np.float64)
+
+
+def synthesize_landmarks(keypoints, eye_corner_ratio=1.4, forehead_ratio=1.1, chin_ratio=0.75, lips=None):
+    """
+    FaceMesh-index keypoints (1, 10, 13, 14, 33, 152, 263) from detector keypoints.
+    lips: ((x, y, z), (x, y, z)) for 13 / 14 from FaceMesh, else closed lips at the mouth center.
+    """
+    right_eye, left_eye = keypoints[RIGHT_EYE], keypoints[LEFT_EYE]
+    nose, mouth = keypoints[NOSE_TIP], keypoints[MOUTH_CENTER]
+    eye_mid = (right_eye + left_eye) / 2
+    half_eyes = (left_eye - right_eye) / 2 * eye_corner_ratio
+    down = mouth - eye_mid  # Eye line -> mouth
+
+    points = {
+        1: nose,
+        10: eye_mid - down * forehead_ratio,
+        13: mouth,
+        14: mouth,
+        33: eye_mid - half_eyes,
+        152: mouth + down * chin_ratio,
+        263: eye_mid + half_eyes,
+    }
+    z = {index: 0.0 for index in points}
+    if lips is not None:
+        (points[13], z[13]), (points[14], z[14]) = ((np.array(lip[:2]), lip[2]) for lip in lips)
+    indices = FACE_KEYPOINTS
+    return SparseFaceLandmarks(indices, [points[i] for i in indices], [z[i] for i in indices])
+
+
+def mouth_drop(keypoints):
+    """Nose -> mouth distance relative to the eye -> mouth distance (grows as the jaw opens)"""
+    eye_mid = (keypoints[RIGHT_EYE] + keypoints[LEFT_EYE]) / 2
+    span = np.linalg.norm(keypoints[MOUTH_CENTER] - eye_mid)
+    if span <= 1e-6:
+        return 0.0
+    return float(np.linalg.norm(keypoints[MOUTH_CENTER] - keypoints[NOSE_TIP]) / span)
+
+
+class MinimalFaceModel:
+    """FaceDetection keypoints every face frame; FaceMesh only to confirm an open mouth"""
+    def __init__(self, face_detection=None, face_mesh=None, open_margin=0.08, baseline_rate=0.05,
+                 confirm_interval=15, eye_corner_ratio=1.4, forehead_ratio=1.1, chin_ratio=0.75):
+        self.face_detection = face_detection or build_face_detection()
+        if face_mesh is None:
+            from inference import build_models
+            face_mesh = build_models(('face',))['face']
+        self.face_mesh = face_mesh
+        self.open_margin = open_margin  # Mouth drop this far above the closed-mouth baseline -> confirm
+        self.baseline_rate = baseline_rate  # How fast the closed-mouth baseline follows the face
+        self.confirm_interval = confirm_interval  # Also confirm every N frames, in case the cue misses
+        self.ratios = dict(eye_corner_ratio=eye_corner_ratio, forehead_ratio=forehead_ratio, chin_ratio=chin_ratio)
+
+        self.baseline = None
+        self.mouth_open = False  # Last FaceMesh-confirmed mouth state
+        self.frames_since_confirm = 0
+        self.frames = 0
+        self.confirmations = 0
+
+    def _confirm_lips(self, rgb_frame):
+        """Lip landmarks (13, 14) from FaceMesh, or None if it found no face"""
+        results = self.face_mesh.process(rgb_frame)
+        self.confirmations += 1
+        self.frames_since_confirm = 0
+        if not results or not results.multi_face_landmarks:
+            return None
+        landmarks = results.multi_face_landmarks[0].landmark
+        return tuple((landmarks[i].x, landmarks[i].y, landmarks[i].z) for i in (13, 14))
+
+    def process(self, rgb_frame):
+        self.frames += 1
+        detections = self.face_detection.process(rgb_frame).detections
+        if not detections:
+            self.mouth_open = False
+            return LegacyResults()
+        keypoints = detection_keypoints(detections[0])
+
+        drop = mouth_drop(keypoints)
+        if self.baseline is None:
+            self.baseline = drop
+        candidate = drop > self.baseline + self.open_margin
+        self.frames_since_confirm += 1
+
+        lips = None
+        if candidate or self.mouth_open or self.frames_since_confirm >= self.confirm_interval:
+            lips = self._confirm_lips(rgb_frame)
+            face = SparseFaceLandmarks((13, 14), [l[:2] for l in lips], [l[2] for l in lips]) if lips else None
+            self.mouth_open = face is not None and detect_mouth_open(face)
+        if not candidate and not self.mouth_open:
+            # Closed-mouth baseline follows slow changes (distance, expression)
+            self.baseline += self.baseline_rate * (drop - self.baseline)
+
+        return LegacyResults(multi_face_landmarks=[synthesize_landmarks(keypoints, lips=lips, **self.ratios)])
+
+    def close(self):
+        self.face_detection.close()
+        self.face_mesh.close()
+
+
+def build_face_model(kind='mesh'):
+    """'mesh' -> FaceMesh graph, 'minimal' -> MinimalFaceModel"""
+    if kind == 'minimal':
+        return MinimalFaceModel()
+    if kind != 'mesh':
+        raise ValueError(f"Unknown face model '{kind}' (expected one of {FACE_MODELS})")
+    from inference import build_models
+    return build_models(('face',))['face']
+
+
+def fit_ratios(mesh_faces, detector_keypoints):
+    """Median eye-corner / forehead / chin ratios that map detector keypoints onto FaceMesh"""
+    eye, forehead, chin = [], [], []
+    for face, keypoints in zip(mesh_faces, detector_keypoints):
+        landmarks = face.landmark
+        eye_mid = (keypoints[RIGHT_EYE] + keypoints[LEFT_EYE]) / 2
+        down = keypoints[MOUTH_CENTER] - eye_mid
+        span = float(np.dot(down, down))
+        eye_span = np.linalg.norm(keypoints[LEFT_EYE] - keypoints[RIGHT_EYE])
+        if span <= 1e-9 or eye_span <= 1e-6:
+            continue
+        corner = np.array([landmarks[263].x - landmarks[33].x, landmarks[263].y - landmarks[33].y])
+        eye.append(np.linalg.norm(corner) / eye_span)
+        # Projections onto the eye -> mouth direction
+        forehead.append(float(np.dot(eye_mid - (landmarks[10].x, landmarks[10].y), down)) / span)
+        chin.append(float(np.dot(np.array((landmarks[152].x, landmarks[152].y)) - keypoints[MOUTH_CENTER], down)) / span)
+    if not eye:
+        return None
+    return {'eye_corner_ratio': float(np.median(eye)), 'forehead_ratio': float(np.median(forehead)),
+            'chin_ratio': float(np.median(chin))}
+
+
+def benchmark(source, max_frames=300, fit=True):
+    """FaceMesh on every frame vs the minimal path: head pose / WASD / mouth agreement and ms per frame"""
+    from controllers import WASDController
+    from gestures import calculate_head_pose
+    from inference import build_models
+    from input_sink import RecordingSink
+    from scheduler import _load_frames
+
+    frames = _load_frames(source, max_frames)
+    if not frames:
+        print("No frames read")
+        return None
+    h, w = frames[0].shape[:2]
+
+    # Reference pass: FaceMesh on every frame, plus raw detector keypoints for fitting
+    face_mesh = build_models(('face',))['face']
+    detector = build_face_detection()
+    reference, keypoints, mesh_times = [], [], []
+    for rgb_frame in frames:
+        start = time.perf_counter()
+        results = face_mesh.process(rgb_frame)
+        mesh_times.append(time.perf_counter() - start)
+        reference.append(results.multi_face_landmarks[0] if results.multi_face_landmarks else None)
+        detections = detector.process(rgb_frame).detections
+        keypoints.append(detection_keypoints(detections[0]) if detections else None)
+    detector.close()
+    face_mesh.close()
+
+    ratios = {}
+    if fit:
+        pairs = [(face, k) for face, k in zip(reference, keypoints) if face is not None and k is not None]
+        ratios = fit_ratios(*zip(*pairs)) if pairs else None
+        ratios = ratios or {}
+
+    # Minimal path over the same frames
+    model = MinimalFaceModel(**ratios)
+    minimal, minimal_times = [], []
+    for rgb_frame in frames:
+        start = time.perf_counter()
+        results = model.process(rgb_frame)
+        minimal_times.append(time.perf_counter() - start)
+        minimal.append(results.multi_face_landmarks[0] if results.multi_face_landmarks else None)
+    model.close()
+
+    yaw_errors, pitch_errors = [], []
+    wasd_agree = mouth_agree = both = 0
+    wasd = {'mesh': WASDController(output=RecordingSink()), 'minimal': WASDController(output=RecordingSink())}
+    for face, estimate in zip(reference, minimal):
+        if face is None or estimate is None:
+            continue
+        both += 1
+        yaw, pitch = calculate_head_pose(face, w, h)
+        est_yaw, est_pitch = calculate_head_pose(estimate, w, h)
+        yaw_errors.append(abs(yaw - est_yaw))
+        pitch_errors.append(abs(pitch - est_pitch))
+        keys = wasd['mesh'].update(yaw, pitch, True)[0]
+        est_keys = wasd['minimal'].update(est_yaw, est_pitch, True)[0]
+        wasd_agree += set(keys) == set(est_keys)
+        mouth_agree += detect_mouth_open(face) == detect_mouth_open(estimate)
+    for controller in wasd.values():
+        controller.release_all_keys()
+
+    if not both:
+        print("No frames with a face from both paths")
+        return None
+    report = {
+        'frames': len(frames),
+        'facemesh_ms': float(np.mean(mesh_times) * 1000),
+        'minimal_ms': float(np.mean(minimal_times) * 1000),
+        'facemesh_confirm_rate': model.confirmations / max(model.frames, 1),
+        'yaw_error': float(np.mean(yaw_errors)),
+        'pitch_error': float(np.mean(pitch_errors)),
+        'wasd_agreement': wasd_agree / both,
+        'mouth_agreement': mouth_agree / both,
+        'ratios': ratios,
+    }
+    print(f"Frames: {len(frames)} ({both} with a face in both paths)")
+    print(f"FaceMesh: {report['facemesh_ms']:.1f}ms/frame | minimal: {report['minimal_ms']:.1f}ms/frame "
+          f"(FaceMesh confirmation on {report['facemesh_confirm_rate'] * 100:.0f}% of frames)")
+    print(f"Head pose error: yaw {report['yaw_error']:.2f} | pitch {report['pitch_error']:.2f} | "
+          f"WASD agreement {report['wasd_agreement'] * 100:.1f}% | "
+          f"mouth state agreement {report['mouth_agreement'] * 100:.1f}%")
+    if ratios:
+        print("Fitted ratios: " + ", ".join(f"{name}={value:.2f}" for name, value in ratios.items()))
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the minimal face keypoint path against FaceMesh")
+    parser.add_argument("source", help="Recorded video clip or session directory")
+    parser.add_argument("--frames", type=int, default=300, help="Max frames to use (default: 300)")
+    parser.add_argument("--no-fit", action="store_true", help="Use the default ratios instead of fitting them")
+    args = parser.parse_args()
+    benchmark(args.source, args.frames, fit=not args.no_fit)
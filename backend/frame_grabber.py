@@ -0,0 +1,273 @@
+"""
+LATEST-FRAME CAPTURE
+Dedicated capture thread for cv2.VideoCapture (webcam or video file).
+
+The thread keeps only the newest frame together with its monotonic capture
+timestamp. If the consumer (MediaPipe loop) stalls, older frames are dropped
+instead of piling up in the camera buffer, so every processed frame is as
+fresh as possible.
+
+Usage:
+    grabber = LatestFrameGrabber(0)            # webcam
+    grabber = LatestFrameGrabber("clip.mp4")   # video file, paced like a camera
+    if grabber.start():
+        ret, frame, capture_time = grabber.read()
+
+With reuse_buffers=N the thread retrieves into recycled frame buffers instead of
+allocating a new one per frame. A frame handed out by read() stays untouched
+until N newer frames have been read, so consumers must be done with it by then.
+"""
+
+import collections
+import threading
+import time
+
+import cv2
+
+
+class CaptureStats:
+    """Per-second capture counters: frames captured, delivered, dropped and frame ages"""
+    def __init__(self):
+        self.reset(time.monotonic())
+        self.last_report = None
+
+    def reset(self, now):
+        self.window_start = now
+        self.captured = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.age_sum = 0.0
+        self.age_max = 0.0
+
+    def add_age(self, age):
+        self.delivered += 1
+        self.age_sum += age
+        self.age_max = max(self.age_max, age)
+
+    def roll(self, now):
+        """Close the current window and return its report"""
+        elapsed = max(now - self.window_start, 1e-6)
+        self.last_report = {
+            'captured_fps': self.captured / elapsed,
+            'delivered_fps': self.delivered / elapsed,
+            'dropped': self.dropped,
+            'age_avg_ms': (self.age_sum / self.delivered * 1000) if self.delivered else 0.0,
+            'age_max_ms': self.age_max * 1000,
+        }
+        self.reset(now)
+        return self.last_report
+
+
+class LatestFrameGrabber:
+    """Capture thread that keeps only the newest frame (latest-frame-wins)"""
+    def __init__(self, source=0, width=1280, height=720, fps=30, pacing=None,
+                 stats_interval=1.0, verbose=True, reuse_buffers=0, device_timeout=2.0):
+        self.source = source
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.is_file = isinstance(source, str) and not source.isdigit()
+
+        # Pacing:
+        #   'device'   - read as fast as the device delivers (webcam default)
+        #   'realtime' - pace a video file at its native FPS so it behaves like a camera
+        #   'lossless' - never drop: capture waits for the consumer (offline benchmarking)
+        if pacing is None:
+            pacing = 'realtime' if self.is_file else 'device'
+        self.pacing = pacing
+        self.device_timeout = device_timeout  # Seconds of failed grabs before a device counts as dead
+
+        self.stats_interval = stats_interval
+        self.verbose = verbose
+        self.stats = CaptureStats()
+
+        self.cap = None
+        self.thread = None
+        self.running = False
+        self.finished = False  # True once a video file hits EOF (or the device dies)
+
+        # Latest frame slot (guarded by self.cond)
+        self.cond = threading.Condition()
+        self.frame = None
+        self.capture_time = None
+        self.frame_id = 0  # Sequence number of the newest captured frame
+        self.consumed_id = 0  # Sequence number of the last frame handed out by read()
+
+        # Frame buffer recycling (0 = allocate a new frame for every capture)
+        self.reuse_buffers = reuse_buffers
+        self.free_buffers = []
+        self.delivered = collections.deque()  # Frames the consumer may still be using
+        self.allocations = 0
+
+    @property
+    def lossless(self):
+        """Every captured frame is meant to be processed (downstream stages must not drop either)"""
+        return self.pacing == 'lossless'
+
+    def start(self):
+        """Open the source and start the capture thread. Returns False if the source can't be opened"""
+        source = int(self.source) if isinstance(self.source, str) and self.source.isdigit() else self.source
+        self.cap = cv2.VideoCapture(source)
+        if not self.is_file:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+            self.cap.set(cv2.CAP_PROP_FPS, self.fps)
+            # Keep the driver queue as short as possible (ignored by some backends)
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+        if not self.cap.isOpened():
+            return False
+
+        if self.is_file:
+            file_fps = self.cap.get(cv2.CAP_PROP_FPS)
+            if file_fps and file_fps > 0:
+                self.fps = file_fps
+
+        self.running = True
+        self.finished = False
+        self.stats.reset(time.monotonic())
+        self.thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self.thread.start()
+        print(f"📷 Capture thread started ({'file' if self.is_file else 'device'}: {self.source}, pacing: {self.pacing})")
+        return True
+
+    def _capture_loop(self):
+        """Grab frames continuously and overwrite the latest-frame slot"""
+        frame_interval = 1.0 / self.fps if self.fps else 0
+        next_due = time.monotonic()
+        failing_since = None  # Start of the current run of failed grabs
+
+        while self.running:
+            if self.pacing == 'realtime' and self.is_file:
+                # Emulate a camera: one frame per frame interval
+                delay = next_due - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                next_due = max(next_due + frame_interval, time.monotonic() - frame_interval)
+            elif self.pacing == 'lossless':
+                # Wait until the consumer took the previous frame
+                with self.cond:
+                    while self.running and self.consumed_id < self.frame_id:
+                        self.cond.wait(0.1)
+                if not self.running:
+                    break
+
+            # grab() returns as soon as the frame is available; timestamp it right away
+            if not self.cap.grab():
+                if self.is_file:
+                    break
+                now = time.monotonic()
+                if failing_since is None:
+                    failing_since = now
+                elif now - failing_since > self.device_timeout:
+                    print(f"⚠️  Camera {self.source}: no frames for {self.device_timeout:.1f}s - giving up")
+                    break
+                time.sleep(0.001)
+                continue
+            failing_since = None
+            capture_time = time.monotonic()
+            buffer = None
+            if self.reuse_buffers:
+                with self.cond:
+                    buffer = self.free_buffers.pop() if self.free_buffers else None
+            ok, frame = self.cap.retrieve(buffer) if buffer is not None else self.cap.retrieve()
+            if not ok:
+                if buffer is not None:
+                    with self.cond:
+                        self.free_buffers.append(buffer)
+                continue
+            if frame is not buffer:
+                self.allocations += 1
+
+            with self.cond:
+                if self.frame is not None and self.consumed_id < self.frame_id:
+                    # Previous frame was never read - it's stale now
+                    self.stats.dropped += 1
+                    if self.reuse_buffers:
+                        self.free_buffers.append(self.frame)
+                self.frame = frame
+                self.capture_time = capture_time
+                self.frame_id += 1
+                self.stats.captured += 1
+                self.cond.notify_all()
+
+        with self.cond:
+            self.finished = True
+            self.cond.notify_all()
+
+    def read(self, timeout=1.0):
+        """
+        Wait for a frame newer than the last one read.
+        Returns: (ret, frame, capture_time) where capture_time is time.monotonic() at grab
+        """
+        deadline = time.monotonic() + timeout
+        with self.cond:
+            while self.consumed_id >= self.frame_id:
+                if self.finished or not self.running:
+                    return False, None, None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False, None, None
+                self.cond.wait(remaining)
+
+            frame = self.frame
+            capture_time = self.capture_time
+            self.consumed_id = self.frame_id
+            if self.reuse_buffers:
+                self.delivered.append(frame)
+                if len(self.delivered) > self.reuse_buffers:
+                    self.free_buffers.append(self.delivered.popleft())
+            now = time.monotonic()
+            self.stats.add_age(now - capture_time)
+            report = None
+            if now - self.stats.window_start >= self.stats_interval:
+                report = self.stats.roll(now)
+            self.cond.notify_all()
+
+        if report and self.verbose:
+            print(f"📷 Capture: {report['captured_fps']:.1f} fps captured, "
+                  f"{report['dropped']} dropped, "
+                  f"age avg {report['age_avg_ms']:.1f}ms / max {report['age_max_ms']:.1f}ms")
+        return True, frame, capture_time
+
+    def get_stats(self):
+        """Return the most recent per-second report (None until the first window closes)"""
+        return self.stats.last_report
+
+    def stop(self):
+        """Stop the capture thread and release the source"""
+        self.running = False
+        with self.cond:
+            self.cond.notify_all()
+        if self.thread:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+        if self.cap:
+            self.cap.release()
+            self.cap = None
+        print("📷 Capture thread stopped")
+
+
+if __name__ == "__main__":
+    # Benchmark the capture stage alone: python frame_grabber.py [device index | video file] [consumer delay ms]
+    import sys
+
+    source = sys.argv[1] if len(sys.argv) > 1 else 0
+    consumer_delay = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.05
+
+    grabber = LatestFrameGrabber(source)
+    if not grabber.start():
+        print(f"Error: Could not open {source}")
+        sys.exit(1)
+    try:
+        while True:
+            ret, frame, capture_time = grabber.read()
+            if not ret:
+                if grabber.finished:
+                    break
+                continue
+            time.sleep(consumer_delay)  # Simulate MediaPipe work
+    except KeyboardInterrupt:
+        pass
+    finally:
+        grabber.stop()
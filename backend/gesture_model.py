@@ -0,0 +1,317 @@
+"""
+GESTURE MODEL
+A tiny learned replacement for the finger-extension rules (the 140° joint angle
+in is_finger_extended, the 1.8x wrist distance in are_bottom_fingers_curled),
+which misfire when the hand is rotated.
+
+The model is a pure-NumPy MLP (60 -> 16 tanh -> 5 sigmoid). Its input is the
+hand's landmarks relative to the wrist, scaled by the palm length and rotated
+so the wrist -> middle MCP direction points up. It outputs one "extended"
+probability per finger (thumb..pinky). Everything downstream is unchanged:
+the gun gesture, the left hand gesture table and the cursor read the same
+finger states, and bottom fingers count as curled when the model says they
+are not extended (the rules use a wrist distance there, so report checks both
+gun predicates).
+
+Training data is ordinary landmark traces (--trace), one per finger state:
+record a few seconds of a pose while turning and tilting the hand, then
+label the file with the fingers that are up:
+
+    python3 gesture_model.py train index=gun.fgt thumb+index=spray.fgt fist=fist.fgt all=open.fgt \
+        -o gesture_model.npz
+    python3 gesture_model.py report gesture_model.npz index=gun_test.fgt ...
+
+report compares per-finger, finger-state, gun and bottom-fingers-curled
+accuracy, and latency per hand, against the rules on the labelled traces. It
+warns when the model is worse than the rules at either gun predicate. Weights are saved as .npz
+(w1, b1, w2, b2 plus a JSON "meta" entry). Run with --gesture-model FILE.
+"""
+
+import json
+import math
+import time
+
+import numpy as np
+
+from gesture_table import FINGERS
+from gestures import (HAND_WRIST, INDEX, MIDDLE, RING, PINKY, EXTENDED_ANGLE, CURLED_RATIO, HandFeatures,
+                      hand_geometry)
+
+FORMAT_VERSION = 1
+PALM_BASE = 9  # Middle finger MCP: wrist -> PALM_BASE sets the hand's scale and orientation
+NUM_FEATURES = 20 * 3
+# Landmark x and z are normalized by the frame width, y by its height (1280x720 capture)
+ASPECT = 1280 / 720
+
+
+def hand_features(points):
+    """(..., 21, 3) landmarks -> (..., 60) wrist-relative, palm-scaled, upright landmarks"""
+    points = np.asarray(points, dtype=np.float64)
+    relative = points[..., 1:, :] - points[..., HAND_WRIST:HAND_WRIST + 1, :]
+    x, y, z = relative[..., 0] * ASPECT, relative[..., 1], relative[..., 2] * ASPECT
+    palm_x, palm_y = x[..., PALM_BASE - 1], y[..., PALM_BASE - 1]
+    scale = np.sqrt(palm_x * palm_x + palm_y * palm_y) + 1e-9
+    # In-plane rotation taking the palm direction to (0, -1) (image y points down)
+    cos = -palm_y / scale
+    sin = -palm_x / scale
+    upright = np.stack([x * cos[..., None] - y * sin[..., None],
+                        x * sin[..., None] + y * cos[..., None],
+                        z], axis=-1)
+    return (upright / scale[..., None, None]).reshape(points.shape[:-2] + (NUM_FEATURES,))
+
+
+class GestureModel:
+    """Finger-extension MLP: predict(points) -> 5 extended flags, predict_batch(points) -> (N, 5)"""
+    def __init__(self, w1, b1, w2, b2, threshold=0.5, meta=None):
+        self.w1, self.b1, self.w2, self.b2 = w1, b1, w2, b2
+        self.threshold = threshold
+        # Sigmoid(z) > threshold  <=>  z > logit(threshold): no exp at inference time
+        self.logit_threshold = float(np.log(threshold / (1.0 - threshold)))
+        self.meta = meta or {}
+        self._fold()
+
+    def _fold(self):
+        """
+        Fold the wrist offset, aspect correction and palm rotation into the first layer, for predict().
+        With X, Y, Z the wrist-relative coordinates (X, Z times ASPECT), the first layer of the
+        upright features is c (X.Wx + Y.Wy) + s (X.Wy - Y.Wx) + (Z.Wz) / scale, with c and s the
+        rotation over scale. One (63, 3 x hidden) product of the raw landmarks gives all three
+        dot products (the wrist rows subtract the wrist from every landmark).
+        """
+        hidden = self.w1.shape[1]
+        wx, wy, wz = self.w1[0::3], self.w1[1::3], self.w1[2::3]
+        folded = np.zeros((21 * 3, 3 * hidden))
+        relative = folded[3:]  # Landmarks 1..20
+        relative[0::3, :hidden], relative[1::3, :hidden] = wx * ASPECT, wy
+        relative[0::3, hidden:2 * hidden], relative[1::3, hidden:2 * hidden] = wy * ASPECT, -wx
+        relative[2::3, 2 * hidden:] = wz * ASPECT
+        folded[HAND_WRIST * 3:HAND_WRIST * 3 + 3] = -relative.reshape(20, 3, 3 * hidden).sum(axis=0)
+        self.folded = folded
+        self.hidden = hidden
+        # The output bias moves into the threshold
+        self.output_threshold = self.logit_threshold - self.b2
+
+    @classmethod
+    def initialize(cls, hidden=16, seed=0):
+        rng = np.random.default_rng(seed)
+        return cls(rng.normal(0, 1 / np.sqrt(NUM_FEATURES), (NUM_FEATURES, hidden)), np.zeros(hidden),
+                   rng.normal(0, 1 / np.sqrt(hidden), (hidden, len(FINGERS))), np.zeros(len(FINGERS)))
+
+    def logits(self, features):
+        return np.tanh(features @ self.w1 + self.b1) @ self.w2 + self.b2
+
+    def predict(self, points):
+        """One hand's (21, 3) landmarks -> (thumb, index, middle, ring, pinky) extended flags"""
+        # Same result as predict_batch: one (63, 48) product, then the 16 hidden units
+        wrist_x, wrist_y = points.item(HAND_WRIST * 3), points.item(HAND_WRIST * 3 + 1)
+        palm_x = (points.item(PALM_BASE * 3) - wrist_x) * ASPECT
+        palm_y = points.item(PALM_BASE * 3 + 1) - wrist_y
+        inverse = 1.0 / (math.sqrt(palm_x * palm_x + palm_y * palm_y) + 1e-9)
+        rotation = np.array((-palm_y * inverse * inverse, -palm_x * inverse * inverse, inverse))
+        # np.dot: less call overhead than @ on arrays this small
+        products = np.dot(points.reshape(-1), self.folded).reshape(3, self.hidden)
+        hidden = np.tanh(np.dot(rotation, products) + self.b1)
+        return tuple((np.dot(hidden, self.w2) > self.output_threshold).tolist())
+
+    def predict_batch(self, points):
+        """(N, 21, 3) landmarks -> bool (N, 5)"""
+        return self.logits(hand_features(points)) > self.logit_threshold
+
+    def save(self, path):
+        meta = dict(self.meta, version=FORMAT_VERSION, fingers=list(FINGERS), threshold=self.threshold)
+        np.savez(path, w1=self.w1, b1=self.b1, w2=self.w2, b2=self.b2, meta=np.array(json.dumps(meta)))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            if meta.get('version') != FORMAT_VERSION:
+                raise ValueError(f"{path}: unsupported gesture model version {meta.get('version')}")
+            if tuple(meta.get('fingers', ())) != FINGERS:
+                raise ValueError(f"{path}: model outputs {meta.get('fingers')}, expected {FINGERS}")
+            return cls(data['w1'], data['b1'], data['w2'], data['b2'], meta['threshold'], meta)
+
+
+def parse_label(text):
+    """'thumb+index' / 'fist' / 'all' -> (thumb, index, middle, ring, pinky) extended flags"""
+    if text == 'fist':
+        return (False,) * len(FINGERS)
+    if text == 'all':
+        return (True,) * len(FINGERS)
+    fingers = text.split('+')
+    unknown = [finger for finger in fingers if finger not in FINGERS]
+    if unknown:
+        raise ValueError(f"Unknown fingers {unknown} in label '{text}' (expected {FINGERS}, 'fist' or 'all')")
+    return tuple(finger in fingers for finger in FINGERS)
+
+
+def _select_hands(hands, present, hand):
+    """Hands to keep from one frame: all of them, or the left/right one as ControlCore assigns them"""
+    visible = [slot for slot in range(len(present)) if present[slot]]
+    if hand == 'both' or not visible:
+        return visible
+    if len(visible) == 1:
+        return visible if hand == 'right' else []  # A lone hand is taken as the right one
+    # Left hand = smaller wrist x
+    left, right = sorted(visible, key=lambda slot: hands[slot, HAND_WRIST, 0])
+    return [left] if hand == 'left' else [right]
+
+
+def load_labelled(specs, hand='both'):
+    """
+    ['thumb+index=spray.fgt', ...] -> (points (N, 21, 3), labels bool (N, 5)).
+    hand: 'left' / 'right' keeps only that hand, assigned like ControlCore.identify_hands.
+    """
+    from landmark_trace import TraceReader
+
+    points, labels = [], []
+    for spec in specs:
+        label, _, path = spec.partition('=')
+        if not path:
+            raise ValueError(f"Expected <fingers>=<trace>, got '{spec}'")
+        extended = parse_label(label)
+        reader = TraceReader(path)
+        hands = np.asarray(reader.hands, dtype=np.float64)
+        present = np.asarray(reader.hand_present, dtype=bool)
+        selected = [hands[index, slot] for index in range(len(reader))
+                    for slot in _select_hands(hands[index], present[index], hand)]
+        points.extend(selected)
+        labels.extend([extended] * len(selected))
+        print(f"  {path}: {len(selected)} hands labelled {label}")
+    return (np.array(points, dtype=np.float64).reshape(-1, 21, 3),
+            np.array(labels, dtype=bool).reshape(-1, len(FINGERS)))
+
+
+def train(points, labels, hidden=16, epochs=400, learning_rate=0.01, weight_decay=1e-4, seed=0):
+    """Full-batch Adam on per-finger binary cross-entropy; returns a GestureModel"""
+    model = GestureModel.initialize(hidden, seed)
+    features = hand_features(points)
+    targets = labels.astype(np.float64)
+    params = [model.w1, model.b1, model.w2, model.b2]
+    moments = [np.zeros_like(p) for p in params]
+    velocities = [np.zeros_like(p) for p in params]
+    beta1, beta2 = 0.9, 0.999
+    for step in range(1, epochs + 1):
+        hidden_out = np.tanh(features @ model.w1 + model.b1)
+        probabilities = 1.0 / (1.0 + np.exp(-(hidden_out @ model.w2 + model.b2)))
+        # d(BCE)/d(logits), averaged over hands
+        error = (probabilities - targets) / len(features)
+        grad_hidden = (error @ model.w2.T) * (1.0 - hidden_out ** 2)
+        grads = [features.T @ grad_hidden + weight_decay * model.w1, grad_hidden.sum(axis=0),
+                 hidden_out.T @ error + weight_decay * model.w2, error.sum(axis=0)]
+        for param, grad, moment, velocity in zip(params, grads, moments, velocities):
+            moment *= beta1
+            moment += (1 - beta1) * grad
+            velocity *= beta2
+            velocity += (1 - beta2) * grad * grad
+            param -= learning_rate * (moment / (1 - beta1 ** step)) / (np.sqrt(velocity / (1 - beta2 ** step)) + 1e-8)
+        if step % 100 == 0 or step == epochs:
+            loss = -np.mean(targets * np.log(probabilities + 1e-12) + (1 - targets) * np.log(1 - probabilities + 1e-12))
+            print(f"  epoch {step:4d}: loss {loss:.4f}")
+    model._fold()
+    return model
+
+
+def _gun(extended):
+    return extended[:, INDEX] & ~(extended[:, MIDDLE] | extended[:, RING] | extended[:, PINKY])
+
+
+def _bottom_curled(curled):
+    """What keeps the gun locked: at least two of middle, ring and pinky curled"""
+    return curled[:, MIDDLE:PINKY + 1].sum(axis=1) >= 2
+
+
+def _accuracy(predicted, curled, labels):
+    return {
+        'finger': float(np.mean(predicted == labels)),
+        'state': float(np.mean(np.all(predicted == labels, axis=1))),
+        'gun': float(np.mean(_gun(predicted) == _gun(labels))),
+        # A finger that isn't up counts as curled in the labels
+        'bottom_curled': float(np.mean(_bottom_curled(curled) == _bottom_curled(~labels))),
+    }
+
+
+def _per_hand_us(function, points, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for hand in points:
+            function(hand)
+        best = min(best, time.perf_counter() - start)
+    return best / len(points) * 1e6
+
+
+def report(model, points, labels):
+    """
+    Rules vs model on labelled hands: accuracy (per finger, whole finger state, gun, bottom fingers
+    curled) and µs per hand. The rules call a finger curled by its wrist distance, the model when it
+    isn't extended, so both gun predicates (lock and stay locked) are checked against the labels.
+    """
+    result = {}
+    sample = points[:2000]
+    print(f"{len(points)} labelled hands")
+    for name, hand_model in (('rules', None), ('model', model)):
+        start = time.perf_counter()
+        if hand_model is None:
+            angles, tip_dist, mcp_dist = hand_geometry(points)
+            predicted, curled = angles > EXTENDED_ANGLE, tip_dist < mcp_dist * CURLED_RATIO
+        else:
+            predicted = hand_model.predict_batch(points)
+            curled = ~predicted
+        batch_us = (time.perf_counter() - start) / len(points) * 1e6
+        # What the live pipeline pays per hand
+        us = _per_hand_us(lambda hand: HandFeatures(hand, hand_model), sample)
+        finger_us = _per_hand_us(lambda hand: model.predict(hand), sample) if hand_model else None
+        accuracy = _accuracy(predicted, curled, labels)
+        result[name] = dict(accuracy, us_per_hand=us, batch_us_per_hand=batch_us, predict_us=finger_us)
+        per_finger = ' '.join(f"{finger} {np.mean(predicted[:, n] == labels[:, n]):.1%}"
+                              for n, finger in enumerate(FINGERS))
+        print(f"{name:>6}: fingers {accuracy['finger']:.1%} | finger state {accuracy['state']:.1%} | "
+              f"gun {accuracy['gun']:.1%} | bottom curled {accuracy['bottom_curled']:.1%}")
+        print(f"        {per_finger}")
+        print(f"        HandFeatures {us:.1f}µs per hand | batched {batch_us:.2f}µs per hand"
+              + (f" | predict() {finger_us:.1f}µs" if finger_us else ""))
+    for predicate in ('gun', 'bottom_curled'):
+        if result['model'][predicate] < result['rules'][predicate]:
+            print(f"⚠️  The model is less accurate than the rules on {predicate.replace('_', ' ')} "
+                  f"({result['model'][predicate]:.1%} vs {result['rules'][predicate]:.1%})")
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Train or evaluate the learned finger-state model")
+    parser.add_argument("command", choices=["train", "report"])
+    parser.add_argument("args", nargs="+",
+                        help="train: <fingers>=<trace> ...; report: <model.npz> <fingers>=<trace> ... "
+                             "(fingers: e.g. index, thumb+index, fist, all)")
+    parser.add_argument("-o", "--output", default="gesture_model.npz", help="With train: weights file to write")
+    parser.add_argument("--hand", choices=["both", "left", "right"], default="both",
+                        help="Which hand to use from frames with two hands (default: both)")
+    parser.add_argument("--hidden", type=int, default=16, help="With train: hidden units (default: 16)")
+    parser.add_argument("--epochs", type=int, default=400, help="With train: full-batch epochs (default: 400)")
+    parser.add_argument("--holdout", type=float, default=0.2,
+                        help="With train: fraction of hands held out for the report (default: 0.2)")
+    args = parser.parse_args()
+
+    if args.command == "train":
+        points, labels = load_labelled(args.args, args.hand)
+        if not len(points):
+            raise SystemExit("No labelled hands")
+        order = np.random.default_rng(0).permutation(len(points))
+        split = int(len(points) * (1 - args.holdout))
+        train_idx, test_idx = order[:split], order[split:]
+        print(f"🧠 Training on {len(train_idx)} hands")
+        model = train(points[train_idx], labels[train_idx], hidden=args.hidden, epochs=args.epochs)
+        model.meta.update(traces=args.args, hands=int(len(train_idx)))
+        model.save(args.output)
+        print(f"💾 Saved {args.output}")
+        if len(test_idx):
+            report(model, points[test_idx], labels[test_idx])
+    else:
+        model = GestureModel.load(args.args[0])
+        points, labels = load_labelled(args.args[1:], args.hand)
+        if not len(points):
+            raise SystemExit("No labelled hands")
+        report(model, points, labels)
@@ -0,0 +1,187 @@
+"""
+GESTURE TABLE
+Left hand gestures, compiled from gesture_config.json into a 32-entry lookup
+table indexed by the 5-bit finger-extension mask (bit 0 = thumb ... bit 4 =
+pinky). Classifying a hand is then one list index.
+
+Each gesture lists the fingers that must be extended; every other finger must
+be curled. "any" lists fingers that don't matter (the gesture then covers
+several masks). Gestures are matched in config order, so an earlier gesture
+wins where two overlap:
+
+    "left_hand": {
+        "jump": {"fingers": ["index"], "action": "key_press", "key": "space"},
+        ...
+    }
+
+The config is checked when it is loaded: a missing or unsupported "version",
+unknown fingers, actions the left hand controller can't perform, keys PyAutoGUI doesn't know, keys that the
+movement controller holds and gestures that can never match are all errors.
+
+    python3 gesture_table.py [gesture_config.json]     # validate and print the table
+"""
+
+import json
+import os
+import string
+
+import numpy as np
+
+FINGERS = ('thumb', 'index', 'middle', 'ring', 'pinky')
+NUM_MASKS = 1 << len(FINGERS)
+UNKNOWN = 'unknown'
+
+# What LeftHandGestureController can emit: a single key press
+ACTIONS = ('key_press',)
+
+# Key names PyAutoGUI accepts (a subset of pyautogui.KEYBOARD_KEYS, which needs a display to import)
+KEYS = frozenset(
+    list(string.ascii_lowercase) + list(string.digits) + list("`-=[]\\;',./")
+    + [f'f{n}' for n in range(1, 13)]
+    + ['space', 'enter', 'return', 'tab', 'esc', 'escape', 'backspace', 'delete', 'insert', 'home', 'end',
+       'pageup', 'pagedown', 'up', 'down', 'left', 'right', 'shift', 'shiftleft', 'shiftright', 'ctrl',
+       'ctrlleft', 'ctrlright', 'alt', 'altleft', 'altright', 'option', 'command', 'capslock']
+)
+# Held by WASDController: a gesture pressing one would fight the movement keys
+RESERVED_KEYS = frozenset('wasd')
+
+DEFAULT_CONFIG = 'gesture_config.json'
+SUPPORTED_VERSIONS = (2,)
+
+
+def finger_mask(extended):
+    """(thumb, index, middle, ring, pinky) extended flags -> 5-bit mask"""
+    thumb, index, middle, ring, pinky = extended
+    return thumb | index << 1 | middle << 2 | ring << 3 | pinky << 4
+
+
+def _fingers(name, gesture, field):
+    fingers = gesture.get(field, [])
+    if not isinstance(fingers, list):
+        raise ValueError(f"Gesture '{name}': '{field}' must be a list of fingers")
+    unknown = [finger for finger in fingers if finger not in FINGERS]
+    if unknown:
+        raise ValueError(f"Gesture '{name}': unknown fingers {unknown} (expected {FINGERS})")
+    return [FINGERS.index(finger) for finger in fingers]
+
+
+class GestureTable:
+    """Compiled left hand gestures: mask -> (name, key)"""
+    def __init__(self, gestures):
+        """gestures: [(name, required finger ids, don't-care finger ids, key)] in priority order"""
+        self.names = (UNKNOWN,) + tuple(name for name, _, _, _ in gestures)
+        self.keys = (None,) + tuple(key for _, _, _, key in gestures)
+        ids = np.zeros(NUM_MASKS, dtype=np.uint8)
+        claimed = np.zeros(NUM_MASKS, dtype=bool)
+        for gesture_id, (name, required, any_fingers, _) in enumerate(gestures, start=1):
+            base = sum(1 << finger for finger in required)
+            masks = set()
+            # Every combination of the don't-care fingers
+            for combo in range(1 << len(any_fingers)):
+                masks.add(base | sum(1 << finger for n, finger in enumerate(any_fingers) if combo >> n & 1))
+            free = [mask for mask in sorted(masks) if not claimed[mask]]
+            if not free:
+                raise ValueError(f"Gesture '{name}' can never match: earlier gestures cover all its finger states")
+            ids[free] = gesture_id
+            claimed[free] = True
+        self.ids = ids  # Gesture id per mask (index into names/keys), for batches
+        self.entries = [(self.names[i], self.keys[i]) for i in ids.tolist()]  # Per-frame lookups
+
+    def lookup(self, mask):
+        """5-bit finger mask -> (gesture name, key or None)"""
+        return self.entries[mask]
+
+    def describe(self):
+        """One line per finger state that presses a key, in gesture order"""
+        rows = []
+        for gesture_id in range(1, len(self.names)):
+            for mask in np.flatnonzero(self.ids == gesture_id).tolist():
+                fingers = ' + '.join(finger.capitalize() for bit, finger in enumerate(FINGERS) if mask >> bit & 1)
+                rows.append(f"{fingers or 'Fist'} up = Press '{self.keys[gesture_id].upper()}' "
+                            f"({self.names[gesture_id].capitalize()})")
+        return rows
+
+
+def compile_gestures(config):
+    """Parsed gesture config -> GestureTable (raises ValueError on an invalid config)"""
+    version = config.get('version')
+    if version not in SUPPORTED_VERSIONS:
+        raise ValueError(f"Unsupported gesture config version {version!r} "
+                         f"(supported: {', '.join(map(str, SUPPORTED_VERSIONS))})")
+    left_hand = config.get('left_hand')
+    if not isinstance(left_hand, dict):
+        raise ValueError("Gesture config needs a 'left_hand' object of gestures")
+    gestures = []
+    used_keys = {}
+    for name, gesture in left_hand.items():
+        if not isinstance(gesture, dict):
+            raise ValueError(f"Gesture '{name}' must be an object")
+        if name == UNKNOWN:
+            raise ValueError(f"'{UNKNOWN}' is reserved for hands that match no gesture")
+        if not gesture.get('enabled', True):
+            continue
+        action = gesture.get('action')
+        if action not in ACTIONS:
+            raise ValueError(f"Gesture '{name}': action '{action}' is not supported by the left hand "
+                             f"controller (expected one of {ACTIONS})")
+        key = gesture.get('key')
+        if key not in KEYS:
+            raise ValueError(f"Gesture '{name}': unknown key '{key}'")
+        if key in RESERVED_KEYS:
+            raise ValueError(f"Gesture '{name}': key '{key}' is held by the movement controller")
+        if key in used_keys:
+            print(f"⚠️  Gestures '{used_keys[key]}' and '{name}' both press '{key}'")
+        used_keys.setdefault(key, name)
+        required = _fingers(name, gesture, 'fingers')
+        any_fingers = _fingers(name, gesture, 'any')
+        if set(required) & set(any_fingers):
+            raise ValueError(f"Gesture '{name}': a finger can't be both required and 'any'")
+        gestures.append((name, required, any_fingers, key))
+    return GestureTable(gestures)
+
+
+def config_path(path=None):
+    """The gesture config to load: path, or gesture_config.json next to this module (or in the app bundle)"""
+    if path:
+        return path
+    here = os.path.join(os.path.dirname(os.path.abspath(__file__)), DEFAULT_CONFIG)
+    if not os.path.exists(here) and os.environ.get('RESOURCEPATH'):
+        return os.path.join(os.environ['RESOURCEPATH'], DEFAULT_CONFIG)  # py2app bundle
+    return here
+
+
+def load_gesture_table(path=None):
+    """Load, validate and compile a gesture config file"""
+    path = config_path(path)
+    with open(path) as f:
+        try:
+            config = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{path}: {e}") from None
+    try:
+        return compile_gestures(config)
+    except ValueError as e:
+        raise ValueError(f"{path}: {e}") from None
+
+
+_default_table = None
+
+
+def default_gesture_table():
+    """The table compiled from gesture_config.json (loaded once)"""
+    global _default_table
+    if _default_table is None:
+        _default_table = load_gesture_table()
+    return _default_table
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Validate a gesture config and print its lookup table")
+    parser.add_argument("config", nargs="?", default=None, help="Gesture config (default: gesture_config.json)")
+    args = parser.parse_args()
+    table = load_gesture_table(args.config)
+    print(f"✅ {config_path(args.config)}: {len(table.names) - 1} gestures")
+    for row in table.describe():
+        print(f"  {row}")
@@ -0,0 +1,444 @@
+"""
+GESTURE DETECTION
+Pure landmark geometry: finger states, gun/thumb gestures, left hand gestures,
+head pose, body lean and mouth open.
+
+Only needs NumPy. Works on anything shaped like a MediaPipe landmark list
+(an object with a .landmark sequence of points with .x/.y/.z), so it can run on
+live MediaPipe results or on replayed landmark traces.
+"""
+
+import numpy as np
+
+from gesture_table import finger_mask, default_gesture_table
+
+# MediaPipe Pose landmark indices (mp.solutions.pose.PoseLandmark)
+POSE_LEFT_SHOULDER = 11
+POSE_RIGHT_SHOULDER = 12
+POSE_LEFT_HIP = 23
+POSE_RIGHT_HIP = 24
+
+# FaceMesh landmarks used by calculate_head_pose / detect_mouth_open
+# (nose tip, forehead, upper lip, lower lip, left eye, chin, right eye)
+FACE_KEYPOINTS = [1, 10, 13, 14, 33, 152, 263]
+
+# Hand landmark indices per finger (thumb, index, middle, ring, pinky): tip, PIP (IP for the thumb),
+# MCP. is_finger_extended measures the tip-PIP-MCP angle; are_bottom_fingers_curled compares the
+# tip's and the MCP's distance from the wrist
+HAND_WRIST = 0
+FINGER_TIPS = np.array([4, 8, 12, 16, 20])
+FINGER_PIPS = np.array([3, 6, 10, 14, 18])
+FINGER_MCPS = np.array([2, 5, 9, 13, 17])
+THUMB, INDEX, MIDDLE, RING, PINKY = range(5)
+_FINGER_BITS = np.array([1, 2, 4, 8, 16], dtype=np.uint8)
+_WRISTS = np.full(5, HAND_WRIST)
+_VECTOR_HEADS = np.stack([FINGER_TIPS, FINGER_MCPS, FINGER_TIPS, FINGER_MCPS])
+_VECTOR_TAILS = np.stack([FINGER_PIPS, FINGER_PIPS, _WRISTS, _WRISTS])
+
+EXTENDED_ANGLE = 140  # Degrees at the PIP joint above which a finger counts as extended
+CURLED_RATIO = 1.8  # A fingertip closer to the wrist than this x its MCP's distance counts as curled
+
+def calculate_angle(point1, point2, point3):
+    vector1 = np.array([point1[0] - point2[0], point1[1] - point2[1]])
+    vector2 = np.array([point3[0] - point2[0], point3[1] - point2[1]])
+    cosine = np.dot(vector1, vector2) / (np.linalg.norm(vector1) * np.linalg.norm(vector2) + 1e-6)
+    angle = np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0)))
+    return angle
+
+def is_finger_extended(landmarks, finger_tip_id, finger_pip_id, finger_mcp_id):
+    tip = [landmarks[finger_tip_id].x, landmarks[finger_tip_id].y]
+    pip = [landmarks[finger_pip_id].x, landmarks[finger_pip_id].y]
+    mcp = [landmarks[finger_mcp_id].x, landmarks[finger_mcp_id].y]
+    angle = calculate_angle(tip, pip, mcp)
+    return angle > EXTENDED_ANGLE  # Increased threshold to be more strict
+
+def hand_array(hand_landmarks):
+    """Hand landmarks (MediaPipe list, LandmarkListView or array) -> float64 (21, 3) array"""
+    if isinstance(hand_landmarks, np.ndarray):
+        return hand_landmarks
+    array = getattr(hand_landmarks, 'array', None)
+    if array is not None:
+        # Replayed traces already hold the landmarks as an array
+        return np.asarray(array[:, :3], dtype=np.float64)
+    return np.array([(l.x, l.y, l.z) for l in hand_landmarks.landmark], dtype=np.float64)
+
+def hand_geometry(points):
+    """
+    Finger joint angles and wrist distances of a hand in one pass.
+    points: (..., 21, 3) landmark array (leading axes are broadcast, e.g. a batch of hands).
+    Returns (angles, tip_dist, mcp_dist), each (..., 5) in thumb..pinky order: the
+    tip-PIP-MCP angle in degrees, and the tip's and the MCP's 2D distance from the wrist.
+    Same arithmetic as calculate_angle / are_bottom_fingers_curled, so thresholds agree.
+    """
+    # (..., 4, 5, 2): tip - PIP and MCP - PIP (the angle's two arms), tip - wrist and MCP - wrist
+    vectors = points[..., _VECTOR_HEADS, :2] - points[..., _VECTOR_TAILS, :2]
+    squared = vectors * vectors
+    lengths = np.sqrt(squared[..., 0] + squared[..., 1])
+    products = vectors[..., 0, :, :] * vectors[..., 1, :, :]
+    cosine = (products[..., 0] + products[..., 1]) / (lengths[..., 0, :] * lengths[..., 1, :] + 1e-6)
+    # np.clip has a noticeable per-call overhead at this size
+    angles = np.degrees(np.arccos(np.minimum(np.maximum(cosine, -1.0), 1.0)))
+    return angles, lengths[..., 2, :], lengths[..., 3, :]
+
+def finger_states(hand_landmarks):
+    """(extended, curled): bool arrays (5,) in thumb..pinky order, from one hand_geometry pass"""
+    angles, tip_dist, mcp_dist = hand_geometry(hand_array(hand_landmarks))
+    return angles > EXTENDED_ANGLE, tip_dist < mcp_dist * CURLED_RATIO
+
+class HandFeatures:
+    """
+    Everything the hand controllers read from one hand, computed once per frame:
+    finger states, thumb state, index fingertip and wrist distance ratios.
+    """
+    __slots__ = ('landmarks', 'extended', 'finger_mask', 'curled', '_points', '_wrist_ratios', 'thumb_down',
+                 'index_tip', 'wrist_x', 'is_gun', 'bottom_curled')
+
+    def __init__(self, hand_landmarks, model=None):
+        """
+        model: learned finger-state model (gesture_model.GestureModel) instead of the angle/distance
+        rules. The rules' geometry is then skipped, and a finger counts as curled when it isn't extended.
+        """
+        self.landmarks = hand_landmarks  # As given (drawing, traces)
+        self._points = points = hand_array(hand_landmarks)
+        # Plain Python bools/floats: every read below is then an attribute lookup
+        if model is None:
+            angles, tip_dist, mcp_dist = hand_geometry(points)
+            self.extended = tuple((angles > EXTENDED_ANGLE).tolist())  # Thumb..pinky
+            self.curled = tuple((tip_dist < mcp_dist * CURLED_RATIO).tolist())
+            self._wrist_ratios = tuple((tip_dist / np.maximum(mcp_dist, 1e-9)).tolist())
+        else:
+            self.extended = model.predict(points)
+            self.curled = tuple(not extended for extended in self.extended)
+            self._wrist_ratios = None  # Only computed if something reads it
+        self.finger_mask = finger_mask(self.extended)  # Index into the gesture table
+        self.thumb_down = bool(points[4, 1] > points[3, 1])  # Tip below the IP joint
+        self.index_tip = (float(points[8, 0]), float(points[8, 1]))
+        self.wrist_x = float(points[HAND_WRIST, 0])
+        extended, curled = self.extended, self.curled
+        self.is_gun = extended[INDEX] and not (extended[MIDDLE] or extended[RING] or extended[PINKY])
+        self.bottom_curled = curled[MIDDLE] + curled[RING] + curled[PINKY] >= 2
+
+    @property
+    def wrist_ratios(self):
+        """Fingertip / MCP distance from the wrist, thumb..pinky"""
+        if self._wrist_ratios is None:
+            _, tip_dist, mcp_dist = hand_geometry(self._points)
+            self._wrist_ratios = tuple((tip_dist / np.maximum(mcp_dist, 1e-9)).tolist())
+        return self._wrist_ratios
+
+def calculate_head_pose(face_landmarks, w, h):
+    """Calculate head yaw (left/right tilt) and pitch (forward/backward) from face landmarks"""
+    try:
+        landmarks = face_landmarks.landmark
+        
+        # Key face landmarks for head pose estimation
+        left_eye = landmarks[33]
+        right_eye = landmarks[263]
+        nose_tip = landmarks[1]
+        chin = landmarks[152]
+        forehead = landmarks[10]
+        
+        # Head tilt (left/right) - using eye height difference
+        left_eye_y = left_eye.y
+        right_eye_y = right_eye.y
+        # Calculate tilt: positive = tilt right, negative = tilt left
+        tilt = (right_eye_y - left_eye_y) * 200  # Scale factor for sensitivity
+        yaw = tilt  # Use tilt value as yaw for A/D movement
+        
+        # Pitch (forward/backward) - using nose position relative to eyes
+        nose_y = nose_tip.y
+        chin_y = chin.y
+        forehead_y = forehead.y
+        
+        # Calculate pitch based on nose position relative to face height (better method)
+        face_height = chin_y - forehead_y
+        if face_height > 0:
+            nose_position = (nose_y - forehead_y) / face_height
+            pitch = (nose_position - 0.5) * 100  # Center around 0
+        else:
+            pitch = 0
+        
+        # Debug output
+        if not hasattr(calculate_head_pose, 'debug_counter'):
+            calculate_head_pose.debug_counter = 0
+        calculate_head_pose.debug_counter += 1
+        if calculate_head_pose.debug_counter % 30 == 0:
+            print(f"📊 Pitch: {pitch:.1f} (W threshold: {12}, S threshold: {-5})")
+        
+        return yaw, pitch
+        
+    except Exception as e:
+        print(f"Head pose calculation error: {e}")
+        return 0, 0
+
+def is_gun_gesture(hand_landmarks):
+    """Detect gun gesture (index out, bottom 3 curled)"""
+    if hand_landmarks is None:
+        return False
+    extended, _ = finger_states(hand_landmarks)
+    is_gun = extended[INDEX] and not (extended[MIDDLE] or extended[RING] or extended[PINKY])
+    return bool(is_gun)
+
+def is_thumb_down(hand_landmarks):
+    """Detect if thumb is pressed down (shooting position)"""
+    landmarks = hand_landmarks.landmark
+    thumb_tip = landmarks[4]
+    thumb_ip = landmarks[3]
+    thumb_mcp = landmarks[2]
+    
+    # Thumb pointing down if tip is below IP joint
+    return thumb_tip.y > thumb_ip.y
+
+def are_bottom_fingers_curled(hand_landmarks):
+    """Check if bottom 3 fingers are curled (rotation-proof) - from finger_tracking.py"""
+    _, curled = finger_states(hand_landmarks)
+    curled_count = int(curled[MIDDLE]) + int(curled[RING]) + int(curled[PINKY])
+    return curled_count >= 2
+
+
+def detect_left_hand_gestures(hand_landmarks):
+    """Detect left hand gestures for jump/knife/interact"""
+    try:
+        if not hasattr(hand_landmarks, 'landmark') or len(hand_landmarks.landmark) < 21:
+            return "invalid", None
+        
+        # Check individual finger states - check if fingers are UP (extended)
+        extended, _ = finger_states(hand_landmarks)
+        return left_hand_gesture(extended.tolist())
+    
+    except Exception as e:
+        print(f"Error in detect_left_hand_gestures: {e}")
+        return "error", None
+
+
+def left_hand_gesture(extended, table=None):
+    """(thumb, index, middle, ring, pinky) extended flags -> (gesture name, key) from the gesture table"""
+    return (table or default_gesture_table()).lookup(finger_mask(extended))
+
+
+def classify_hands(points, extended_angle=EXTENDED_ANGLE, curled_ratio=CURLED_RATIO, table=None, model=None):
+    """
+    Batch version of the hand predicates for offline evaluation (e.g. every hand in a
+    trace, reader.hands[reader.hand_present.astype(bool)], under different thresholds).
+    points: (N, 21, 3) hand landmarks. Returns {'gun', 'bottom_curled', 'thumb_down':
+    bool (N,), 'left_gesture': int (N,) index into table.names} (table: GestureTable,
+    default gesture_config.json; model: a learned finger-state model instead of the
+    thresholds, see HandFeatures). With the default
+    thresholds this matches is_gun_gesture, are_bottom_fingers_curled, is_thumb_down
+    and detect_left_hand_gestures.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    angles, tip_dist, mcp_dist = hand_geometry(points)
+    if model is None:
+        extended = angles > extended_angle
+        curled = tip_dist < mcp_dist * curled_ratio
+    else:
+        extended = model.predict_batch(points)
+        curled = ~extended
+    index, middle, ring, pinky = (extended[:, finger] for finger in (INDEX, MIDDLE, RING, PINKY))
+    # One table lookup per hand
+    masks = extended.astype(np.uint8) @ _FINGER_BITS
+    table = table or default_gesture_table()
+    return {
+        'gun': index & ~(middle | ring | pinky),
+        'bottom_curled': curled[:, MIDDLE:].sum(axis=1) >= 2,
+        'thumb_down': points[:, 4, 1] > points[:, 3, 1],
+        'left_gesture': table.ids[masks],
+    }
+
+
+def calculate_lean_pose(pose_landmarks, frame_width, frame_height):
+    """Calculate body lean for A/D movement based on shoulder and hip positions"""
+    try:
+        # Get key landmarks
+        left_shoulder = pose_landmarks.landmark[POSE_LEFT_SHOULDER]
+        right_shoulder = pose_landmarks.landmark[POSE_RIGHT_SHOULDER]
+        left_hip = pose_landmarks.landmark[POSE_LEFT_HIP]
+        right_hip = pose_landmarks.landmark[POSE_RIGHT_HIP]
+        
+        # Calculate shoulder and hip centers
+        shoulder_center_x = (left_shoulder.x + right_shoulder.x) / 2
+        hip_center_x = (left_hip.x + right_hip.x) / 2
+        
+        # Calculate torso center
+        torso_center_x = (shoulder_center_x + hip_center_x) / 2
+        
+        # Left/Right lean (A/D) - based on torso center position relative to frame center
+        left_right = (torso_center_x - 0.5) * 100  # Positive = leaning right, Negative = leaning left
+        
+        return left_right
+        
+    except Exception as e:
+        print(f"Error calculating lean pose: {e}")
+        return 0
+
+def detect_mouth_open(face_landmarks):
+    """Detect if tongue is out (mouth open)"""
+    try:
+        landmarks = face_landmarks.landmark
+        
+        # Use specific lip landmarks for mouth opening detection
+        upper_lip_bottom = landmarks[13]  # Upper lip bottom
+        lower_lip_top = landmarks[14]     # Lower lip top
+        
+        # Calculate vertical separation between lips
+        lip_separation = abs(upper_lip_bottom.y - lower_lip_top.y)
+        
+        # Threshold for mouth opening (adjustable)
+        threshold = 0.015
+        
+        return lip_separation > threshold
+    except:
+        return False
+
+
+def _load_hands(trace_path=None, count=2000, seed=0):
+    """(N, 21, 3) hand landmarks: every hand in a landmark trace, or random points"""
+    if trace_path:
+        from landmark_trace import TraceReader
+        reader = TraceReader(trace_path)
+        present = np.asarray(reader.hand_present, dtype=bool)
+        return np.asarray(reader.hands, dtype=np.float64)[present]
+    return np.random.default_rng(seed).random((count, 21, 3))
+
+
+def _per_finger_predicates(hand_landmarks):
+    """The per-finger calls is_gun_gesture / are_bottom_fingers_curled / detect_left_hand_gestures used to make"""
+    landmarks = hand_landmarks.landmark
+    extended = [is_finger_extended(landmarks, tip, pip, mcp)
+                for tip, pip, mcp in zip(FINGER_TIPS.tolist(), FINGER_PIPS.tolist(), FINGER_MCPS.tolist())]
+    # is_gun_gesture evaluates index..pinky a second time
+    gun_extended = [is_finger_extended(landmarks, tip, pip, mcp)
+                    for tip, pip, mcp in zip(FINGER_TIPS[1:].tolist(), FINGER_PIPS[1:].tolist(),
+                                             FINGER_MCPS[1:].tolist())]
+    wrist = landmarks[HAND_WRIST]
+    curled = []
+    for tip, mcp in ((12, 9), (16, 13), (20, 17)):
+        tip_dist = ((landmarks[tip].x - wrist.x)**2 + (landmarks[tip].y - wrist.y)**2)**0.5
+        mcp_dist = ((landmarks[mcp].x - wrist.x)**2 + (landmarks[mcp].y - wrist.y)**2)**0.5
+        curled.append(tip_dist < mcp_dist * CURLED_RATIO)
+    gun = gun_extended[0] and not any(gun_extended[1:])
+    return gun, sum(curled) >= 2, tuple(extended)
+
+
+def _frame_per_finger(left, right):
+    """One frame of hand controller reads, as per-finger calls on the raw landmarks"""
+    gun, curled, _ = _per_finger_predicates(right)
+    tip = right.landmark[8]
+    return (gun, curled, right.landmark[4].y > right.landmark[3].y, (tip.x, tip.y),
+            left_hand_gesture(_per_finger_predicates(left)[2]))
+
+
+def _frame_predicates(left, right):
+    """One frame of hand controller reads, each predicate on the raw landmarks"""
+    tip = right.landmark[8]
+    return (is_gun_gesture(right), are_bottom_fingers_curled(right), is_thumb_down(right), (tip.x, tip.y),
+            detect_left_hand_gestures(left))
+
+
+def _frame_features(left, right):
+    """One frame of hand controller reads from HandFeatures built once per hand"""
+    left, right = HandFeatures(left), HandFeatures(right)
+    return right.is_gun, right.bottom_curled, right.thumb_down, right.index_tip, left_hand_gesture(left.extended)
+
+
+def _best_time(function, inputs, repeat):
+    """(best seconds per input, outputs)"""
+    import time
+
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        outputs = [function(*args) for args in inputs]
+        best = min(best, time.perf_counter() - start)
+    return best / len(inputs), outputs
+
+
+def _print_variants(variants, repeat, unit):
+    report = {}
+    reference = None
+    for name, function, inputs in variants:
+        seconds, outputs = _best_time(function, inputs, repeat)
+        reference = outputs if reference is None else reference
+        mismatches = sum(1 for a, b in zip(reference, outputs) if a != b)
+        report[name] = seconds * 1e6
+        print(f"{name:>24}: {report[name]:6.1f}µs per {unit} | {mismatches} mismatches")
+    return report
+
+
+def _batch_check(hands, lists, repeat):
+    """classify_hands vs the per-hand predicates: mismatches per output and throughput"""
+    import time
+
+    names = default_gesture_table().names
+    start = time.perf_counter()
+    scalar = {
+        'gun': [is_gun_gesture(hand) for hand in lists],
+        'bottom_curled': [are_bottom_fingers_curled(hand) for hand in lists],
+        'thumb_down': [is_thumb_down(hand) for hand in lists],
+        'left_gesture': [names.index(detect_left_hand_gestures(hand)[0]) for hand in lists],
+    }
+    scalar_seconds = time.perf_counter() - start
+    batch_seconds, batch = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        batch = classify_hands(hands)
+        batch_seconds = min(batch_seconds, time.perf_counter() - start)
+    mismatches = {name: int(np.count_nonzero(np.asarray(values) != batch[name])) for name, values in scalar.items()}
+    print(f"Batch ({len(hands)} hands): {len(hands) / batch_seconds:,.0f} hands/s "
+          f"(per-hand predicates: {len(hands) / scalar_seconds:,.0f} hands/s)")
+    print("  mismatches: " + ", ".join(f"{name} {count}" for name, count in mismatches.items()))
+    return {'hands_per_s': len(hands) / batch_seconds, 'scalar_hands_per_s': len(hands) / scalar_seconds,
+            'mismatches': mismatches}
+
+
+def benchmark(trace_path=None, count=2000, repeat=3):
+    """
+    Cost of the hand finger states: per hand (per-finger calls vs one hand_geometry
+    pass) and per frame with two hands visible (every controller reading the
+    landmarks vs one HandFeatures per hand)
+    """
+    from types import SimpleNamespace
+    from landmark_trace import LandmarkListView
+
+    hands = _load_hands(trace_path, count)
+    if len(hands) < 2:
+        print("Not enough hands in trace")
+        return None
+    # Plain .landmark lists, like MediaPipe results (no array fast path)
+    lists = [SimpleNamespace(landmark=LandmarkListView(hand).landmark) for hand in hands]
+    print(f"{len(hands)} hands from {trace_path or 'random landmarks'}")
+
+    def kernel(hand_landmarks):
+        extended, curled = finger_states(hand_landmarks)
+        gun = extended[INDEX] and not (extended[MIDDLE] or extended[RING] or extended[PINKY])
+        return bool(gun), int(curled[MIDDLE]) + int(curled[RING]) + int(curled[PINKY]) >= 2, tuple(extended.tolist())
+
+    print("Per hand:")
+    report = {'hand': _print_variants((
+        ('per-finger calls', _per_finger_predicates, [(hand,) for hand in lists]),
+        ('kernel (landmark list)', kernel, [(hand,) for hand in lists]),
+        ('kernel ((21, 3) array)', kernel, [(hand,) for hand in hands]),
+    ), repeat, 'hand')}
+
+    # Consecutive hands make up the frames: left, right
+    frames = list(zip(lists[0::2], lists[1::2]))
+    print(f"Per frame, two hands ({len(frames)} frames):")
+    report['frame'] = _print_variants((
+        ('per-finger calls', _frame_per_finger, frames),
+        ('predicate calls', _frame_predicates, frames),
+        ('HandFeatures', _frame_features, frames),
+    ), repeat, 'frame')
+    
+    report['batch'] = _batch_check(hands, lists, repeat)
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Microbenchmark the hand finger states, per hand and per frame")
+    parser.add_argument("trace", nargs="?", default=None, help="Landmark trace file (default: random hands)")
+    parser.add_argument("--hands", type=int, default=2000, help="Random hands to generate (default: 2000)")
+    args = parser.parse_args()
+    benchmark(args.trace, args.hands)
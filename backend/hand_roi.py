@@ -0,0 +1,229 @@
+"""
+HAND ROI TRACKING
+Runs hand landmark inference on a padded crop around the hands found in the
+previous frame instead of the full 1280x720 frame.
+
+- The crop is the union of the previous hands' landmark boxes, padded and clamped
+  to the frame. Landmarks found in the crop are mapped back to full-frame
+  normalized coordinates in place, so downstream code doesn't notice.
+- Falls back to full-frame detection when a hand goes missing, handedness
+  confidence drops, a hand touches the crop border, or every
+  full_frame_interval frames (so a hand entering the frame is picked up).
+- Crops run on their own Hands graph, so the full-frame graph's tracking state
+  is never fed crop coordinates.
+
+HandROITracker has the same process()/close() interface as mp.solutions.hands.Hands,
+so it drops into ParallelInferenceRunner in place of the hands model.
+
+Benchmark on a recorded clip:
+    python3 hand_roi.py clip.mp4
+"""
+
+import time
+
+import numpy as np
+
+
+class HandROITracker:
+    """Hands model wrapper that crops to the previous frame's hands"""
+    def __init__(self, full_model, crop_model, padding=0.6, min_crop_px=192,
+                 max_crop_fraction=0.6, min_score=0.8, edge_margin=0.02,
+                 full_frame_interval=15, verbose=True):
+        self.full_model = full_model
+        self.crop_model = crop_model
+        self.padding = padding  # Extra margin around the hand box, relative to its size
+        self.min_crop_px = min_crop_px
+        self.max_crop_fraction = max_crop_fraction  # Bigger crops than this aren't worth it
+        self.min_score = min_score  # Handedness confidence below this triggers full-frame detection
+        self.edge_margin = edge_margin  # Landmarks this close to the crop border trigger full-frame
+        self.full_frame_interval = full_frame_interval
+        self.verbose = verbose
+
+        self.roi = None  # (x0, y0, x1, y1) in pixels, from the previous frame
+        self.expected_hands = 0
+        self.frames_since_full = 0
+
+        # Per-second stats
+        self.window_start = time.monotonic()
+        self.crop_frames = 0
+        self.full_frames = 0
+        self.fallbacks = 0
+        self.crop_area_sum = 0.0
+        self.last_report = None
+
+    def process(self, rgb_frame):
+        h, w = rgb_frame.shape[:2]
+        results = None
+
+        use_crop = (self.roi is not None and self.expected_hands > 0
+                    and self.frames_since_full < self.full_frame_interval)
+        if use_crop:
+            x0, y0, x1, y1 = self.roi
+            crop = np.ascontiguousarray(rgb_frame[y0:y1, x0:x1])
+            results = self.crop_model.process(crop)
+            if self._crop_ok(results):
+                self._map_to_frame(results, x0, y0, x1 - x0, y1 - y0, w, h)
+                self.crop_frames += 1
+                self.crop_area_sum += (x1 - x0) * (y1 - y0) / float(w * h)
+                self.frames_since_full += 1
+            else:
+                self.fallbacks += 1
+                results = None
+
+        if results is None:
+            # Full-frame detection (first frame, lost hand, low confidence, periodic refresh)
+            results = self.full_model.process(rgb_frame)
+            self.full_frames += 1
+            self.frames_since_full = 0
+
+        hands = results.multi_hand_landmarks if results and results.multi_hand_landmarks else []
+        self.expected_hands = len(hands)
+        self.roi = self._compute_roi(hands, w, h) if hands else None
+
+        self._report()
+        return results
+
+    def _crop_ok(self, results):
+        """Crop result is trusted only if every expected hand was found confidently and away from the border"""
+        if not results or not results.multi_hand_landmarks:
+            return False
+        if len(results.multi_hand_landmarks) < self.expected_hands:
+            return False
+        for handedness in (results.multi_handedness or []):
+            if handedness.classification[0].score < self.min_score:
+                return False
+        low, high = self.edge_margin, 1.0 - self.edge_margin
+        for hand in results.multi_hand_landmarks:
+            for landmark in hand.landmark:
+                if not (low < landmark.x < high and low < landmark.y < high):
+                    return False  # Hand is leaving the crop
+        return True
+
+    def _map_to_frame(self, results, x0, y0, crop_w, crop_h, w, h):
+        """Convert crop-normalized landmarks to full-frame normalized coordinates (in place)"""
+        sx, sy = crop_w / float(w), crop_h / float(h)
+        ox, oy = x0 / float(w), y0 / float(h)
+        for hand in results.multi_hand_landmarks:
+            for landmark in hand.landmark:
+                landmark.x = landmark.x * sx + ox
+                landmark.y = landmark.y * sy + oy
+                landmark.z = landmark.z * sx  # z is relative to image width
+
+    def _compute_roi(self, hands, w, h):
+        """Padded pixel box around all hands, or None if it would cover most of the frame"""
+        xs = [landmark.x for hand in hands for landmark in hand.landmark]
+        ys = [landmark.y for hand in hands for landmark in hand.landmark]
+        bx0, bx1 = min(xs) * w, max(xs) * w
+        by0, by1 = min(ys) * h, max(ys) * h
+
+        pad = self.padding * max(bx1 - bx0, by1 - by0)
+        size_x = max(bx1 - bx0 + 2 * pad, self.min_crop_px)
+        size_y = max(by1 - by0 + 2 * pad, self.min_crop_px)
+        cx, cy = (bx0 + bx1) / 2, (by0 + by1) / 2
+
+        x0 = int(max(0, cx - size_x / 2))
+        y0 = int(max(0, cy - size_y / 2))
+        x1 = int(min(w, cx + size_x / 2))
+        y1 = int(min(h, cy + size_y / 2))
+        if x1 - x0 < 16 or y1 - y0 < 16:
+            return None
+        if (x1 - x0) * (y1 - y0) > self.max_crop_fraction * w * h:
+            return None
+        return (x0, y0, x1, y1)
+
+    def _report(self):
+        now = time.monotonic()
+        if now - self.window_start < 1.0:
+            return
+        frames = self.crop_frames + self.full_frames
+        self.last_report = {
+            'crop_frames': self.crop_frames,
+            'full_frames': self.full_frames,
+            'fallbacks': self.fallbacks,
+            'crop_area_avg': self.crop_area_sum / self.crop_frames if self.crop_frames else 0.0,
+        }
+        if self.verbose and frames:
+            print(f"✂️  Hand ROI: {self.crop_frames}/{frames} cropped "
+                  f"(avg {self.last_report['crop_area_avg'] * 100:.0f}% of frame), "
+                  f"{self.fallbacks} fallbacks")
+        self.window_start = now
+        self.crop_frames = 0
+        self.full_frames = 0
+        self.fallbacks = 0
+        self.crop_area_sum = 0.0
+
+    def close(self):
+        self.full_model.close()
+        self.crop_model.close()
+
+
+def benchmark(source, max_frames=300):
+    """Compare full-frame vs ROI hand inference: latency and landmark deviation"""
+    import cv2
+    from inference import build_hand_model
+
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        print(f"Error: Could not open {source}")
+        return None
+
+    full_model = build_hand_model()
+    tracker = HandROITracker(build_hand_model(), build_hand_model(), verbose=False)
+
+    full_times, roi_times, errors = [], [], []
+    frames = 0
+    while frames < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames += 1
+        rgb_frame = cv2.cvtColor(cv2.flip(frame, 1), cv2.COLOR_BGR2RGB)
+
+        start = time.perf_counter()
+        full = full_model.process(rgb_frame)
+        full_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        roi = tracker.process(rgb_frame)
+        roi_times.append(time.perf_counter() - start)
+
+        if full.multi_hand_landmarks and roi.multi_hand_landmarks:
+            # Match hands by wrist position and compare in pixels
+            for hand in full.multi_hand_landmarks:
+                ref = np.array([(l.x * frame.shape[1], l.y * frame.shape[0]) for l in hand.landmark])
+                best = min(roi.multi_hand_landmarks,
+                           key=lambda other: abs(other.landmark[0].x - hand.landmark[0].x))
+                est = np.array([(l.x * frame.shape[1], l.y * frame.shape[0]) for l in best.landmark])
+                errors.append(float(np.mean(np.linalg.norm(ref - est, axis=1))))
+
+    cap.release()
+    full_model.close()
+    tracker.close()
+    if not frames:
+        print("No frames read")
+        return None
+
+    report = {
+        'frames': frames,
+        'full_mean_ms': float(np.mean(full_times) * 1000),
+        'full_std_ms': float(np.std(full_times) * 1000),
+        'roi_mean_ms': float(np.mean(roi_times) * 1000),
+        'roi_std_ms': float(np.std(roi_times) * 1000),
+        'landmark_error_px': float(np.mean(errors)) if errors else None,
+    }
+    print(f"Frames: {frames}")
+    print(f"Full frame: {report['full_mean_ms']:.1f}ms ± {report['full_std_ms']:.1f}ms")
+    print(f"Hand ROI:   {report['roi_mean_ms']:.1f}ms ± {report['roi_std_ms']:.1f}ms")
+    if errors:
+        print(f"Mean landmark deviation vs full frame: {report['landmark_error_px']:.1f}px")
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark hand ROI tracking vs full-frame hand inference")
+    parser.add_argument("source", help="Recorded video clip")
+    parser.add_argument("--frames", type=int, default=300, help="Max frames to use (default: 300)")
+    args = parser.parse_args()
+    benchmark(args.source, args.frames)
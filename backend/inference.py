@@ -0,0 +1,277 @@
+"""
+PARALLEL INFERENCE
+Runs the Hands, Pose and FaceMesh graphs on parallel worker threads.
+
+Each model gets its own worker thread (a MediaPipe graph must not be entered
+from two threads at once), and results are joined back together by frame id.
+MediaPipe releases the GIL while a graph runs, so threads are enough to
+overlap the three models: on frames where all three run, the wall time is
+roughly the slowest model instead of the sum.
+
+Benchmark on a recorded clip:
+    python3 inference.py clip.mp4
+"""
+
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+import mediapipe as mp
+
+
+def build_hand_model():
+    """Create a MediaPipe Hands graph (both hands, tracking mode)"""
+    # mp.solutions is looked up on use: the runner also serves the Tasks backend
+    # (tasks_backend.py), which works on MediaPipe builds without the legacy solutions
+    return mp.solutions.hands.Hands(
+        static_image_mode=False,
+        max_num_hands=2,
+        min_detection_confidence=0.7,
+        min_tracking_confidence=0.5
+    )
+
+
+def build_models(names=('hands', 'pose', 'face')):
+    """Create the requested MediaPipe graphs (optimized for 30 FPS): {'hands', 'pose', 'face'}"""
+    models = {}
+    if 'hands' in names:
+        models['hands'] = build_hand_model()
+
+    if 'pose' in names:
+        models['pose'] = mp.solutions.pose.Pose(
+            static_image_mode=False,
+            model_complexity=0,  # Reduced from 1 for faster processing
+            enable_segmentation=False,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5
+        )
+
+    if 'face' in names:
+        models['face'] = mp.solutions.face_mesh.FaceMesh(
+            max_num_faces=1,
+            refine_landmarks=False,  # Disabled refinement for speed
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5
+        )
+
+    return models
+
+
+def set_thread_affinity(cpus):
+    """Pin the calling thread to a set of CPUs (Linux). Returns the previous set, or None"""
+    if not cpus:
+        return None
+    if not hasattr(os, 'sched_setaffinity'):
+        print("⚠️  CPU affinity is not supported on this platform - ignoring")
+        return None
+    previous = os.sched_getaffinity(0)
+    os.sched_setaffinity(0, cpus)
+    return previous
+
+
+@contextmanager
+def pinned(cpus):
+    """Run a block pinned to cpus. Threads a model starts inside it (graph executors,
+    XNNPACK pools) inherit the mask, so build models inside it to confine them"""
+    previous = set_thread_affinity(cpus)
+    try:
+        yield
+    finally:
+        if previous is not None:
+            os.sched_setaffinity(0, previous)
+
+
+def _model_input(frames, name):
+    """frames is either one image for all models or a {model name: image} mapping"""
+    if isinstance(frames, dict) or hasattr(frames, 'for_model'):
+        return frames[name]
+    return frames
+
+
+class ModelWorker:
+    """Worker thread that owns one MediaPipe graph"""
+    def __init__(self, name, model, runner, cpus=None):
+        self.name = name
+        self.model = model
+        self.runner = runner
+        self.cpus = cpus
+        self.jobs = queue.Queue()
+        self.last_latency = 0.0
+        self.thread = threading.Thread(target=self._loop, daemon=True, name=f"inference-{name}")
+        self.thread.start()
+
+    def _loop(self):
+        set_thread_affinity(self.cpus)
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            frame_id, rgb_frame = job
+            start = time.perf_counter()
+            try:
+                result = self.model.process(rgb_frame)
+            except Exception as e:
+                print(f"Error in {self.name} inference: {e}")
+                result = None
+            self.last_latency = time.perf_counter() - start
+            self.runner._deliver(frame_id, self.name, result)
+
+    def stop(self):
+        self.jobs.put(None)
+        self.thread.join(timeout=1.0)
+
+
+class ParallelInferenceRunner:
+    """Sends one frame to several models in parallel and joins their results by frame id"""
+    def __init__(self, models, parallel=True, affinity=None):
+        self.models = models
+        self.parallel = parallel
+        self.workers = {}
+        self.latencies = {name: 0.0 for name in models}
+
+        # frame_id -> {'pending': set(names), 'results': {name: result}}
+        self.cond = threading.Condition()
+        self.frames = {}
+
+        if parallel:
+            for name, model in models.items():
+                self.workers[name] = ModelWorker(name, model, self, (affinity or {}).get(name))
+
+    def submit(self, frame_id, rgb_frame, names):
+        """
+        Start inference of the given models on a frame (non-blocking in parallel mode).
+        rgb_frame is one image for every model, or a per-model mapping such as a PyramidFrame.
+        """
+        with self.cond:
+            self.frames[frame_id] = {'pending': set(names), 'results': {}}
+
+        # Resolve per-model inputs here, on the submitting thread, so lazily built
+        # pyramid levels are never built by two workers at once
+        inputs = {name: _model_input(rgb_frame, name) for name in names}
+
+        if not self.parallel:
+            for name in names:
+                start = time.perf_counter()
+                try:
+                    result = self.models[name].process(inputs[name])
+                except Exception as e:
+                    print(f"Error in {name} inference: {e}")
+                    result = None
+                self.latencies[name] = time.perf_counter() - start
+                self._deliver(frame_id, name, result)
+            return
+
+        for name in names:
+            self.workers[name].jobs.put((frame_id, inputs[name]))
+
+    def _deliver(self, frame_id, name, result):
+        with self.cond:
+            entry = self.frames.get(frame_id)
+            if entry is None:
+                return
+            entry['results'][name] = result
+            entry['pending'].discard(name)
+            if name in self.workers:
+                self.latencies[name] = self.workers[name].last_latency
+            self.cond.notify_all()
+
+    def collect(self, frame_id, timeout=1.0):
+        """Wait for every model submitted for frame_id. Returns {name: result}"""
+        deadline = time.monotonic() + timeout
+        with self.cond:
+            entry = self.frames.get(frame_id)
+            if entry is None:
+                return {}
+            while entry['pending']:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    print(f"⚠️  Inference timeout on frame {frame_id}: {', '.join(sorted(entry['pending']))}")
+                    break
+                self.cond.wait(remaining)
+            del self.frames[frame_id]
+            return entry['results']
+
+    def run(self, frame_id, rgb_frame, names):
+        """Submit and wait: {name: result} for the requested models"""
+        self.submit(frame_id, rgb_frame, names)
+        return self.collect(frame_id)
+
+    def close(self):
+        """Stop the workers (the models themselves are closed by their owner)"""
+        for worker in self.workers.values():
+            worker.stop()
+        self.workers = {}
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def benchmark(source, max_frames=120):
+    """Compare sequential vs parallel wall time on frames where all three models run"""
+    import cv2
+
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        print(f"Error: Could not open {source}")
+        return None
+
+    frames = []
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(cv2.cvtColor(cv2.flip(frame, 1), cv2.COLOR_BGR2RGB))
+    cap.release()
+    if not frames:
+        print(f"No frames read from {source}")
+        return None
+    print(f"Loaded {len(frames)} frames from {source}")
+
+    report = {}
+    for mode in ('sequential', 'parallel'):
+        models = build_models()
+        runner = ParallelInferenceRunner(models, parallel=(mode == 'parallel'))
+        names = list(models.keys())
+
+        # Warm up so graph initialization isn't counted
+        runner.run(-1, frames[0], names)
+
+        times = []
+        for frame_id, rgb_frame in enumerate(frames):
+            start = time.perf_counter()
+            runner.run(frame_id, rgb_frame, names)
+            times.append(time.perf_counter() - start)
+
+        runner.close()
+        for model in models.values():
+            model.close()
+
+        report[mode] = {
+            'mean_ms': sum(times) / len(times) * 1000,
+            'p50_ms': _percentile(times, 50) * 1000,
+            'p95_ms': _percentile(times, 95) * 1000,
+        }
+        print(f"{mode:>10}: mean {report[mode]['mean_ms']:.1f}ms | "
+              f"p50 {report[mode]['p50_ms']:.1f}ms | p95 {report[mode]['p95_ms']:.1f}ms")
+
+    speedup = report['sequential']['mean_ms'] / max(report['parallel']['mean_ms'], 1e-6)
+    report['speedup'] = speedup
+    print(f"⚡ Speedup (hands + pose + face frames): {speedup:.2f}x")
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark parallel vs sequential MediaPipe inference")
+    parser.add_argument("source", help="Recorded video clip")
+    parser.add_argument("--frames", type=int, default=120, help="Max frames to use (default: 120)")
+    args = parser.parse_args()
+    benchmark(args.source, args.frames)
@@ -0,0 +1,208 @@
+"""
+INFERENCE BACKENDS
+Which runtime executes the landmark models, and on which CPUs.
+
+    solutions  mp.solutions graphs on ParallelInferenceRunner worker threads (default)
+    tasks      Tasks API landmarkers in LIVE_STREAM mode (tasks_backend.py)
+    litert     Hands on the LiteRT interpreter with XNNPACK (litert_hands.py),
+               pose and face as in solutions
+
+Every backend produces a {name: model} dict plus a runner with the
+ParallelInferenceRunner interface, so the pipeline doesn't care which one runs.
+
+Each model also gets a ModelRuntime, parsed from "name=value" options:
+- threads: inference thread count. Only the LiteRT interpreter takes one; the
+  MediaPipe graphs pick their own.
+- cpus: CPU affinity. The model is built pinned to these CPUs, so the threads
+  it starts (graph executor, XNNPACK pool) inherit them, and its worker thread
+  is pinned too. On a shared machine this keeps the graphs off each other's
+  cores and leaves cores free for the cursor thread. Linux only.
+
+Hand landmark latency per frame size, backend and thread count:
+    python3 inference_backends.py clip.mp4 --sizes full,960x540,640x360 --threads 1,2,4
+"""
+
+import time
+
+from inference import ParallelInferenceRunner, _percentile, pinned
+from preprocess import parse_size
+from startup import BackgroundBuild
+
+BACKENDS = ('solutions', 'tasks', 'litert')
+MODEL_NAMES = ('hands', 'pose', 'face')
+
+
+class ModelRuntime:
+    """CPU placement of one model: inference thread count and CPU affinity (None = runtime default)"""
+    def __init__(self, threads=None, cpus=None):
+        self.threads = threads
+        self.cpus = cpus
+
+    def __repr__(self):
+        threads = self.threads if self.threads else 'default'
+        cpus = ','.join(str(cpu) for cpu in sorted(self.cpus)) if self.cpus else 'any'
+        return f"threads={threads} cpus={cpus}"
+
+
+def parse_cpus(text):
+    """'0-3' / '0,2' / '4-5,7' -> {0, 1, 2, 3} ..."""
+    cpus = set()
+    for part in text.replace('+', ',').split(','):
+        if '-' in part:
+            first, last = part.split('-')
+            cpus.update(range(int(first), int(last) + 1))
+        elif part:
+            cpus.add(int(part))
+    return cpus
+
+
+def parse_runtime(threads=(), cpus=()):
+    """['hands=2', ...], ['hands=0-1', ...] -> {name: ModelRuntime} for every model"""
+    runtime = {name: ModelRuntime() for name in MODEL_NAMES}
+    for options, field, parse in ((threads, 'threads', int), (cpus, 'cpus', parse_cpus)):
+        for option in options or ():
+            name, _, value = option.partition('=')
+            if name not in runtime or not value:
+                raise ValueError(f"Expected <model>={field} with model one of {MODEL_NAMES}, got '{option}'")
+            setattr(runtime[name], field, parse(value))
+    return runtime
+
+
+def _build_model(backend, name, threads, model_dir, face_model='mesh'):
+    if name == 'face' and face_model != 'mesh' and backend != 'tasks':
+        from face_keypoints import build_face_model
+        return build_face_model(face_model)
+    if backend == 'tasks':
+        from tasks_backend import TaskModel, model_path
+        return TaskModel(name, model_path(name, model_dir))
+    if backend == 'litert' and name == 'hands':
+        from litert_hands import LiteRTHands
+        return LiteRTHands(threads=threads, model_dir=model_dir)
+    from inference import build_models
+    return build_models((name,))[name]
+
+
+def start_backend_build(backend, names, runtime=None, model_dir=None, face_model='mesh', timer=None):
+    """
+    Start building the requested models on a backend, one thread per model, each
+    pinned to its CPUs. Returns a BackgroundBuild; .result() gives {name: model}.
+    face_model='minimal' swaps FaceMesh for detector keypoints (face_keypoints.py).
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}' (expected one of {BACKENDS})")
+    if face_model != 'mesh' and backend == 'tasks' and 'face' in names:
+        print(f"⚠️  --face-model {face_model} needs the solutions or litert backend - using FaceLandmarker")
+    runtime = runtime or {}
+
+    def builder(name, config):
+        def build():
+            # Pinned on the build thread: the threads the model starts inherit the mask
+            with pinned(config.cpus):
+                return _build_model(backend, name, config.threads, model_dir, face_model)
+        return build
+
+    builders = {}
+    for name in MODEL_NAMES:
+        if name not in names:
+            continue
+        config = runtime.get(name) or ModelRuntime()
+        if config.threads and not (backend == 'litert' and name == 'hands'):
+            print(f"⚠️  {name}: the {backend} backend has no thread-count setting - use cpus to confine it")
+        builders[name] = builder(name, config)
+    return BackgroundBuild(builders, timer)
+
+
+def build_backend_models(backend, names, runtime=None, model_dir=None, face_model='mesh'):
+    """Create the requested models on a backend (concurrently) and wait for them: {name: model}"""
+    return start_backend_build(backend, names, runtime, model_dir, face_model).result()
+
+
+def build_runner(backend, models, parallel=True, runtime=None):
+    """Runner (submit / collect / run / latencies) for models built by build_backend_models"""
+    if backend == 'tasks':
+        from tasks_backend import TasksInferenceRunner
+        return TasksInferenceRunner(models)
+    affinity = {name: config.cpus for name, config in (runtime or {}).items() if config.cpus}
+    return ParallelInferenceRunner(models, parallel=parallel, affinity=affinity)
+
+
+def build_backend(backend, names, runtime=None, model_dir=None, parallel=True):
+    """(models, runner) for the given model names"""
+    models = build_backend_models(backend, names, runtime, model_dir)
+    return models, build_runner(backend, models, parallel, runtime)
+
+
+def benchmark(source, backends=BACKENDS, sizes=(None,), thread_counts=(None,), names=('hands',),
+              cpus=None, max_frames=120, model_dir=None):
+    """Per-frame inference latency for each backend x frame size (x thread count where the runtime takes one)"""
+    import cv2
+    from scheduler import _load_frames
+
+    frames = _load_frames(source, max_frames)
+    if not frames:
+        print("No frames read")
+        return None
+    full_h, full_w = frames[0].shape[:2]
+    print(f"Loaded {len(frames)} frames ({full_w}x{full_h}) from {source} | models: {', '.join(names)}")
+
+    report = []
+    for backend in backends:
+        counts = thread_counts if backend == 'litert' else (None,)
+        for threads in counts:
+            runtime = {name: ModelRuntime(threads, cpus) for name in names}
+            try:
+                models, runner = build_backend(backend, names, runtime, model_dir, parallel=True)
+            except Exception as e:
+                print(f"{backend:>9}: unavailable ({e})")
+                break
+            for size in sizes:
+                w, h = size or (full_w, full_h)
+                inputs = frames if size is None else [cv2.resize(f, (w, h), interpolation=cv2.INTER_AREA)
+                                                      for f in frames]
+                # Warm up so graph initialization isn't counted
+                runner.run(-1, inputs[0], names)
+                times = []
+                for frame_id, rgb_frame in enumerate(inputs):
+                    start = time.perf_counter()
+                    runner.run(frame_id, rgb_frame, names)
+                    times.append(time.perf_counter() - start)
+                row = {
+                    'backend': backend,
+                    'threads': threads,
+                    'size': f"{w}x{h}",
+                    'mean_ms': sum(times) / len(times) * 1000,
+                    'p50_ms': _percentile(times, 50) * 1000,
+                    'p95_ms': _percentile(times, 95) * 1000,
+                }
+                report.append(row)
+                label = f"{backend} x{threads}" if threads else backend
+                print(f"{label:>12} {row['size']:>9}: mean {row['mean_ms']:6.1f}ms | "
+                      f"p50 {row['p50_ms']:6.1f}ms | p95 {row['p95_ms']:6.1f}ms")
+            runner.close()
+            for model in models.values():
+                model.close()
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark inference backends per frame size and thread count")
+    parser.add_argument("source", help="Recorded video clip or session directory")
+    parser.add_argument("--backend", action="append", choices=BACKENDS, help="Backend to run (repeatable, default: all)")
+    parser.add_argument("--sizes", default="full,960x540,640x360",
+                        help="Comma-separated frame sizes, WxH or 'full' (default: full,960x540,640x360)")
+    parser.add_argument("--threads", default="",
+                        help="Comma-separated LiteRT thread counts (default: the runtime's choice)")
+    parser.add_argument("--cpus", default=None, help="Pin the models to these CPUs, e.g. 0-3")
+    parser.add_argument("--model", action="append", choices=MODEL_NAMES, help="Model to run (repeatable, default: hands)")
+    parser.add_argument("--frames", type=int, default=120, help="Max frames to use (default: 120)")
+    parser.add_argument("--model-dir", metavar="DIR", default=None,
+                        help="Directory with the .task (tasks) or .tflite (litert) model files")
+    args = parser.parse_args()
+    benchmark(args.source, tuple(args.backend or BACKENDS),
+              sizes=tuple(parse_size(size) for size in args.sizes.split(',')),
+              thread_counts=tuple(int(t) for t in args.threads.split(',') if t) or (None,),
+              names=tuple(args.model or ('hands',)),
+              cpus=parse_cpus(args.cpus) if args.cpus else None,
+              max_frames=args.frames, model_dir=args.model_dir)
@@ -0,0 +1,156 @@
+"""
+INPUT SINKS
+Where the controllers send keyboard and mouse input.
+
+- SystemInputSink: real input (PyAutoGUI for keys/clicks, Quartz CGEvents for
+  relative mouse movement). Dependencies are imported on first use, so the
+  controllers can be imported on machines without a display or without Quartz.
+- RecordingSink: records every event with a monotonic timestamp and optionally
+  forwards it to another sink. Used to capture controller output during
+  recording and replay sessions.
+"""
+
+import threading
+import time
+
+
+class SystemInputSink:
+    """Injects real keyboard/mouse input into the OS"""
+    def __init__(self):
+        self._pyautogui = None
+
+    @property
+    def pyautogui(self):
+        if self._pyautogui is None:
+            import pyautogui
+            # PyAutoGUI Configuration for continuous key holding
+            pyautogui.PAUSE = 0  # Remove pause for continuous operation
+            pyautogui.FAILSAFE = False  # Disable failsafe for gesture control
+            self._pyautogui = pyautogui
+        return self._pyautogui
+
+    def warm_up(self):
+        """Import PyAutoGUI and Quartz up front (no events sent) so the first gun lock doesn't stall"""
+        self.pyautogui
+        try:
+            import Quartz.CoreGraphics  # noqa: F401 (macOS only)
+        except ImportError:
+            pass
+
+    def keyDown(self, key):
+        self.pyautogui.keyDown(key)
+
+    def keyUp(self, key):
+        self.pyautogui.keyUp(key)
+
+    def press(self, key):
+        self.pyautogui.press(key)
+
+    def mouseDown(self, button='left'):
+        self.pyautogui.mouseDown(button=button)
+
+    def mouseUp(self, button='left'):
+        self.pyautogui.mouseUp(button=button)
+
+    def move_relative(self, delta_x, delta_y):
+        """Use native macOS CGEvent with delta fields for Krunker Pointer Lock compatibility"""
+        try:
+            from Quartz.CoreGraphics import (
+                CGEventCreate, CGEventGetLocation, CGEventCreateMouseEvent,
+                CGEventSetIntegerValueField, CGEventPost, kCGHIDEventTap,
+                kCGEventMouseMoved, kCGMouseEventDeltaX, kCGMouseEventDeltaY,
+                CGDisplayBounds, CGMainDisplayID, CGWarpMouseCursorPosition
+            )
+
+            # Get screen bounds
+            screen_bounds = CGDisplayBounds(CGMainDisplayID())
+            screen_width = screen_bounds.size.width
+            screen_height = screen_bounds.size.height
+            screen_center_x = screen_width / 2
+            screen_center_y = screen_height / 2
+
+            # Get current mouse position
+            event = CGEventCreate(None)
+            current_pos = CGEventGetLocation(event)
+
+            # Strategy: Keep cursor centered to work with Pointer Lock
+            # Pointer Lock expects the cursor to stay in one place while deltas are sent
+            # If cursor drifts too far from center, recenter it
+            distance_from_center = ((current_pos.x - screen_center_x)**2 + (current_pos.y - screen_center_y)**2)**0.5
+
+            if distance_from_center > 50:  # If more than 50px from center, recenter
+                # Silently recenter cursor without sending movement event
+                CGWarpMouseCursorPosition((screen_center_x, screen_center_y))
+                new_x = screen_center_x
+                new_y = screen_center_y
+            else:
+                # Keep cursor near center
+                new_x = screen_center_x
+                new_y = screen_center_y
+
+            # Create mouse move event at center position
+            move_event = CGEventCreateMouseEvent(None, kCGEventMouseMoved, (new_x, new_y), 0)
+
+            # Set the delta fields - THIS is what Pointer Lock reads for camera movement
+            CGEventSetIntegerValueField(move_event, kCGMouseEventDeltaX, int(delta_x))
+            CGEventSetIntegerValueField(move_event, kCGMouseEventDeltaY, int(delta_y))
+
+            # Post the event
+            CGEventPost(kCGHIDEventTap, move_event)
+
+        except Exception as e:
+            print(f"Native mouse error: {e}")
+
+
+class RecordingSink:
+    """Records input events (and optionally forwards them to another sink)"""
+    def __init__(self, forward=None):
+        self.forward = forward
+        self.lock = threading.Lock()
+        self.events = []
+
+    def _record(self, action, *args):
+        with self.lock:
+            self.events.append([round(time.monotonic(), 6), action] + list(args))
+        if self.forward is not None:
+            getattr(self.forward, action)(*args)
+
+    def warm_up(self):
+        if self.forward is not None and hasattr(self.forward, 'warm_up'):
+            self.forward.warm_up()
+
+    def keyDown(self, key):
+        self._record('keyDown', key)
+
+    def keyUp(self, key):
+        self._record('keyUp', key)
+
+    def press(self, key):
+        self._record('press', key)
+
+    def mouseDown(self, button='left'):
+        self._record('mouseDown', button)
+
+    def mouseUp(self, button='left'):
+        self._record('mouseUp', button)
+
+    def move_relative(self, delta_x, delta_y):
+        self._record('move_relative', int(delta_x), int(delta_y))
+
+    def drain(self):
+        """Return and clear the events recorded so far"""
+        with self.lock:
+            events = self.events
+            self.events = []
+        return events
+
+
+# Shared default sink for controllers created without an explicit one
+_default_sink = None
+
+
+def default_sink():
+    global _default_sink
+    if _default_sink is None:
+        _default_sink = SystemInputSink()
+    return _default_sink
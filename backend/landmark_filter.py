@@ -0,0 +1,187 @@
+"""
+LANDMARK FILTERING
+One-Euro filtering of whole landmark arrays, applied in ControlCore.decide()
+before gestures, head pose, body lean and cursor deltas see the landmarks.
+
+A One-Euro filter is a low-pass filter whose cutoff rises with speed: when a
+landmark is still, a low cutoff removes jitter, and when it moves fast the
+cutoff opens up so there is little lag. Unlike a fixed dead zone or hysteresis
+band, it doesn't have to pick one lag/jitter trade-off for all motion.
+Time steps come from capture timestamps, so dropped or late frames are handled
+correctly.
+
+OneEuroFilterBank filters an array of any shape elementwise (e.g. a hand's
+(21, 3) landmarks) in one NumPy pass. LandmarkFilter keeps one bank per
+source (left hand, right hand, face keypoints, pose) and returns landmark
+views the gesture functions take unchanged.
+
+Compare controller output with and without filtering on a landmark trace:
+    python3 landmark_filter.py run1.fgt
+"""
+
+import math
+
+import numpy as np
+
+from gestures import FACE_KEYPOINTS
+from landmark_trace import LandmarkListView, SparseFaceLandmarks, landmarks_to_array
+
+# (min_cutoff Hz, beta, d_cutoff Hz) per source; speeds are in normalized image units per second
+DEFAULT_PARAMS = {
+    'hand': (1.5, 15.0, 1.0),
+    'face': (1.0, 8.0, 1.0),
+    'pose': (1.0, 8.0, 1.0),
+}
+
+
+def _alpha(cutoff, dt):
+    tau = 1.0 / (2 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class OneEuroFilterBank:
+    """Elementwise One-Euro filter over an array of signals sampled at the same timestamps"""
+    def __init__(self, min_cutoff=1.0, beta=0.0, d_cutoff=1.0, reset_after=0.5):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset_after = reset_after  # Gap (s) after which the filter restarts from the raw value
+        self.reset()
+
+    def reset(self):
+        self.x = None
+        self.dx = None
+        self.t = None
+
+    def __call__(self, values, t):
+        """Filtered copy of values (the filter's own state is updated in place on the next call)"""
+        values = np.asarray(values, dtype=np.float64)
+        if (self.x is None or values.shape != self.x.shape or t is None
+                or t <= self.t or t - self.t > self.reset_after):
+            self.x = values.copy()
+            self.dx = np.zeros_like(values)
+            self.t = t
+            return self.x.copy()
+
+        dt = t - self.t
+        # Smoothed speed -> per-element cutoff -> per-element smoothing factor
+        dx = (values - self.x) / dt
+        self.dx += _alpha(self.d_cutoff, dt) * (dx - self.dx)
+        cutoff = self.min_cutoff + self.beta * np.abs(self.dx)
+        alpha = 1.0 / (1.0 + 1.0 / (2 * np.pi * cutoff * dt))
+        self.x += alpha * (values - self.x)
+        self.t = t
+        return self.x.copy()
+
+
+class LandmarkFilter:
+    """One-Euro filter banks for the landmark sources the controllers use"""
+    def __init__(self, params=None, face_keypoints=FACE_KEYPOINTS):
+        self.params = dict(DEFAULT_PARAMS)
+        if params:
+            self.params.update(params)
+        self.face_keypoints = list(face_keypoints)
+        self.banks = {}
+
+    def _bank(self, key, kind):
+        bank = self.banks.get(key)
+        if bank is None:
+            min_cutoff, beta, d_cutoff = self.params[kind]
+            bank = self.banks[key] = OneEuroFilterBank(min_cutoff, beta, d_cutoff)
+        return bank
+
+    def reset(self, key=None):
+        for name, bank in self.banks.items():
+            if key is None or name == key:
+                bank.reset()
+
+    def hand(self, key, hand_landmarks, t):
+        """Filtered hand (21 landmarks) for a stable key such as 'left' / 'right'"""
+        if hand_landmarks is None:
+            self.reset(key)
+            return None
+        array = landmarks_to_array(hand_landmarks, 21)
+        return LandmarkListView(self._bank(key, 'hand')(array, t))
+
+    def face(self, face_landmarks, t):
+        """Filtered face keypoints (the ones head pose and mouth open use)"""
+        if face_landmarks is None:
+            self.reset('face')
+            return None
+        landmarks = face_landmarks.landmark
+        array = np.array([(landmarks[i].x, landmarks[i].y, landmarks[i].z) for i in self.face_keypoints])
+        filtered = self._bank('face', 'face')(array, t)
+        return SparseFaceLandmarks(self.face_keypoints, filtered[:, :2], filtered[:, 2])
+
+    def pose(self, pose_landmarks, t):
+        """Filtered pose (x, y, z filtered; visibility passed through)"""
+        if pose_landmarks is None:
+            self.reset('pose')
+            return None
+        array = landmarks_to_array(pose_landmarks, 33, with_visibility=True)
+        array[:, :3] = self._bank('pose', 'pose')(array[:, :3], t)
+        return LandmarkListView(array)
+
+
+def _jitter(values):
+    """Median absolute frame-to-frame change"""
+    values = np.asarray(values, dtype=np.float64)
+    return float(np.median(np.abs(np.diff(values)))) if len(values) > 1 else 0.0
+
+
+def _lag_ms(timestamps, raw, filtered, max_lag=0.2):
+    """Time shift (ms) that best aligns the filtered signal with the raw one"""
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    raw, filtered = np.asarray(raw, dtype=np.float64), np.asarray(filtered, dtype=np.float64)
+    lags = np.arange(0.0, max_lag + 1e-9, 0.002)
+    errors = [np.mean((filtered - np.interp(timestamps - lag, timestamps, raw)) ** 2) for lag in lags]
+    return float(lags[int(np.argmin(errors))] * 1000)
+
+
+def benchmark(path, scheme=None):
+    """Replay a trace with and without filtering: key chatter, signal jitter and added lag"""
+    from controllers import ControlCore
+    from input_sink import RecordingSink
+    from landmark_trace import replay_trace
+
+    report = {}
+    runs = {}
+    for name, landmark_filter in (('raw', None), ('one-euro', LandmarkFilter())):
+        core = ControlCore(output=RecordingSink(), scheme=scheme, landmark_filter=landmark_filter)
+        results, _ = replay_trace(path, core=core)
+        runs[name] = results
+        events = [event for record in results for event in record.get('events') or []]
+        # keyDown repeats every frame while held, so releases count the presses
+        key_releases = sum(1 for event in events if event[1] == 'keyUp' and event[2] in 'wasd')
+        key_changes = sum(1 for a, b in zip(results, results[1:]) if a['wasd'] != b['wasd'])
+        report[name] = {
+            'wasd_changes': key_changes,
+            'wasd_releases': key_releases,
+            'scope_changes': sum(1 for a, b in zip(results, results[1:]) if a['tongue_out'] != b['tongue_out']),
+            'pitch_jitter': _jitter([r['head_pitch'] for r in results]),
+            'yaw_jitter': _jitter([r['head_yaw'] for r in results]),
+        }
+
+    from landmark_trace import TraceReader
+    timestamps = np.asarray(TraceReader(path).timestamp, dtype=np.float64)
+    for signal in ('head_pitch', 'head_yaw'):
+        raw = [r[signal] for r in runs['raw']]
+        filtered = [r[signal] for r in runs['one-euro']]
+        report['one-euro'][f'{signal}_lag_ms'] = _lag_ms(timestamps, raw, filtered)
+
+    for name, r in report.items():
+        print(f"{name:>9}: WASD changes {r['wasd_changes']} ({r['wasd_releases']} key releases) | "
+              f"scope changes {r['scope_changes']} | jitter pitch {r['pitch_jitter']:.2f} yaw {r['yaw_jitter']:.2f}")
+    print(f"{'':>9}  added lag: pitch {report['one-euro']['head_pitch_lag_ms']:.0f}ms, "
+          f"yaw {report['one-euro']['head_yaw_lag_ms']:.0f}ms")
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare controller output with and without One-Euro filtering")
+    parser.add_argument("trace", help="Landmark trace file (--trace)")
+    parser.add_argument("--scheme", default=None, help="Control scheme (default: head-tilt)")
+    args = parser.parse_args()
+    benchmark(args.trace, args.scheme)
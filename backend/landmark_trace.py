@@ -0,0 +1,391 @@
+"""
+LANDMARK TRACES
+Compact binary format for per-frame MediaPipe landmarks, so gesture and
+controller changes can be tested without re-running MediaPipe.
+
+File layout:
+    8 bytes   magic b'FGTRACE1'
+    4 bytes   header length (little-endian uint32)
+    header    JSON: format version + record dtype description
+    records   fixed-size TRACE_DTYPE records, back to back (starts 64-byte aligned)
+
+Each record holds one frame: timestamp, up to two hands (21 x/y/z landmarks,
+handedness label and score, in MediaPipe detection order), one face (468
+landmarks) and one pose (33 landmarks with visibility), plus presence flags.
+
+TraceReader memory-maps the file: every column (e.g. reader.hands, shape
+(N, 2, 21, 3)) is a zero-copy NumPy view, and frames can be handed to the
+existing gesture functions through LandmarkListView, which only needs NumPy.
+Neither MediaPipe nor OpenCV is required to read or replay a trace.
+
+Usage:
+    python3 landmark_trace.py replay trace.fgt      # run the controllers over a trace
+    python3 landmark_trace.py info trace.fgt
+"""
+
+import json
+import os
+import struct
+
+import numpy as np
+
+from gestures import FACE_KEYPOINTS
+
+MAGIC = b'FGTRACE1'
+FORMAT_VERSION = 1
+HEADER_ALIGN = 64
+
+NUM_HAND_LANDMARKS = 21
+NUM_FACE_LANDMARKS = 468
+NUM_POSE_LANDMARKS = 33
+
+# Handedness labels as stored in the trace
+HANDEDNESS_UNKNOWN = -1
+HANDEDNESS_LEFT = 0
+HANDEDNESS_RIGHT = 1
+
+TRACE_DTYPE = np.dtype([
+    ('frame_id', '<u4'),
+    ('timestamp', '<f8'),                                   # Monotonic capture time (s)
+    ('hand_present', 'u1', (2,)),
+    ('handedness', 'i1', (2,)),                             # HANDEDNESS_* per hand slot
+    ('hand_score', '<f4', (2,)),
+    ('hands', '<f4', (2, NUM_HAND_LANDMARKS, 3)),          # x, y, z (normalized)
+    ('face_present', 'u1'),
+    ('face', '<f4', (NUM_FACE_LANDMARKS, 3)),              # x, y, z (normalized)
+    ('pose_present', 'u1'),
+    ('pose', '<f4', (NUM_POSE_LANDMARKS, 4)),              # x, y, z, visibility
+])
+
+
+class LandmarkPoint:
+    """One landmark with .x/.y/.z/.visibility, like a MediaPipe NormalizedLandmark"""
+    __slots__ = ('x', 'y', 'z', 'visibility')
+
+    def __init__(self, x, y, z, visibility=0.0):
+        self.x = x
+        self.y = y
+        self.z = z
+        self.visibility = visibility
+
+
+class LandmarkListView:
+    """Array-backed stand-in for a MediaPipe NormalizedLandmarkList (.landmark[i].x ...)"""
+    __slots__ = ('array', 'landmark')
+
+    def __init__(self, array):
+        self.array = array
+        rows = array.tolist()
+        if array.shape[1] >= 4:
+            self.landmark = [LandmarkPoint(r[0], r[1], r[2], r[3]) for r in rows]
+        else:
+            self.landmark = [LandmarkPoint(r[0], r[1], r[2]) for r in rows]
+
+
+class SparseFaceLandmarks:
+    """Face landmarks for a subset of FaceMesh indices (.landmark[i].x / .y / .z)"""
+    __slots__ = ('landmark',)
+
+    def __init__(self, indices, points, z):
+        self.landmark = {index: LandmarkPoint(float(x), float(y), float(depth))
+                         for index, (x, y), depth in zip(indices, points, z)}
+
+    @classmethod
+    def from_array(cls, indices, array):
+        """indices + their (len(indices), 3) x/y/z rows"""
+        view = cls.__new__(cls)
+        view.landmark = {index: LandmarkPoint(x, y, z) for index, (x, y, z) in zip(indices, array.tolist())}
+        return view
+
+
+def landmarks_to_array(landmark_list, count, with_visibility=False):
+    """MediaPipe landmark list (or LandmarkListView) -> float32 array (count, 3 or 4)"""
+    if isinstance(landmark_list, LandmarkListView):
+        return np.asarray(landmark_list.array[:count, :4 if with_visibility else 3], dtype=np.float32)
+    if isinstance(landmark_list.landmark, dict):
+        # SparseFaceLandmarks: only the tracked indices are filled in
+        array = np.zeros((count, 4 if with_visibility else 3), dtype=np.float32)
+        for index, l in landmark_list.landmark.items():
+            if index < count:
+                array[index, :3] = (l.x, l.y, l.z)
+        return array
+    if with_visibility:
+        values = [(l.x, l.y, l.z, l.visibility) for l in landmark_list.landmark[:count]]
+        return np.asarray(values, dtype=np.float32).reshape(-1, 4)
+    values = [(l.x, l.y, l.z) for l in landmark_list.landmark[:count]]
+    return np.asarray(values, dtype=np.float32).reshape(-1, 3)
+
+
+def array_to_proto(array):
+    """float32 array (N, 3 or 4) -> MediaPipe NormalizedLandmarkList (needs mediapipe)"""
+    from mediapipe.framework.formats import landmark_pb2
+
+    landmark_list = landmark_pb2.NormalizedLandmarkList()
+    for row in array.tolist():
+        landmark = landmark_list.landmark.add()
+        landmark.x, landmark.y, landmark.z = row[0], row[1], row[2]
+        if len(row) > 3:
+            landmark.visibility = row[3]
+    return landmark_list
+
+
+def to_landmark_list(array):
+    """float32 array (N, 3 or 4) -> landmark list: a proto where MediaPipe's legacy formats exist
+    (so mp.solutions.drawing_utils can draw it), else a LandmarkListView"""
+    try:
+        return array_to_proto(array)
+    except ImportError:
+        return LandmarkListView(array)
+
+
+class Classification:
+    """One handedness label, like a MediaPipe Classification proto"""
+    __slots__ = ('index', 'label', 'score')
+
+    def __init__(self, index, label, score):
+        self.index = index
+        self.label = label
+        self.score = score
+
+
+class ClassificationList:
+    __slots__ = ('classification',)
+
+    def __init__(self, classification):
+        self.classification = classification
+
+
+class LegacyResults:
+    """Result of a non-legacy backend in the mp.solutions shape (only its own model's fields are set)"""
+    __slots__ = ('multi_hand_landmarks', 'multi_handedness', 'pose_landmarks', 'multi_face_landmarks')
+
+    def __init__(self, multi_hand_landmarks=None, multi_handedness=None, pose_landmarks=None,
+                 multi_face_landmarks=None):
+        self.multi_hand_landmarks = multi_hand_landmarks
+        self.multi_handedness = multi_handedness
+        self.pose_landmarks = pose_landmarks
+        self.multi_face_landmarks = multi_face_landmarks
+
+
+def _handedness_label(classification_list):
+    try:
+        label = classification_list.classification[0].label
+        score = classification_list.classification[0].score
+    except (AttributeError, IndexError):
+        return HANDEDNESS_UNKNOWN, 0.0
+    if label == 'Left':
+        return HANDEDNESS_LEFT, score
+    if label == 'Right':
+        return HANDEDNESS_RIGHT, score
+    return HANDEDNESS_UNKNOWN, score
+
+
+def fill_record(record, frame_id, timestamp, hand_results=None, face_results=None, pose_results=None):
+    """Fill one TRACE_DTYPE record from MediaPipe result objects"""
+    record['frame_id'] = frame_id
+    record['timestamp'] = timestamp if timestamp is not None else 0.0
+    record['hand_present'] = 0
+    record['handedness'] = HANDEDNESS_UNKNOWN
+    record['hand_score'] = 0.0
+    record['face_present'] = 0
+    record['pose_present'] = 0
+
+    if hand_results is not None and hand_results.multi_hand_landmarks:
+        handedness = getattr(hand_results, 'multi_handedness', None) or []
+        for slot, hand in enumerate(hand_results.multi_hand_landmarks[:2]):
+            record['hands'][slot] = landmarks_to_array(hand, NUM_HAND_LANDMARKS)
+            record['hand_present'][slot] = 1
+            if slot < len(handedness):
+                record['handedness'][slot], record['hand_score'][slot] = _handedness_label(handedness[slot])
+
+    if face_results is not None and face_results.multi_face_landmarks:
+        face = landmarks_to_array(face_results.multi_face_landmarks[0], NUM_FACE_LANDMARKS)
+        record['face'][:len(face)] = face
+        record['face_present'] = 1
+
+    if pose_results is not None and pose_results.pose_landmarks:
+        record['pose'] = landmarks_to_array(pose_results.pose_landmarks, NUM_POSE_LANDMARKS, with_visibility=True)
+        record['pose_present'] = 1
+    return record
+
+
+class TraceWriter:
+    """Appends frames to a trace file (buffered, fixed-size records)"""
+    def __init__(self, path, buffer_frames=256):
+        self.path = path
+        self.file = open(path, 'wb')
+        self.buffer = np.zeros(buffer_frames, dtype=TRACE_DTYPE)
+        self.buffered = 0
+        self.count = 0
+        self._write_header()
+
+    def _write_header(self):
+        header = json.dumps({'version': FORMAT_VERSION, 'dtype': TRACE_DTYPE.descr}).encode()
+        header_size = len(MAGIC) + 4 + len(header)
+        padding = (-header_size) % HEADER_ALIGN
+        self.file.write(MAGIC + struct.pack('<I', len(header) + padding) + header + b' ' * padding)
+
+    def next_record(self):
+        """Return the next empty record to fill in place"""
+        if self.buffered == len(self.buffer):
+            self.flush()
+        record = self.buffer[self.buffered]
+        self.buffered += 1
+        self.count += 1
+        return record
+
+    def write_results(self, frame_id, timestamp, hand_results=None, face_results=None, pose_results=None):
+        """Append one frame of MediaPipe results"""
+        fill_record(self.next_record(), frame_id, timestamp, hand_results, face_results, pose_results)
+
+    def write_array(self, records):
+        """Append a TRACE_DTYPE array"""
+        self.flush()
+        self.file.write(np.ascontiguousarray(records, dtype=TRACE_DTYPE).tobytes())
+        self.count += len(records)
+
+    def flush(self):
+        if self.buffered:
+            self.file.write(self.buffer[:self.buffered].tobytes())
+            self.buffer[:self.buffered] = np.zeros(1, dtype=TRACE_DTYPE)
+            self.buffered = 0
+        self.file.flush()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+        print(f"📝 Wrote {self.count} frames to landmark trace {self.path}")
+
+
+class TraceReader:
+    """Memory-mapped trace reader. Columns are zero-copy views: reader.hands, reader.face, ..."""
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            magic = f.read(len(MAGIC))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a landmark trace")
+            header_len = struct.unpack('<I', f.read(4))[0]
+            header = json.loads(f.read(header_len).decode().rstrip())
+        if header.get('version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported trace version: {header.get('version')}")
+
+        dtype = np.dtype([tuple(field) if len(field) == 2 else (field[0], field[1], tuple(field[2]))
+                          for field in header['dtype']])
+        if dtype != TRACE_DTYPE:
+            raise ValueError("Trace record layout doesn't match this version of the reader")
+
+        offset = len(MAGIC) + 4 + header_len
+        if os.path.getsize(path) > offset:
+            self.records = np.memmap(path, dtype=TRACE_DTYPE, mode='r', offset=offset)
+        else:
+            self.records = np.zeros(0, dtype=TRACE_DTYPE)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getattr__(self, name):
+        # Column access: reader.timestamp, reader.hands, reader.hand_present, ...
+        if name in TRACE_DTYPE.names:
+            return self.records[name]
+        raise AttributeError(name)
+
+    def hand_views(self, index):
+        """Hands of one frame as landmark list views, in MediaPipe detection order"""
+        record = self.records[index]
+        return [LandmarkListView(record['hands'][slot]) for slot in range(2) if record['hand_present'][slot]]
+
+    def face_view(self, index):
+        """The face keypoints the controllers read (FACE_KEYPOINTS), not all 468 landmarks"""
+        record = self.records[index]
+        if not record['face_present']:
+            return None
+        return SparseFaceLandmarks.from_array(FACE_KEYPOINTS, record['face'][FACE_KEYPOINTS])
+
+    def pose_view(self, index):
+        record = self.records[index]
+        return LandmarkListView(record['pose']) if record['pose_present'] else None
+
+
+def replay_trace(path, core=None, frame_width=1280, frame_height=720, control_enabled=True, scheme=None,
+                 landmark_filter=True):
+    """
+    Run the controller layer over every frame of a trace (no MediaPipe / OpenCV needed).
+    Input goes to a RecordingSink. Returns (per-frame results, elapsed seconds).
+    Landmarks are One-Euro filtered like in the live app unless landmark_filter is False
+    (only used when core is None).
+    The cursor ticks, key debounces and hold timers all run on the trace's timestamps,
+    so replaying the same trace twice gives the same events as the session it recorded.
+    Frames go through the controllers one at a time (a few thousand frames/s); for bulk
+    threshold evaluation, gestures.classify_hands over reader.hands is far faster.
+    """
+    import time
+    from controllers import ControlCore
+    from input_sink import RecordingSink
+    from landmark_filter import LandmarkFilter
+
+    reader = TraceReader(path)
+    if core is None:
+        core = ControlCore(output=RecordingSink(), scheme=scheme,
+                           landmark_filter=LandmarkFilter() if landmark_filter else None)
+    core.control_enabled = control_enabled
+    cursor = core.mouse_controller.krunker_controller
+    cursor.use_thread = False  # Ticks are driven below, on the trace's clock
+    tick = 1.0 / cursor.cursor_update_rate
+    timestamps = reader.timestamp.tolist()
+    next_tick = timestamps[0] if timestamps else 0.0
+
+    results = []
+    start = time.perf_counter()
+    for index in range(len(reader)):
+        hands = reader.hand_views(index)
+        state = core.decide(reader.face_view(index), hands or None, frame_width, frame_height,
+                            reader.pose_view(index), timestamp=timestamps[index])
+        core.act(state)
+        # Cursor ticks up to the next frame
+        end = timestamps[index + 1] if index + 1 < len(timestamps) else timestamps[index]
+        while next_tick < end:
+            cursor._tick(next_tick)
+            next_tick += tick
+        record = core.results(state)
+        record['frame_id'] = int(reader.records[index]['frame_id'])
+        if hasattr(core.output, 'drain'):
+            record['events'] = core.output.drain()
+        results.append(record)
+    elapsed = time.perf_counter() - start
+    core.release_all()
+    return results, elapsed
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect or replay a landmark trace")
+    parser.add_argument("command", choices=["info", "replay"])
+    parser.add_argument("trace", help="Landmark trace file")
+    parser.add_argument("--results", metavar="FILE", help="With replay: write per-frame results as JSON lines")
+    parser.add_argument("--scheme", default=None, help="With replay: control scheme (head-tilt, body-lean, hands-only)")
+    parser.add_argument("--no-landmark-filter", action="store_true",
+                        help="With replay: use raw landmarks instead of One-Euro filtered ones")
+    args = parser.parse_args()
+
+    if args.command == "info":
+        reader = TraceReader(args.trace)
+        n = len(reader)
+        duration = float(reader.timestamp[-1] - reader.timestamp[0]) if n > 1 else 0.0
+        print(f"{args.trace}: {n} frames, {duration:.1f}s, {TRACE_DTYPE.itemsize} bytes/frame")
+        if n:
+            print(f"  hands: {reader.hand_present.sum(axis=0).tolist()} (slot 0, slot 1)")
+            print(f"  face:  {int(reader.face_present.sum())}")
+            print(f"  pose:  {int(reader.pose_present.sum())}")
+    else:
+        results, elapsed = replay_trace(args.trace, scheme=args.scheme,
+                                        landmark_filter=not args.no_landmark_filter)
+        print(f"⏯️  Replayed {len(results)} frames through the controllers in {elapsed:.2f}s "
+              f"({len(results) / max(elapsed, 1e-9):.0f} frames/s)")
+        print("   For bulk gesture evaluation, gestures.classify_hands over the trace's hands is much faster")
+        if args.results:
+            with open(args.results, 'w') as f:
+                for record in results:
+                    f.write(json.dumps(record) + '\n')
+            print(f"📈 Controller results written to {args.results}")
@@ -13,19 +13,29 @@ Controls:
 import cv2
 import mediapipe as mp
 import numpy as np
-import pyautogui
 import time
-import threading
-from Quartz import (
-    CGEventCreateMouseEvent, CGEventPost, CGEventSourceCreate,
-    kCGEventMouseMoved, kCGEventLeftMouseDown, kCGEventLeftMouseUp,
-    kCGEventSourceStateHIDSystemState, kCGHIDEventTap,
-    CGEventSetIntegerValueField, kCGEventSourceStatePrivate
-)
-
-# PyAutoGUI Configuration for continuous key holding
-pyautogui.PAUSE = 0  # Remove pause for continuous operation
-pyautogui.FAILSAFE = False  # Disable failsafe for gesture control
+import argparse
+import os
+from controllers import ControlCore
+from frame_grabber import LatestFrameGrabber
+from input_sink import default_sink, RecordingSink
+from inference import build_hand_model, pinned
+from hand_roi import HandROITracker
+from control_schemes import CONTROL_SCHEMES, DEFAULT_SCHEME
+from scheduler import SCHEDULERS, build_scheduler, ScheduleLog
+from face_flow import FaceKeypointTracker
+from cursor_predictor import PREDICTOR_MODELS
+from landmark_filter import LandmarkFilter
+from inference_backends import BACKENDS, start_backend_build, build_runner, parse_runtime
+from startup import StartupTimer, synthetic_frame, warm_up
+from face_keypoints import FACE_MODELS
+from gesture_table import load_gesture_table
+from gesture_model import GestureModel
+from preprocess import FrameBufferPool, FramePyramid, mirror_to_rgb, parse_size
+from pipeline import Pipeline, Stage, FramePacket, END_OF_STREAM, DROP_POLICIES
+from session_recorder import SessionRecorder, ReplayFrameSource, ResultsLog
+from landmark_trace import TraceWriter
+from control_channel import ControlChannel, DEFAULT_PORT
 
 # MediaPipe initialization
 mp_hands = mp.solutions.hands
@@ -33,830 +43,152 @@ mp_pose = mp.solutions.pose
 mp_face_mesh = mp.solutions.face_mesh
 mp_drawing = mp.solutions.drawing_utils
 
-def calculate_angle(point1, point2, point3):
-    vector1 = np.array([point1[0] - point2[0], point1[1] - point2[1]])
-    vector2 = np.array([point3[0] - point2[0], point3[1] - point2[1]])
-    cosine = np.dot(vector1, vector2) / (np.linalg.norm(vector1) * np.linalg.norm(vector2) + 1e-6)
-    angle = np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0)))
-    return angle
-
-def is_finger_extended(landmarks, finger_tip_id, finger_pip_id, finger_mcp_id):
-    tip = [landmarks[finger_tip_id].x, landmarks[finger_tip_id].y]
-    pip = [landmarks[finger_pip_id].x, landmarks[finger_pip_id].y]
-    mcp = [landmarks[finger_mcp_id].x, landmarks[finger_mcp_id].y]
-    angle = calculate_angle(tip, pip, mcp)
-    return angle > 140  # Increased threshold to be more strict
-
-def calculate_head_pose(face_landmarks, w, h):
-    """Calculate head yaw (left/right tilt) and pitch (forward/backward) from face landmarks"""
-    try:
-        landmarks = face_landmarks.landmark
-        
-        # Key face landmarks for head pose estimation
-        left_eye = landmarks[33]
-        right_eye = landmarks[263]
-        nose_tip = landmarks[1]
-        chin = landmarks[152]
-        forehead = landmarks[10]
-        
-        # Head tilt (left/right) - using eye height difference
-        left_eye_y = left_eye.y
-        right_eye_y = right_eye.y
-        # Calculate tilt: positive = tilt right, negative = tilt left
-        tilt = (right_eye_y - left_eye_y) * 200  # Scale factor for sensitivity
-        yaw = tilt  # Use tilt value as yaw for A/D movement
-        
-        # Pitch (forward/backward) - using nose position relative to eyes
-        nose_y = nose_tip.y
-        chin_y = chin.y
-        forehead_y = forehead.y
-        
-        # Calculate pitch based on nose position relative to face height (better method)
-        face_height = chin_y - forehead_y
-        if face_height > 0:
-            nose_position = (nose_y - forehead_y) / face_height
-            pitch = (nose_position - 0.5) * 100  # Center around 0
-        else:
-            pitch = 0
-        
-        # Debug output
-        if not hasattr(calculate_head_pose, 'debug_counter'):
-            calculate_head_pose.debug_counter = 0
-        calculate_head_pose.debug_counter += 1
-        if calculate_head_pose.debug_counter % 30 == 0:
-            print(f"📊 Pitch: {pitch:.1f} (W threshold: {12}, S threshold: {-5})")
-        
-        return yaw, pitch
-        
-    except Exception as e:
-        print(f"Head pose calculation error: {e}")
-        return 0, 0
-
-def is_gun_gesture(hand_landmarks):
-    """Detect gun gesture (index out, bottom 3 curled)"""
-    if hand_landmarks is None:
-        return False
-    landmarks = hand_landmarks.landmark
-    index_extended = is_finger_extended(landmarks, 8, 6, 5)
-    middle_curled = not is_finger_extended(landmarks, 12, 10, 9)
-    ring_curled = not is_finger_extended(landmarks, 16, 14, 13)
-    pinky_curled = not is_finger_extended(landmarks, 20, 18, 17)
-    is_gun = index_extended and middle_curled and ring_curled and pinky_curled
-    return is_gun
-
-def is_thumb_down(hand_landmarks):
-    """Detect if thumb is pressed down (shooting position)"""
-    landmarks = hand_landmarks.landmark
-    thumb_tip = landmarks[4]
-    thumb_ip = landmarks[3]
-    thumb_mcp = landmarks[2]
-    
-    # Thumb pointing down if tip is below IP joint
-    return thumb_tip.y > thumb_ip.y
-
-def are_bottom_fingers_curled(hand_landmarks):
-    """Check if bottom 3 fingers are curled (rotation-proof) - from finger_tracking.py"""
-    landmarks = hand_landmarks.landmark
-    wrist = landmarks[0]
-    
-    middle_tip = landmarks[12]
-    middle_mcp = landmarks[9]
-    middle_dist = ((middle_tip.x - wrist.x)**2 + (middle_tip.y - wrist.y)**2)**0.5
-    middle_mcp_dist = ((middle_mcp.x - wrist.x)**2 + (middle_mcp.y - wrist.y)**2)**0.5
-    middle_curled = middle_dist < middle_mcp_dist * 1.8
-    
-    ring_tip = landmarks[16]
-    ring_mcp = landmarks[13]
-    ring_dist = ((ring_tip.x - wrist.x)**2 + (ring_tip.y - wrist.y)**2)**0.5
-    ring_mcp_dist = ((ring_mcp.x - wrist.x)**2 + (ring_mcp.y - wrist.y)**2)**0.5
-    ring_curled = ring_dist < ring_mcp_dist * 1.8
-    
-    pinky_tip = landmarks[20]
-    pinky_mcp = landmarks[17]
-    pinky_dist = ((pinky_tip.x - wrist.x)**2 + (pinky_tip.y - wrist.y)**2)**0.5
-    pinky_mcp_dist = ((pinky_mcp.x - wrist.x)**2 + (pinky_mcp.y - wrist.y)**2)**0.5
-    pinky_curled = pinky_dist < pinky_mcp_dist * 1.8
-    
-    curled_count = sum([middle_curled, ring_curled, pinky_curled])
-    return curled_count >= 2
-
-
-def detect_left_hand_gestures(hand_landmarks):
-    """Detect left hand gestures for jump/knife/interact"""
-    try:
-        if not hasattr(hand_landmarks, 'landmark') or len(hand_landmarks.landmark) < 21:
-            return "invalid", None
-            
-        landmarks = hand_landmarks.landmark
-        
-        # Check individual finger states - check if fingers are UP (extended)
-        thumb_up = is_finger_extended(landmarks, 4, 3, 2)
-        index_up = is_finger_extended(landmarks, 8, 6, 5)
-        middle_up = is_finger_extended(landmarks, 12, 10, 9)
-        ring_up = is_finger_extended(landmarks, 16, 14, 13)
-        pinky_up = is_finger_extended(landmarks, 20, 18, 17)
-        
-        # Gesture detection based on fingers UP
-        # Priority order: most specific gestures first
-        
-        # Pinky + Index + Thumb up (middle and ring down) → Knife (Q)
-        if pinky_up and index_up and thumb_up and not middle_up and not ring_up:
-            return "knife", "q"
-        
-        # Pinky + Thumb up (index, middle, ring down) → Interact (E)
-        elif pinky_up and thumb_up and not index_up and not middle_up and not ring_up:
-            return "interact", "e"
-        
-        # Index + Thumb up (middle, ring, pinky down) → Spray (T)
-        elif index_up and thumb_up and not middle_up and not ring_up and not pinky_up:
-            return "spray", "t"
-        
-        # Only Index up → Jump (Space)
-        elif index_up and not thumb_up and not middle_up and not ring_up and not pinky_up:
-            return "jump", "space"
-        
-        else:
-            return "unknown", None
-            
-    except Exception as e:
-        print(f"Error in detect_left_hand_gestures: {e}")
-        return "error", None
-
-
-def calculate_lean_pose(pose_landmarks, frame_width, frame_height):
-    """Calculate body lean for A/D movement based on shoulder and hip positions"""
-    try:
-        # Get key landmarks
-        left_shoulder = pose_landmarks.landmark[mp_pose.PoseLandmark.LEFT_SHOULDER]
-        right_shoulder = pose_landmarks.landmark[mp_pose.PoseLandmark.RIGHT_SHOULDER]
-        left_hip = pose_landmarks.landmark[mp_pose.PoseLandmark.LEFT_HIP]
-        right_hip = pose_landmarks.landmark[mp_pose.PoseLandmark.RIGHT_HIP]
-        
-        # Calculate shoulder and hip centers
-        shoulder_center_x = (left_shoulder.x + right_shoulder.x) / 2
-        hip_center_x = (left_hip.x + right_hip.x) / 2
-        
-        # Calculate torso center
-        torso_center_x = (shoulder_center_x + hip_center_x) / 2
-        
-        # Left/Right lean (A/D) - based on torso center position relative to frame center
-        left_right = (torso_center_x - 0.5) * 100  # Positive = leaning right, Negative = leaning left
-        
-        return left_right
-        
-    except Exception as e:
-        print(f"Error calculating lean pose: {e}")
-        return 0
-
-def detect_mouth_open(face_landmarks):
-    """Detect if tongue is out (mouth open)"""
-    try:
-        landmarks = face_landmarks.landmark
-        
-        # Use specific lip landmarks for mouth opening detection
-        upper_lip_bottom = landmarks[13]  # Upper lip bottom
-        lower_lip_top = landmarks[14]     # Lower lip top
-        
-        # Calculate vertical separation between lips
-        lip_separation = abs(upper_lip_bottom.y - lower_lip_top.y)
-        
-        # Threshold for mouth opening (adjustable)
-        threshold = 0.015
-        
-        return lip_separation > threshold
-    except:
-        return False
-
-class StickyGunDetector:
-    """Gun gesture detector with sticky behavior (from dual_hand_tracking.py)"""
-    def __init__(self, grace_period=30):
-        self.is_locked = False
-        self.lock_frames = 0
-        self.grace_period = grace_period
-        self.frames_without_hand = 0
-        
-    def update(self, hand_landmarks):
-        if hand_landmarks is None:
-            if self.is_locked:
-                self.frames_without_hand += 1
-                if self.frames_without_hand > self.grace_period:
-                    self.is_locked = False
-                    self.lock_frames = 0
-                    self.frames_without_hand = 0
-                    print("🔫 Gun UNLOCKED! (no hand)")
-                    return False
-                else:
-                    return True
-            else:
-                self.frames_without_hand = 0
-                return False
-        
-        self.frames_without_hand = 0
-        gun_detected = is_gun_gesture(hand_landmarks)
-        bottom_fingers_curled = are_bottom_fingers_curled(hand_landmarks)
-        
-        if not self.is_locked:
-            if gun_detected:
-                self.is_locked = True
-                self.lock_frames = 0
-                print("🔫 Gun LOCKED!")
-                return True
-            else:
-                return False
-        else:
-            self.lock_frames += 1
-            if not bottom_fingers_curled:
-                self.is_locked = False
-                self.lock_frames = 0
-                print("🔫 Gun UNLOCKED!")
-                return False
-            else:
-                return True
-
-class ThumbShootingController:
-    """Mouse click controller based on thumb position (from dual_hand_tracking.py)"""
-    def __init__(self):
-        self.is_pressed = False
-        self.last_thumb_down = False
-        
-    def update(self, hand_landmarks, gun_active):
-        if not gun_active or hand_landmarks is None:
-            self.force_release()
-            return False, "Gun not active"
-        
-        thumb_down = is_thumb_down(hand_landmarks)
-        
-        # Detect thumb press (transition from up to down)
-        if thumb_down and not self.last_thumb_down:
-            if not self.is_pressed:
-                pyautogui.mouseDown()
-                self.is_pressed = True
-                return True, "FIRING!"
-        
-        # Detect thumb release (transition from down to up)
-        elif not thumb_down and self.last_thumb_down:
-            if self.is_pressed:
-                pyautogui.mouseUp()
-                self.is_pressed = False
-                return False, "Ready"
-        
-        self.last_thumb_down = thumb_down
-        
-        if self.is_pressed:
-            return True, "FIRING!"
-        else:
-            return False, "Ready"
-    
-    def force_release(self):
-        if self.is_pressed:
-            pyautogui.mouseUp()
-            self.is_pressed = False
-
-class KrunkerStyleMouseController:
-    """Mouse controller with high-frequency cursor thread for smooth finger gun tracking"""
-    def __init__(self):
-        self.sensitivity = 2.5
-        self.last_x = None
-        self.last_y = None
-        self.debug_counter = 0
-        
-        # Target position (updated by hand tracking at 30 FPS)
-        self.target_delta_x = 0
-        self.target_delta_y = 0
-        
-        # Current interpolated position (updated by cursor thread at 120+ FPS)
-        self.current_delta_x = 0
-        self.current_delta_y = 0
-        
-        # Velocity for smooth interpolation
-        self.velocity_x = 0
-        self.velocity_y = 0
-        
-        # Dead zone for filtering hand tremors
-        self.dead_zone = 0.8  # Increased to prevent spasms from small hand movements
-        
-        # Thread control
-        self.cursor_thread = None
-        self.thread_running = False
-        self.thread_lock = threading.Lock()
-        
-        # Interpolation settings
-        self.cursor_update_rate = 120  # Hz - cursor updates per second
-        self.interpolation_speed = 0.15  # How fast to interpolate (0-1, lower = smoother, less overshoot)
-        
-        # Track discontinuations to prevent snapping after repositioning
-        self.last_update_time = None
-        self.discontinuation_threshold = 0.1  # 100ms - if no update for this long, treat as discontinuation
-        
-    def _move_mouse_native(self, delta_x, delta_y):
-        """Use native macOS CGEvent with delta fields for Krunker Pointer Lock compatibility"""
-        try:
-            from Quartz.CoreGraphics import (
-                CGEventCreate, CGEventGetLocation, CGEventCreateMouseEvent,
-                CGEventSetIntegerValueField, CGEventPost, kCGHIDEventTap,
-                kCGEventMouseMoved, kCGMouseEventDeltaX, kCGMouseEventDeltaY,
-                CGDisplayBounds, CGMainDisplayID, CGWarpMouseCursorPosition
-            )
-            
-            # Get screen bounds
-            screen_bounds = CGDisplayBounds(CGMainDisplayID())
-            screen_width = screen_bounds.size.width
-            screen_height = screen_bounds.size.height
-            screen_center_x = screen_width / 2
-            screen_center_y = screen_height / 2
-            
-            # Get current mouse position
-            event = CGEventCreate(None)
-            current_pos = CGEventGetLocation(event)
-            
-            # Strategy: Keep cursor centered to work with Pointer Lock
-            # Pointer Lock expects the cursor to stay in one place while deltas are sent
-            # If cursor drifts too far from center, recenter it
-            distance_from_center = ((current_pos.x - screen_center_x)**2 + (current_pos.y - screen_center_y)**2)**0.5
-            
-            if distance_from_center > 50:  # If more than 50px from center, recenter
-                # Silently recenter cursor without sending movement event
-                CGWarpMouseCursorPosition((screen_center_x, screen_center_y))
-                new_x = screen_center_x
-                new_y = screen_center_y
-            else:
-                # Keep cursor near center
-                new_x = screen_center_x
-                new_y = screen_center_y
-            
-            # Create mouse move event at center position
-            move_event = CGEventCreateMouseEvent(None, kCGEventMouseMoved, (new_x, new_y), 0)
-            
-            # Set the delta fields - THIS is what Pointer Lock reads for camera movement
-            CGEventSetIntegerValueField(move_event, kCGMouseEventDeltaX, int(delta_x))
-            CGEventSetIntegerValueField(move_event, kCGMouseEventDeltaY, int(delta_y))
-            
-            # Post the event
-            CGEventPost(kCGHIDEventTap, move_event)
-            
-        except Exception as e:
-            print(f"Native mouse error: {e}")
-    
-    def _cursor_update_thread(self):
-        """High-frequency cursor update thread (runs at 120+ FPS)"""
-        update_interval = 1.0 / self.cursor_update_rate
-        
-        while self.thread_running:
-            start_time = time.time()
-            
-            with self.thread_lock:
-                # Check if there's any target movement to apply
-                if abs(self.target_delta_x) > 0.1 or abs(self.target_delta_y) > 0.1:
-                    # Take a fraction of the target movement each frame for smoothness
-                    move_x = self.target_delta_x * self.interpolation_speed
-                    move_y = self.target_delta_y * self.interpolation_speed
-                    
-                    # Apply the movement
-                    if abs(move_x) >= 1.0 or abs(move_y) >= 1.0:
-                        self._move_mouse_native(int(move_x), int(move_y))
-                        
-                        # Subtract what we applied from the target (drain the queue)
-                        self.target_delta_x -= move_x
-                        self.target_delta_y -= move_y
-                    else:
-                        # Movement too small, clear it to prevent buildup
-                        self.target_delta_x = 0
-                        self.target_delta_y = 0
-            
-            # Sleep to maintain update rate
-            elapsed = time.time() - start_time
-            sleep_time = max(0, update_interval - elapsed)
-            time.sleep(sleep_time)
-    
-    def start_cursor_thread(self):
-        """Start the high-frequency cursor update thread"""
-        if not self.thread_running:
-            self.thread_running = True
-            self.cursor_thread = threading.Thread(target=self._cursor_update_thread, daemon=True)
-            self.cursor_thread.start()
-            print(f"🎯 Started cursor thread at {self.cursor_update_rate} Hz")
-    
-    def stop_cursor_thread(self):
-        """Stop the cursor update thread and clear all pending movements"""
-        # Immediately clear all pending movements
-        with self.thread_lock:
-            self.target_delta_x = 0
-            self.target_delta_y = 0
-            self.current_delta_x = 0
-            self.current_delta_y = 0
-        
-        if self.thread_running:
-            self.thread_running = False
-            if self.cursor_thread:
-                self.cursor_thread.join(timeout=0.5)
-            print("🎯 Stopped cursor thread")
-    
-    def update(self, hand_landmarks, gun_active):
-        """Update target position from hand tracking (30 FPS) - cursor thread handles smooth movement (120 FPS)"""
-        current_time = time.time()
-        
-        if not gun_active or hand_landmarks is None:
-            # Stop cursor thread when gun inactive and reset position for repositioning
-            self.stop_cursor_thread()
-            # Reset last_x and last_y to allow repositioning when gun is not locked
-            self.last_x = None
-            self.last_y = None
-            self.last_update_time = None  # Mark discontinuation
-            with self.thread_lock:
-                self.target_delta_x = 0
-                self.target_delta_y = 0
-                self.current_delta_x = 0
-                self.current_delta_y = 0
-            return
-        
-        # Start cursor thread if not running
-        if not self.thread_running:
-            self.start_cursor_thread()
-            
-        try:
-            index_tip = hand_landmarks.landmark[8]
-            
-            # Convert to pixels for tracking
-            current_x = index_tip.x * 1920
-            current_y = index_tip.y * 1080
-            
-            # Check for discontinuation (gap in tracking)
-            is_discontinuation = (self.last_update_time is None or 
-                                 (current_time - self.last_update_time) > self.discontinuation_threshold)
-            
-            if self.last_x is not None and self.last_y is not None and not is_discontinuation:
-                # Calculate raw delta movement
-                raw_delta_x = (current_x - self.last_x) * self.sensitivity
-                raw_delta_y = (current_y - self.last_y) * self.sensitivity
-                
-                # Apply dead zone filter
-                movement_magnitude = (raw_delta_x**2 + raw_delta_y**2)**0.5
-                if movement_magnitude < self.dead_zone:
-                    raw_delta_x = 0
-                    raw_delta_y = 0
-                
-                # Update target for cursor thread to interpolate toward
-                with self.thread_lock:
-                    self.target_delta_x += raw_delta_x
-                    self.target_delta_y += raw_delta_y
-                
-                # Debug output
-                self.debug_counter += 1
-                if self.debug_counter % 30 == 0:
-                    print(f"📍 Cursor Thread: raw=({int(raw_delta_x)},{int(raw_delta_y)}) "
-                          f"target=({int(self.target_delta_x)},{int(self.target_delta_y)}) "
-                          f"current=({int(self.current_delta_x)},{int(self.current_delta_y)})")
-            elif is_discontinuation:
-                # After discontinuation, just set baseline without applying delta
-                print("🔄 Discontinuation detected - resetting baseline for reswipe")
-            
-            # Update tracking state
-            self.last_x = current_x
-            self.last_y = current_y
-            self.last_update_time = current_time
-            
-        except Exception as e:
-            print(f"Mouse control error: {e}")
-
-class SmoothMouseController:
-    """Mouse controller using Krunker-style approach with smooth movement"""
-    def __init__(self, sensitivity=1.5):
-        self.krunker_controller = KrunkerStyleMouseController()
-        self.krunker_controller.sensitivity = sensitivity
-        print(f"🎮 Using smooth Krunker-style mouse controller with sensitivity: {sensitivity}")
-        
-    def update(self, hand_landmarks, gun_active):
-        """Use Krunker-style mouse controller for better browser compatibility"""
-        self.krunker_controller.update(hand_landmarks, gun_active)
-
-class LeftHandGestureController:
-    """Left hand gesture controller for crouch/jump"""
-    def __init__(self):
-        self.last_gesture = None
-        self.last_gesture_time = 0
-        self.gesture_debounce = 0.1
-        
-    def update(self, hand_landmarks, control_enabled):
-        try:
-            if not control_enabled or hand_landmarks is None:
-                return None, "Control Disabled"
-            
-            current_time = time.time()
-            gesture_name, action_key = detect_left_hand_gestures(hand_landmarks)
-            
-            if gesture_name == "error" or gesture_name == "invalid":
-                return None, "Gesture detection error"
-            
-            # Handle gestures (crouch/jump) - single press
-            if action_key and gesture_name != self.last_gesture:
-                if current_time - self.last_gesture_time > self.gesture_debounce:
-                    pyautogui.press(action_key)
-                    self.last_gesture = gesture_name
-                    self.last_gesture_time = current_time
-                    return action_key, f"Pressed '{action_key}' - {gesture_name}"
-                else:
-                    return None, f"Gesture detected (debounced): {gesture_name}"
-            elif gesture_name == self.last_gesture:
-                return None, f"Holding: {gesture_name}"
-            else:
-                return None, "Left hand ready"
-                
-        except Exception as e:
-            print(f"Error in LeftHandGestureController: {e}")
-            return None, "Error"
-
-class WASDController:
-    """Hybrid controller: Head tilt for A/D, head pose for W/S"""
-    def __init__(self, lean_threshold=3, pitch_threshold=5, pitch_threshold_back=12, hysteresis=0.7):
-        self.lean_threshold = lean_threshold  # For A/D (left/right lean)
-        self.pitch_threshold = pitch_threshold  # For W (head forward)
-        self.pitch_threshold_back = pitch_threshold_back  # For S (head backward)
-        self.hysteresis = hysteresis  # Multiplier for release threshold
-        self.current_keys = set()  # Currently pressed keys
-        
-        # Gradual movement for A/D (left/right lean)
-        self.lean_press_timer = 0
-        self.small_lean_hold_duration = 1.0  # Hold key for 1 second for small leans
-        self.small_lean_wait_duration = 0.075  # Wait 75ms between presses
-        self.strong_lean_threshold = 8  # Threshold for holding down key (lowered for better response)
-        self.last_lean_press_time = {'a': 0, 'd': 0}
-        self.lean_key_state = {'a': False, 'd': False}  # Track if key is currently held
-        self.lean_key_press_start = {'a': 0, 'd': 0}  # Track when key was pressed
-        self.debug_counter = 0
-        
-    def update(self, head_yaw, head_pitch, control_enabled):
-        """
-        Update WASD keys based on head tilt (A/D) and head pose (W/S)
-        Returns: (active_keys, key_states)
-        """
-        if not control_enabled:
-            # Release all keys if control disabled
-            self.release_all_keys()
-            # Also release small lean keys
-            if self.lean_key_state['a']:
-                pyautogui.keyUp('a')
-                self.lean_key_state['a'] = False
-            if self.lean_key_state['d']:
-                pyautogui.keyUp('d')
-                self.lean_key_state['d'] = False
-            return set(), {'w': False, 'a': False, 's': False, 'd': False}
-        
-        desired_keys = set()
-        current_time = time.time()
-        
-        # Calculate release thresholds (closer to center)
-        lean_release = self.lean_threshold * self.hysteresis
-        pitch_release = self.pitch_threshold * self.hysteresis
-        pitch_release_back = self.pitch_threshold_back * self.hysteresis
-        
-        # Release small lean keys if user returns to center
-        if head_yaw >= -self.lean_threshold and head_yaw <= self.lean_threshold:
-            if self.lean_key_state['a']:
-                pyautogui.keyUp('a')
-                self.lean_key_state['a'] = False
-                print(f"🔄 Returned to center - Released 'A'")
-            if self.lean_key_state['d']:
-                pyautogui.keyUp('d')
-                self.lean_key_state['d'] = False
-                print(f"🔄 Returned to center - Released 'D'")
-        
-        # Determine which keys should be pressed (with hysteresis)
-        # Left/Right tilt (A/D) - using head tilt with gradual movement
-        if 'a' in self.current_keys:
-            # Already pressing A
-            if head_yaw > -lean_release:
-                pass  # Release A
-            else:
-                desired_keys.add('a')  # Keep pressing A
-        elif head_yaw < -self.lean_threshold:
-            # Check if we should press A
-            if head_yaw < -self.strong_lean_threshold:
-                # Strong lean - hold down continuously
-                desired_keys.add('a')
-            else:
-                # Small lean - hold for 1 second, wait 75ms, repeat
-                if not self.lean_key_state['a']:
-                    # Key is not currently held - check if we can start a new press
-                    time_since_last_release = current_time - self.last_lean_press_time['a']
-                    if time_since_last_release >= self.small_lean_wait_duration:
-                        # Start holding the key
-                        pyautogui.keyDown('a')
-                        self.lean_key_state['a'] = True
-                        self.lean_key_press_start['a'] = current_time
-                        print(f"🔄 Small lean LEFT: {head_yaw:.1f}° - Holding 'A' for 1s")
-                else:
-                    # Key is currently held - check if we should release it
-                    hold_duration = current_time - self.lean_key_press_start['a']
-                    if hold_duration >= self.small_lean_hold_duration:
-                        # Release the key after 1 second
-                        pyautogui.keyUp('a')
-                        self.lean_key_state['a'] = False
-                        self.last_lean_press_time['a'] = current_time
-                        print(f"🔄 Small lean LEFT: {head_yaw:.1f}° - Released 'A', waiting 75ms")
-            
-        if 'd' in self.current_keys:
-            # Already pressing D
-            if head_yaw < lean_release:
-                pass  # Release D
-            else:
-                desired_keys.add('d')  # Keep pressing D
-        elif head_yaw > self.lean_threshold:
-            # Check if we should press D
-            if head_yaw > self.strong_lean_threshold:
-                # Strong lean - hold down continuously
-                desired_keys.add('d')
-            else:
-                # Small lean - hold for 1 second, wait 75ms, repeat
-                if not self.lean_key_state['d']:
-                    # Key is not currently held - check if we can start a new press
-                    time_since_last_release = current_time - self.last_lean_press_time['d']
-                    if time_since_last_release >= self.small_lean_wait_duration:
-                        # Start holding the key
-                        pyautogui.keyDown('d')
-                        self.lean_key_state['d'] = True
-                        self.lean_key_press_start['d'] = current_time
-                        print(f"🔄 Small lean RIGHT: {head_yaw:.1f}° - Holding 'D' for 1s")
-                else:
-                    # Key is currently held - check if we should release it
-                    hold_duration = current_time - self.lean_key_press_start['d']
-                    if hold_duration >= self.small_lean_hold_duration:
-                        # Release the key after 1 second
-                        pyautogui.keyUp('d')
-                        self.lean_key_state['d'] = False
-                        self.last_lean_press_time['d'] = current_time
-                        print(f"🔄 Small lean RIGHT: {head_yaw:.1f}° - Released 'D', waiting 75ms")
-            
-        # Forward/Backward (W/S) - using head pose (switched W and S)
-        if 'w' in self.current_keys:
-            # Already pressing W
-            if head_pitch < pitch_release_back:
-                pass  # Release W
-            else:
-                desired_keys.add('w')  # Keep pressing W
-        elif head_pitch > self.pitch_threshold_back:
-            desired_keys.add('w')  # Start pressing W (head backward)
-            
-        if 's' in self.current_keys:
-            # Already pressing S
-            if head_pitch > -pitch_release:
-                pass  # Release S
-            else:
-                desired_keys.add('s')  # Keep pressing S
-        elif head_pitch < -self.pitch_threshold:
-            desired_keys.add('s')  # Start pressing S (head forward)
-        
-        # Release keys that should no longer be pressed
-        keys_to_release = self.current_keys - desired_keys
-        for key in keys_to_release:
-            pyautogui.keyUp(key)
-            print(f"Released: {key.upper()}")
-        
-        # Press keys that should be pressed
-        keys_to_press = desired_keys - self.current_keys
-        for key in keys_to_press:
-            pyautogui.keyDown(key)
-            print(f"Pressed: {key.upper()}")
-            
-        # Continuously hold down keys that should remain pressed
-        for key in desired_keys:
-            pyautogui.keyDown(key)  # Keep pressing the key to ensure it stays down
-        
-        self.current_keys = desired_keys
-        
-        # Create key state dict for display
-        key_states = {
-            'w': 'w' in desired_keys,
-            'a': 'a' in desired_keys,
-            's': 's' in desired_keys,
-            'd': 'd' in desired_keys
-        }
-        
-        return desired_keys, key_states
-    
-    def release_all_keys(self):
-        """Release all currently pressed keys"""
-        for key in self.current_keys:
-            pyautogui.keyUp(key)
-        if self.current_keys:
-            print(f"Released all keys: {', '.join([k.upper() for k in self.current_keys])}")
-        self.current_keys = set()
-
-class TongueController:
-    """Mouth open detection controller for scope/right click (from tongue_tracking.py)"""
-    def __init__(self, sensitivity=0.015, debounce_frames=10):
-        self.sensitivity = sensitivity
-        self.debounce_frames = debounce_frames
-        self.frames_held = 0
-        self.is_scoped = False
-        
-    def update(self, face_landmarks, control_enabled):
-        if not control_enabled or face_landmarks is None:
-            self.frames_held = 0
-            if self.is_scoped:
-                pyautogui.mouseUp(button='right')
-                self.is_scoped = False
-            return False, "Control Disabled"
-        
-        mouth_open = detect_mouth_open(face_landmarks)
-        
-        if mouth_open:
-            self.frames_held += 1
-            if self.frames_held >= self.debounce_frames and not self.is_scoped:
-                pyautogui.mouseDown(button='right')
-                self.is_scoped = True
-                return True, "Scoping (right click held)!"
-        else:
-            self.frames_held = 0
-            if self.is_scoped:
-                pyautogui.mouseUp(button='right')
-                self.is_scoped = False
-        
-        return mouth_open, "Scope ready"
-
-class LeaningControlSystem:
+class LeaningControlSystem(ControlCore):
     """Complete leaning-based CS:GO control system"""
-    def __init__(self):
-        # Initialize MediaPipe (optimized for 30 FPS)
-        self.hands = mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=2,
-            min_detection_confidence=0.7,
-            min_tracking_confidence=0.5
-        )
-        
-        self.pose = mp_pose.Pose(
-            static_image_mode=False,
-            model_complexity=0,  # Reduced from 1 for faster processing
-            enable_segmentation=False,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
-        )
-        
-        self.face_mesh = mp_face_mesh.FaceMesh(
-            max_num_faces=1,
-            refine_landmarks=False,  # Disabled refinement for speed
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
-        )
-        
-        # Sensitivity control (0.1 to 1.0)
-        self.sensitivity = 0.9
-        
-        # Initialize controllers
-        self.wasd_controller = WASDController()
-        self.gun_detector = StickyGunDetector()
-        self.shooting_controller = ThumbShootingController()
-        self.mouse_controller = SmoothMouseController()
-        self.left_hand_controller = LeftHandGestureController()
-        self.tongue_controller = TongueController()
-        
-        # Apply initial sensitivity to mouse controller
-        self.mouse_controller.krunker_controller.sensitivity = self.sensitivity * 2.5
-        
-        # Control state
-        self.control_enabled = False
+    def __init__(self, parallel_inference=True, output=None, hand_roi=False, model_sizes=None, scheme=None,
+                 scheduler='slots', budget_ms=30.0, max_cost_ms=None, face_flow=True, cursor_predictor=None,
+                 landmark_filter=True, backend='solutions', model_dir=None, runtime=None, face_model='mesh',
+                 warm_up_runs=3, gesture_config=None, gesture_model=None, cursor_rate=120):
+        # Controllers, sensitivity, control state and control scheme (left hand gestures from gesture_config.json,
+        # finger states from the rules or a trained model)
+        super().__init__(output, scheme, cursor_predictor, LandmarkFilter() if landmark_filter else None,
+                         load_gesture_table(gesture_config),
+                         GestureModel.load(gesture_model) if gesture_model else None, cursor_rate)
+        
+        # Initialize only the models the control scheme uses (optimized for 30 FPS), each on its
+        # backend and pinned to its CPUs. The graphs load on background threads (concurrently, and
+        # while run() opens the camera); finish_startup() joins them
+        self.backend = backend
+        self.runtime = runtime or parse_runtime()
+        self.parallel_inference = parallel_inference
+        self.startup_timer = StartupTimer()
+        self.model_build = start_backend_build(backend, self.scheme.sources, self.runtime, model_dir, face_model,
+                                               self.startup_timer)
+        model_names = self.model_build.order
+        self.hand_roi = hand_roi and backend == 'solutions'
+        if hand_roi and not self.hand_roi:
+            print("⚠️  --hand-roi needs the solutions backend - running hands on the full frame")
+        self.warm_up_runs = warm_up_runs
+        self.models = None
+        self.hands = self.pose = self.face_mesh = None
+        self.inference_runner = None
+        
+        # Per-model input resolution (pose/face get a downscaled copy of the frame)
+        self.pyramid = FramePyramid(model_sizes, names=model_names)
+        self.buffer_pool = None  # Created with the pipeline, sized to the frames in flight
+        
+        # Which models run on which frame (staggered 1-in-3 by default, or budget-driven)
+        self.scheduler = build_scheduler(scheduler, model_names, self.scheme, self.wasd_controller,
+                                         budget_ms, parallel=parallel_inference, max_cost_ms=max_cost_ms)
+        self.schedule_log = ScheduleLog(name=self.scheduler.name)
+        
+        # Optical flow carries the face keypoints forward on frames where FaceMesh is skipped
+        self.face_tracker = FaceKeypointTracker() if face_flow and 'face' in model_names else None
+        
+        # Session recording / controller results (set up by run())
+        self.recorder = None
+        self.results_log = None
+        self.trace_writer = None
         
         print("Hybrid Control System initialized!")
-        print("Movement: Head tilt for A/D + Head pose for W/S")
+        print(f"Control scheme: {self.scheme.name} ({', '.join(self.scheme.sources)}, {backend} backend)")
+        for name in model_names:
+            print(f"  {name}: {self.runtime[name]}")
+        print(f"Movement: {self.scheme.description}")
         print("Right hand: Gun control + shooting + Krunker-style mouse")
         print("Left hand: Jump/Knife/Interact/Spray")
-        print("Mouth: Scope (right click)")
+        if self.scheme.uses('face'):
+            print("Mouth: Scope (right click)")
     
+    def finish_startup(self, width=1280, height=720):
+        """
+        Wait for the background model builds, start the inference runner and warm
+        every model (and the input sink) up before the first real frame.
+        Called by run(); call it directly to use the system without run().
+        """
+        if self.inference_runner is not None:
+            return
+        self.models = self.model_build.result()
+        if self.hand_roi:
+            # Hand landmarks on a crop around the previous frame's hands (full frame as fallback)
+            with self.startup_timer.phase('hand-roi'), pinned(self.runtime['hands'].cpus):
+                self.models['hands'] = HandROITracker(self.models['hands'], build_hand_model())
+        self.hands = self.models['hands']
+        self.pose = self.models.get('pose')
+        self.face_mesh = self.models.get('face')
+        
+        # Hands, Pose and FaceMesh run on parallel worker threads (or the landmarkers' own threads)
+        self.inference_runner = build_runner(self.backend, self.models, self.parallel_inference, self.runtime)
+        
+        # The first inference of each graph is several times slower than steady state: pay it on a
+        # synthetic frame instead of the first camera frames. This only warms the detectors - the
+        # trackers still start from a detection on the first real frame
+        if self.warm_up_runs:
+            warm_up(self.inference_runner, self.pyramid.build(synthetic_frame(width, height)), list(self.models),
+                    runs=self.warm_up_runs, timer=self.startup_timer)
+        # Load the input libraries now rather than at the first gun lock
+        if hasattr(self.output, 'warm_up'):
+            with self.startup_timer.phase('input'):
+                self.output.warm_up()
     
-    def identify_hands(self, hand_landmarks_list):
-        """Identify which hand is left vs right based on position (from dual_hand_tracking.py)"""
-        if len(hand_landmarks_list) == 0:
-            return None, None
-        elif len(hand_landmarks_list) == 1:
-            # Only one hand detected, assume it's the right hand
-            return None, hand_landmarks_list[0]
-        else:
-            # Two hands detected, identify by x position
-            hand1 = hand_landmarks_list[0]
-            hand2 = hand_landmarks_list[1]
-            
-            # Get wrist positions
-            wrist1_x = hand1.landmark[0].x
-            wrist2_x = hand2.landmark[0].x
-            
-            # Left hand is on the left side of screen (lower x value)
-            if wrist1_x < wrist2_x:
-                return hand1, hand2  # hand1 is left, hand2 is right
-            else:
-                return hand2, hand1  # hand2 is left, hand1 is right
+    def close_models(self):
+        if self.inference_runner is not None:
+            self.inference_runner.close()
+        models = self.models
+        if models is None:
+            # Builds may still be running: join them (a failed build already closed the others)
+            try:
+                models = self.model_build.result()
+            except Exception:
+                return
+        for model in models.values():
+            model.close()
     
-    def run(self):
-        """Main control loop"""
-        cap = cv2.VideoCapture(0)
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
-        cap.set(cv2.CAP_PROP_FPS, 30)
-        
-        if not cap.isOpened():
+    def run(self, source=0, threaded=True, queue_size=1, drop_policy='drop_oldest',
+            record_path=None, results_path=None, trace_path=None, headless=False, hotkeys=False,
+            control_port=DEFAULT_PORT, schedule_log_path=None):
+        """
+        Main control loop.
+        source: camera index, video file path, or a frame source such as ReplayFrameSource.
+        threaded=False runs all stages one after another, like the original serial loop.
+        record_path: also write raw frames + capture timestamps to this session directory.
+        results_path: write every controller's per-frame output to this JSON lines file.
+        trace_path: write per-frame landmarks to this landmark trace file.
+        schedule_log_path: write per-frame scheduling decisions and inference times (JSON lines).
+        headless=True skips the render stage (no drawing, no OpenCV window) and takes
+        commands from stdin / a local UDP socket (control_port) / global hotkeys instead.
+        """
+        if hasattr(source, 'read'):
+            grabber = source
+        else:
+            # Capture runs on its own thread and only keeps the newest frame
+            # Capture buffers are recycled once preprocess has mirrored them (not while recording:
+            # the recorder holds on to raw frames until its writer thread gets to them)
+            grabber = LatestFrameGrabber(source, width=1280, height=720, fps=30,
+                                         reuse_buffers=0 if record_path else queue_size + 2)
+        
+        # The camera opens while the models are still loading
+        with self.startup_timer.phase('camera'):
+            opened = grabber.start()
+        self.startup_timer.note('camera', "overlapped with the model builds")
+        if not opened:
             print("Error: Could not open camera")
+            self.close_models()
             return
+        try:
+            self.finish_startup(getattr(grabber, 'width', None) or 1280, getattr(grabber, 'height', None) or 720)
+        except Exception:
+            grabber.stop()
+            raise
+        self.startup_timer.print_summary()
+        
+        self.recorder = SessionRecorder(record_path) if record_path else None
+        self.results_log = ResultsLog(results_path) if results_path else None
+        self.trace_writer = TraceWriter(trace_path) if trace_path else None
+        self.schedule_log = ScheduleLog(schedule_log_path, name=self.scheduler.name)
         
         print("Camera initialized successfully")
+        print(f"Model input sizes: {self.pyramid.describe()}")
         print("Hybrid Control System")
         print("=" * 50)
         print("Controls:")
@@ -864,245 +196,75 @@ class LeaningControlSystem:
         print("  '+' - Increase sensitivity")
         print("  '-' - Decrease sensitivity")
         print("  'ESC' - Quit")
-        print("\nMovement (WASD - Hybrid):")
-        print("  - Head FORWARD → Press 'S' (move forward)")
-        print("  - Head BACKWARD → Press 'W' (move backward)")
-        print("  - Body Lean LEFT (small) → Hold 'A' for 1s, wait 75ms, repeat")
-        print("  - Body Lean LEFT (strong) → Hold 'A' down continuously")
-        print("  - Body Lean RIGHT (small) → Hold 'D' for 1s, wait 75ms, repeat")
-        print("  - Body Lean RIGHT (strong) → Hold 'D' down continuously")
+        if self.scheme.movement:
+            lean = "Body Lean" if self.scheme.lateral == 'body' else "Head Tilt"
+            print("\nMovement (WASD - Hybrid):")
+            print("  - Head FORWARD → Press 'S' (move forward)")
+            print("  - Head BACKWARD → Press 'W' (move backward)")
+            print(f"  - {lean} LEFT (small) → Hold 'A' for 1s, wait 75ms, repeat")
+            print(f"  - {lean} LEFT (strong) → Hold 'A' down continuously")
+            print(f"  - {lean} RIGHT (small) → Hold 'D' for 1s, wait 75ms, repeat")
+            print(f"  - {lean} RIGHT (strong) → Hold 'D' down continuously")
         print("\nRight Hand (Gun Control):")
         print("  - Gun gesture (index out, bottom 3 curled)")
         print("  - Thumb UP = ready to shoot")
         print("  - Thumb DOWN = START FIRING")
         print("  - Index finger controls cursor")
         print("\nLeft Hand (Gesture Controls):")
-        print("  - Index finger up (only) = Press 'SPACE' (Jump)")
-        print("  - Pinky + Index + Thumb up = Press 'Q' (Knife)")
-        print("  - Pinky + Thumb up = Press 'E' (Interact)")
-        print("  - Index + Thumb up = Press 'T' (Spray)")
+        for row in self.left_hand_controller.gestures.describe():
+            print(f"  - {row}")
         print("  - Other positions = No action")
-        print("\nMouth Open:")
-        print("  - Open mouth = Right Click (Scope/Aim)")
+        if self.scheme.uses('face'):
+            print("\nMouth Open:")
+            print("  - Open mouth = Right Click (Scope/Aim)")
         print("\nPerfect for hybrid CS:GO control!")
         print("=" * 50)
-        print("⚠️  IMPORTANT: Click on the camera window to enable keyboard controls!")
-        print("   The 'g' key will only work when the window is focused.")
+        if headless:
+            print("🕶️  HEADLESS MODE: no camera window - send g/+/-/q on stdin or the control socket")
+        else:
+            print("⚠️  IMPORTANT: Click on the camera window to enable keyboard controls!")
+            print("   The 'g' key will only work when the window is focused.")
         print("=" * 50)
         
-        frame_count = 0
-        last_frame_time = time.time()
+        # A lossless source (replay --fast, lossless capture) hands out frames as fast as they are
+        # asked for: dropping frame queues would throw most of them away
+        if getattr(grabber, 'lossless', False) and drop_policy != 'block':
+            print(f"⏯️  Lossless source: frame queues block instead of {drop_policy}")
+            drop_policy = 'block'
         
-        # Cache for pose and face results (updated less frequently)
-        pose_results = None
-        face_results = None
+        self.pipeline = self.build_pipeline(grabber, threaded=threaded, queue_size=queue_size,
+                                            drop_policy=drop_policy, preview=not headless)
+        
+        # Without a window there are no key events: listen on a non-GUI channel instead
+        control_channel = None
+        if headless:
+            control_channel = ControlChannel(self.handle_command, port=control_port, hotkeys=hotkeys)
+            control_channel.start()
         
         try:
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    time.sleep(0.001)  # Reduced sleep time
-                    continue
-                
-                frame_count += 1
-                current_time = time.time()
-                if current_time - last_frame_time >= 1.0:
-                    fps = frame_count / (current_time - last_frame_time)
-                    print(f"Frame {frame_count}: Running... FPS: {fps:.1f}")
-                    frame_count = 0
-                    last_frame_time = current_time
-                
-                frame = cv2.flip(frame, 1)
-                h, w, _ = frame.shape
-                
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                
-                # Process hands EVERY frame (critical for smooth cursor)
-                hand_results = self.hands.process(rgb_frame)
-                
-                # Process pose and face every 3 frames (WASD/tongue don't need high FPS)
-                if frame_count % 3 == 0:
-                    pose_results = self.pose.process(rgb_frame)
-                    face_results = self.face_mesh.process(rgb_frame)
-                
-                # Initialize status variables
-                head_yaw, head_pitch = 0, 0
-                active_wasd_keys = set()
-                wasd_states = {'w': False, 'a': False, 's': False, 'd': False}
-                
-                gun_active = False
-                is_shooting = False
-                shoot_status = "No right hand"
-                left_action = None
-                left_status = "No left hand"
-                tongue_out = False
-                tongue_status = "No face"
-                
-                # Process pose for body leaning (A/D only)
-                if pose_results and pose_results.pose_landmarks:
-                    try:
-                        # Draw pose landmarks
-                        mp_drawing.draw_landmarks(
-                            frame, pose_results.pose_landmarks, mp_pose.POSE_CONNECTIONS,
-                            mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=2),
-                            mp_drawing.DrawingSpec(color=(255, 0, 0), thickness=2, circle_radius=2)
-                        )
-                        
-                        # No body lean needed - using head tilt for A/D
-                        
-                    except Exception as e:
-                        print(f"Error processing pose: {e}")
-                
-                # Process face for head pose (W/S) and tongue detection
-                if face_results and face_results.multi_face_landmarks:
-                    try:
-                        face_landmarks = face_results.multi_face_landmarks[0]
-                        
-                        # Draw face mesh
-                        mp_drawing.draw_landmarks(
-                            frame, face_landmarks, mp_face_mesh.FACEMESH_CONTOURS,
-                            None, mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=1, circle_radius=1)
-                        )
-                        
-                        # Head pose for W/S movement
-                        head_yaw, head_pitch = calculate_head_pose(face_landmarks, w, h)
-                        
-                        # Mouth open detection for scope
-                        tongue_out, tongue_status = self.tongue_controller.update(
-                            face_landmarks, self.control_enabled
-                        )
-                        
-                    except Exception as e:
-                        print(f"Error processing face: {e}")
-                
-                # Update WASD controller with head tilt (A/D) and head pose (W/S)
-                active_wasd_keys, wasd_states = self.wasd_controller.update(
-                    head_yaw, head_pitch, self.control_enabled
-                )
-                
-                # Debug output for hybrid detection
-                # print(f"DEBUG: Head Yaw (A/D)={head_yaw:.1f}, Head Pitch (W/S)={head_pitch:.1f}")
-                
-                # Process hands
-                if hand_results and hand_results.multi_hand_landmarks:
-                    try:
-                        # Draw hand landmarks
-                        for hand_landmarks in hand_results.multi_hand_landmarks:
-                            mp_drawing.draw_landmarks(
-                                frame, hand_landmarks, mp_hands.HAND_CONNECTIONS,
-                                mp_drawing.DrawingSpec(color=(0, 0, 255), thickness=2, circle_radius=2),
-                                mp_drawing.DrawingSpec(color=(0, 255, 255), thickness=2, circle_radius=2)
-                            )
-                        
-                        # Identify left and right hands
-                        left_hand, right_hand = self.identify_hands(hand_results.multi_hand_landmarks)
-                        
-                        # Process right hand (gun control)
-                        if right_hand:
-                            try:
-                                # Only detect gun gesture if controls are enabled
-                                if self.control_enabled:
-                                    gun_active = self.gun_detector.update(right_hand)
-                                    
-                                    if gun_active:
-                                        # Thumb shooting
-                                        is_shooting, shoot_status = self.shooting_controller.update(
-                                            right_hand, gun_active
-                                        )
-                                        
-                                        # Mouse movement
-                                        self.mouse_controller.update(right_hand, gun_active)
-                                    else:
-                                        # Gun not active - release mouse if held
-                                        self.shooting_controller.force_release()
-                                else:
-                                    # Controls disabled - force release everything and reset gun detector
-                                    self.shooting_controller.force_release()
-                                    self.gun_detector.is_locked = False  # Reset gun detector
-                                    self.gun_detector.lock_frames = 0
-                                    gun_active = False
-                                    
-                            except Exception as e:
-                                print(f"Error processing right hand: {e}")
-                        
-                        # Process left hand (gesture controls)
-                        if left_hand:
-                            try:
-                                left_action, left_status = self.left_hand_controller.update(
-                                    left_hand, self.control_enabled
-                                )
-                                
-                            except Exception as e:
-                                print(f"Error processing left hand: {e}")
-                        
-                    except Exception as e:
-                        print(f"Error processing hands: {e}")
-                
-                # Display status overlay
-                self.display_status(frame, wasd_states, gun_active, shoot_status, 
-                                  left_status, tongue_status, head_yaw, head_pitch, tongue_out)
-                
-                # Show frame
-                cv2.imshow('Hybrid Control System', frame)
-                # Try to bring window to front
-                cv2.setWindowProperty('Hybrid Control System', cv2.WND_PROP_TOPMOST, 1)
-                cv2.setWindowProperty('Hybrid Control System', cv2.WND_PROP_TOPMOST, 0)
-                
-                # Check if window was closed (red X button)
-                if cv2.getWindowProperty('Hybrid Control System', cv2.WND_PROP_VISIBLE) < 1:
-                    print("Window closed - exiting...")
-                    break
-                
-                # Handle keyboard input (minimal wait for maximum FPS)
-                try:
-                    key = cv2.waitKey(1) & 0xFF
-                    if key == 27:  # ESC to quit
-                        print("Quit key pressed - exiting...")
-                        break
-                    elif key == ord('g'):
-                        self.control_enabled = not self.control_enabled
-                        if not self.control_enabled:
-                            self.shooting_controller.force_release()
-                            self.wasd_controller.release_all_keys()
-                        print(f"\n{'='*50}")
-                        print(f"Control {'ENABLED ✓' if self.control_enabled else 'DISABLED ✗'}")
-                        print(f"{'='*50}\n")
-                    elif key == ord('+') or key == ord('='):
-                        self.sensitivity = min(1.0, self.sensitivity + 0.1)
-                        # Apply sensitivity to mouse controller (finger gun cursor)
-                        self.mouse_controller.krunker_controller.sensitivity = self.sensitivity * 2.5
-                        print(f"🎯 Mouse Sensitivity: {self.sensitivity:.1f} (multiplier: {self.mouse_controller.krunker_controller.sensitivity:.2f})")
-                    elif key == ord('-') or key == ord('_'):
-                        self.sensitivity = max(0.1, self.sensitivity - 0.1)
-                        # Apply sensitivity to mouse controller (finger gun cursor)
-                        self.mouse_controller.krunker_controller.sensitivity = self.sensitivity * 2.5
-                        print(f"🎯 Mouse Sensitivity: {self.sensitivity:.1f} (multiplier: {self.mouse_controller.krunker_controller.sensitivity:.2f})")
-                except Exception as e:
-                    print(f"Error handling keyboard input: {e}")
-                    
-        except KeyboardInterrupt:
-            print("Interrupted by user")
+            self.pipeline.run()
         except Exception as e:
             print(f"Error in main loop: {e}")
         finally:
             # Cleanup
             try:
                 print("Cleaning up resources...")
-                self.shooting_controller.force_release()
-                self.wasd_controller.release_all_keys()
-                # Release scope/right click if held
-                if self.tongue_controller.is_scoped:
-                    pyautogui.mouseUp(button='right')
-                # Stop cursor thread
-                self.mouse_controller.krunker_controller.stop_cursor_thread()
-                # Clean up mouse controller
-                self.mouse_controller.krunker_controller.last_x = None
-                self.mouse_controller.krunker_controller.last_y = None
-                cap.release()
+                self.release_all()
+                if control_channel:
+                    control_channel.stop()
+                grabber.stop()
+                self.check_frame_count(grabber)
+                if self.recorder:
+                    self.recorder.close()
+                if self.results_log:
+                    self.results_log.close()
+                if self.trace_writer:
+                    self.trace_writer.close()
+                self.print_buffer_stats(grabber)
+                self.print_cursor_stats()
+                self.schedule_log.close()
                 cv2.destroyAllWindows()
-                self.hands.close()
-                self.pose.close()
-                self.face_mesh.close()
+                self.close_models()
                 print("Camera released")
                 print("Windows closed")
                 print("MediaPipe closed")
@@ -1111,6 +273,251 @@ class LeaningControlSystem:
             except Exception as e:
                 print(f"Error during cleanup: {e}")
     
+    def build_pipeline(self, frame_source, threaded=True, queue_size=1, drop_policy='drop_oldest', preview=True):
+        """Wire capture -> preprocess -> inference -> decision -> output -> render into a Pipeline"""
+        self.frame_source = frame_source
+        self.frame_id = 0
+        self.frames_output = 0  # Frames that reached the output stage
+        
+        # Cache for pose and face results (updated less frequently)
+        self.pose_results = None
+        self.face_results = None
+        
+        stages = [
+            # Frame queues: newest frame wins by default
+            Stage('preprocess', self._preprocess_stage, queue_size, drop_policy),
+            Stage('inference', self._inference_stage, queue_size, drop_policy),
+            # Controllers see every inferred frame, in order
+            Stage('decision', self._decision_stage, 2, 'block'),
+            Stage('output', self._output_stage, 2, 'block'),
+        ]
+        if preview:
+            # Preview can skip frames; OpenCV windows must live on the main thread
+            stages.append(Stage('render', self._render_stage, 1, 'drop_oldest', main_thread=True))
+        
+        # Mirrored/RGB frames and pyramid levels reuse preallocated buffers. A buffer comes
+        # back around only after every frame that can still be queued or processed downstream
+        in_flight = sum(stage.queue_size + 1 for stage in stages) + 1
+        self.buffer_pool = FrameBufferPool(depth=in_flight)
+        self.pyramid = FramePyramid(self.pyramid.model_sizes, pool=self.buffer_pool, names=self.models)
+        return Pipeline(self._capture_stage, stages, threaded=threaded)
+    
+    def _capture_stage(self):
+        """Capture: newest frame from the frame source"""
+        ret, frame, capture_time = self.frame_source.read()
+        if not ret:
+            if self.frame_source.finished:
+                print("Video source ended - exiting...")
+                return END_OF_STREAM
+            return None
+        self.frame_id += 1
+        
+        # Replayed sessions restore the control ON/OFF state they were recorded with. It travels
+        # with the frame and is applied by the output stage, in step with that frame's input
+        recorded_control = getattr(self.frame_source, 'last_control_enabled', None)
+        
+        if self.recorder:
+            self.recorder.write(frame, capture_time,
+                                self.control_enabled if recorded_control is None else recorded_control)
+        # Fast replay stamps frames with their recorded times: latency counts from the read instead
+        arrival_time = time.monotonic() if getattr(self.frame_source, 'lossless', False) else None
+        packet = FramePacket(self.frame_id, frame, capture_time, arrival_time)
+        packet.recorded_control = recorded_control
+        return packet
+    
+    def _preprocess_stage(self, packet):
+        """Preprocess: mirror the frame and convert to RGB for MediaPipe (into reused buffers)"""
+        packet.frame, packet.rgb_frame = mirror_to_rgb(packet.frame, self.buffer_pool)
+        # Per-model inputs; downscaled levels are built once, when a model first needs them
+        packet.model_inputs = self.pyramid.build(packet.rgb_frame)
+        return packet
+    
+    def _inference_stage(self, packet):
+        """Inference: hands every frame, pose and face (if the scheme uses them) when scheduled"""
+        # Hands run EVERY frame (critical for smooth cursor); the scheduler picks the rest
+        # (WASD/tongue don't need high FPS)
+        models = self.scheduler.select(packet.frame_id)
+        
+        # All selected models run concurrently; results are joined by frame id
+        start = time.perf_counter()
+        results = self.inference_runner.run(packet.frame_id, packet.model_inputs, models)
+        frame_ms = (time.perf_counter() - start) * 1000
+        self.scheduler.record({name: self.inference_runner.latencies[name] * 1000 for name in results})
+        self.schedule_log.log(packet.frame_id, models, frame_ms, self.scheduler.decision())
+        packet.hand_results = results.get('hands')
+        if 'pose' in results:
+            self.pose_results = results['pose']
+        if 'face' in results:
+            self.face_results = results['face']
+            if self.face_tracker:
+                faces = self.face_results.multi_face_landmarks if self.face_results else None
+                self.face_tracker.anchor(packet.rgb_frame, faces[0] if faces else None)
+        elif self.face_tracker:
+            packet.tracked_face = self.face_tracker.track(packet.rgb_frame)
+        
+        packet.pose_results = self.pose_results
+        packet.face_results = self.face_results
+        packet.rgb_frame = None  # No longer needed downstream
+        packet.model_inputs = None
+        return packet
+    
+    def _decision_stage(self, packet):
+        """Decision: turn landmarks into head pose and left/right hand assignments"""
+        h, w = packet.frame.shape[:2]
+        
+        # Flow-tracked keypoints on frames without FaceMesh, else the latest FaceMesh result
+        face_landmarks = packet.tracked_face
+        face_results = packet.face_results
+        if face_landmarks is None and face_results and face_results.multi_face_landmarks:
+            face_landmarks = face_results.multi_face_landmarks[0]
+        
+        hand_landmarks_list = None
+        hand_results = packet.hand_results
+        if hand_results and hand_results.multi_hand_landmarks:
+            hand_landmarks_list = hand_results.multi_hand_landmarks
+        
+        if self.trace_writer:
+            self.trace_writer.write_results(packet.frame_id, packet.capture_time,
+                                            hand_results, face_results, packet.pose_results)
+        
+        pose_landmarks = packet.pose_results.pose_landmarks if packet.pose_results else None
+        packet.state = self.decide(face_landmarks, hand_landmarks_list, w, h, pose_landmarks,
+                                   timestamp=packet.capture_time)
+        self.scheduler.observe(packet.frame_id, packet.state)
+        return packet
+    
+    def _output_stage(self, packet):
+        """Output: update controllers, which inject keyboard/mouse input"""
+        if packet.recorded_control is not None:
+            self.set_control(packet.recorded_control)
+        state = self.act(packet.state)
+        self.frames_output += 1
+        
+        if self.results_log:
+            events = self.output.drain() if hasattr(self.output, 'drain') else None
+            self.results_log.log(packet.frame_id, packet.arrival_time, self.results(state), events)
+        return packet
+    
+    def _render_stage(self, packet):
+        """Render: draw landmarks and status, show the preview window, handle keys"""
+        frame = packet.frame
+        state = packet.state
+        
+        # Draw pose landmarks
+        pose_results = packet.pose_results
+        if pose_results and pose_results.pose_landmarks:
+            try:
+                mp_drawing.draw_landmarks(
+                    frame, pose_results.pose_landmarks, mp_pose.POSE_CONNECTIONS,
+                    mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=2),
+                    mp_drawing.DrawingSpec(color=(255, 0, 0), thickness=2, circle_radius=2)
+                )
+            except Exception as e:
+                print(f"Error processing pose: {e}")
+        
+        # Draw face mesh (latest FaceMesh result) and flow-tracked keypoints
+        face_results = packet.face_results
+        if face_results and face_results.multi_face_landmarks:
+            face = face_results.multi_face_landmarks[0]
+            if isinstance(face.landmark, dict):
+                # Keypoint-only face (--face-model minimal): no mesh to draw
+                h, w = frame.shape[:2]
+                for point in face.landmark.values():
+                    cv2.circle(frame, (int(point.x * w), int(point.y * h)), 3, (0, 255, 0), -1)
+            else:
+                mp_drawing.draw_landmarks(
+                    frame, face, mp_face_mesh.FACEMESH_CONTOURS,
+                    None, mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=1, circle_radius=1)
+                )
+        if packet.tracked_face is not None:
+            h, w = frame.shape[:2]
+            for point in packet.tracked_face.landmark.values():
+                cv2.circle(frame, (int(point.x * w), int(point.y * h)), 3, (255, 255, 0), -1)
+        
+        # Draw hand landmarks
+        hand_results = packet.hand_results
+        if hand_results and hand_results.multi_hand_landmarks:
+            for hand_landmarks in hand_results.multi_hand_landmarks:
+                mp_drawing.draw_landmarks(
+                    frame, hand_landmarks, mp_hands.HAND_CONNECTIONS,
+                    mp_drawing.DrawingSpec(color=(0, 0, 255), thickness=2, circle_radius=2),
+                    mp_drawing.DrawingSpec(color=(0, 255, 255), thickness=2, circle_radius=2)
+                )
+        
+        # Display status overlay
+        self.display_status(frame, state['wasd_states'], state['gun_active'], state['shoot_status'],
+                            state['left_status'], state['tongue_status'],
+                            state['head_yaw'], state['head_pitch'], state['tongue_out'])
+        
+        # Show frame
+        cv2.imshow('Hybrid Control System', frame)
+        # Try to bring window to front
+        cv2.setWindowProperty('Hybrid Control System', cv2.WND_PROP_TOPMOST, 1)
+        cv2.setWindowProperty('Hybrid Control System', cv2.WND_PROP_TOPMOST, 0)
+        
+        # Check if window was closed (red X button)
+        if cv2.getWindowProperty('Hybrid Control System', cv2.WND_PROP_VISIBLE) < 1:
+            print("Window closed - exiting...")
+            self.pipeline.stop()
+            return packet
+        
+        # Handle keyboard input (minimal wait for maximum FPS)
+        try:
+            key = cv2.waitKey(1) & 0xFF
+            if key == 27:  # ESC to quit
+                self.handle_command('quit')
+            elif key == ord('g'):
+                self.handle_command('toggle')
+            elif key == ord('+') or key == ord('='):
+                self.handle_command('sens_up')
+            elif key == ord('-') or key == ord('_'):
+                self.handle_command('sens_down')
+        except Exception as e:
+            print(f"Error handling keyboard input: {e}")
+        
+        return packet
+    
+    def print_buffer_stats(self, grabber=None):
+        """Frame-sized allocations over the run: should stop growing after the first frames"""
+        if self.buffer_pool is None:
+            return
+        stats = self.buffer_pool.stats()
+        line = (f"🧮 Frame buffers: {stats['allocations']} allocated ({stats['allocated_mb']:.1f} MB), "
+                f"{stats['reuses']} reuses")
+        if hasattr(grabber, 'allocations'):
+            line += f" | capture: {grabber.allocations} allocated"
+        print(line)
+    
+    def check_frame_count(self, grabber):
+        """Lossless sources: every frame (every recorded frame, for a replay) must have reached the controllers"""
+        if not getattr(grabber, 'lossless', False):
+            return
+        expected = getattr(grabber, 'frame_count', None) or self.frame_id
+        if self.frames_output == expected:
+            print(f"✅ All {expected} frames processed")
+        else:
+            print(f"⚠️  Only {self.frames_output} of {expected} frames processed")
+    
+    def print_cursor_stats(self):
+        """Cursor thread tick rate, jitter and interval histogram over the run"""
+        stats = self.mouse_controller.krunker_controller.cursor_clock.stats
+        if not stats.ticks:
+            return
+        print(f"🎯 Cursor clock: {stats.describe()}")
+        stats.print_histogram()
+    
+    def handle_command(self, command):
+        """Apply a control command from the preview window keys or the headless control channel"""
+        if command == 'quit':
+            print("Quit key pressed - exiting...")
+            self.pipeline.stop()
+        elif command == 'toggle':
+            self.toggle_control()
+        elif command == 'sens_up':
+            self.change_sensitivity(0.1)
+        elif command == 'sens_down':
+            self.change_sensitivity(-0.1)
+    
     def display_status(self, frame, wasd_states, gun_active, shoot_status, 
                       left_status, tongue_status, head_yaw, head_pitch, tongue_out):
         """Display clean, organized status overlay"""
@@ -1158,13 +565,12 @@ class LeaningControlSystem:
     
     def _draw_panel(self, frame, x, y, width, height, title, alpha=0.7):
         """Draw a semi-transparent panel with title"""
-        # Create overlay
-        overlay = frame.copy()
-        cv2.rectangle(overlay, (x, y), (x + width, y + height), (0, 0, 0), -1)
-        cv2.rectangle(overlay, (x, y), (x + width, y + height), (255, 255, 255), 2)
-        
-        # Blend overlay
-        cv2.addWeighted(overlay, alpha, frame, 1 - alpha, 0, frame)
+        # Darken the panel area in place (blending with black = scaling), no full-frame overlay copy
+        x0, y0 = max(x, 0), max(y, 0)
+        panel = frame[y0:y + height + 1, x0:x + width + 1]
+        np.multiply(panel, 1 - alpha, out=panel, casting='unsafe')
+        border = int(255 * alpha)
+        cv2.rectangle(frame, (x, y), (x + width, y + height), (border, border, border), 2)
         
         # Add title
         cv2.putText(frame, title, (x + 5, y - 5), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
@@ -1193,5 +599,106 @@ class LeaningControlSystem:
             cv2.putText(frame, key.upper(), (kx - 6, ky + 4), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 0), 2)
 
 if __name__ == "__main__":
-    system = LeaningControlSystem()
-    system.run()
+    parser = argparse.ArgumentParser(description="FingerGuns leaning control system")
+    parser.add_argument("--source", default="0",
+                        help="Camera index or video file path (default: 0)")
+    parser.add_argument("--serial", action="store_true",
+                        help="Run all pipeline stages one after another on the main thread")
+    parser.add_argument("--queue-size", type=int, default=1,
+                        help="Frame queue size between capture, preprocess and inference (default: 1)")
+    parser.add_argument("--drop-policy", choices=DROP_POLICIES, default="drop_oldest",
+                        help="What to do when a frame queue is full (default: drop_oldest)")
+    parser.add_argument("--sequential-inference", action="store_true",
+                        help="Run Hands, Pose and FaceMesh one after another instead of in parallel")
+    parser.add_argument("--record", metavar="DIR",
+                        help="Record raw frames and capture timestamps to a session directory")
+    parser.add_argument("--replay", metavar="DIR",
+                        help="Replay a recorded session instead of using a camera (no real input is sent)")
+    parser.add_argument("--fast", action="store_true",
+                        help="With --replay: process every frame as fast as possible instead of original pacing")
+    parser.add_argument("--results", metavar="FILE",
+                        help="Write per-frame controller results as JSON lines (default for --replay: DIR/results.jsonl)")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="Write per-frame hand/face/pose landmarks to a landmark trace file")
+    parser.add_argument("--headless", action="store_true",
+                        help="Low-latency mode: no preview window or drawing; control via stdin/UDP/hotkeys")
+    parser.add_argument("--control-port", type=int, default=DEFAULT_PORT,
+                        help=f"With --headless: UDP port for control commands on 127.0.0.1 (default: {DEFAULT_PORT}, 0 = off)")
+    parser.add_argument("--hotkeys", action="store_true",
+                        help="With --headless: also accept global hotkeys (Ctrl+Alt+G toggles, needs pynput)")
+    parser.add_argument("--hand-roi", action="store_true",
+                        help="Run hand landmarks on a crop around the previous frame's hands")
+    parser.add_argument("--scheme", choices=list(CONTROL_SCHEMES), default=DEFAULT_SCHEME,
+                        help="Control scheme: which landmark sources drive movement (default: head-tilt)")
+    parser.add_argument("--scheduler", choices=SCHEDULERS, default="slots",
+                        help="Face/pose scheduling: fixed 1-in-3 on the same frame, slots (1-in-3, "
+                             "staggered) or adaptive (default: slots)")
+    parser.add_argument("--max-cost-ms", type=float, default=None,
+                        help="With --scheduler slots: defer a model that would push a frame past this cost")
+    parser.add_argument("--budget-ms", type=float, default=30.0,
+                        help="With --scheduler adaptive: inference time budget per frame (default: 30)")
+    parser.add_argument("--schedule-log", metavar="FILE",
+                        help="Write per-frame scheduling decisions and inference times as JSON lines")
+    parser.add_argument("--face-model", choices=FACE_MODELS, default="mesh",
+                        help="Face landmarks: full FaceMesh, or FaceDetection keypoints with FaceMesh only "
+                             "to confirm an open mouth (default: mesh)")
+    parser.add_argument("--no-face-flow", action="store_true",
+                        help="Don't track face keypoints with optical flow between FaceMesh runs")
+    parser.add_argument("--cursor-predictor", choices=["none"] + list(PREDICTOR_MODELS), default="none",
+                        help="Move the cursor along a constant-velocity (cv) or constant-acceleration (ca) "
+                             "Kalman estimate of the fingertip between frames (default: none)")
+    parser.add_argument("--backend", choices=BACKENDS, default="solutions",
+                        help="Inference runtime: legacy MediaPipe solutions graphs, Tasks landmarkers in "
+                             "LIVE_STREAM mode, or hands on LiteRT + XNNPACK (default: solutions)")
+    parser.add_argument("--model-dir", metavar="DIR", default=None,
+                        help="With --backend tasks/litert: directory with the .task/.tflite model files")
+    parser.add_argument("--threads", action="append", metavar="MODEL=N",
+                        help="Inference threads for a model, e.g. hands=2 (litert hands only; repeatable)")
+    parser.add_argument("--cpus", action="append", metavar="MODEL=CPUS",
+                        help="Pin a model to CPUs, e.g. hands=0-1 or face=3 (Linux; repeatable)")
+    parser.add_argument("--no-landmark-filter", action="store_true",
+                        help="Use raw landmarks instead of One-Euro filtered ones")
+    parser.add_argument("--gesture-config", metavar="FILE", default=None,
+                        help="Left hand gesture mappings (default: gesture_config.json next to this script)")
+    parser.add_argument("--gesture-model", metavar="FILE", default=None,
+                        help="Finger states from a trained model (gesture_model.py train) instead of the rules")
+    parser.add_argument("--cursor-rate", metavar="HZ", type=int, default=120,
+                        help="Cursor thread tick rate, up to 1000 Hz (default: 120)")
+    parser.add_argument("--warm-up-runs", type=int, default=3,
+                        help="Inference runs on a synthetic frame before the first camera frame (0 to skip, default: 3)")
+    parser.add_argument("--hand-size", default="full",
+                        help="Hands input size, WxH or 'full' (default: full)")
+    parser.add_argument("--pose-size", default="640x360",
+                        help="Pose input size, WxH or 'full' (default: 640x360)")
+    parser.add_argument("--face-size", default="640x360",
+                        help="FaceMesh input size, WxH or 'full' (default: 640x360)")
+    args = parser.parse_args()
+    
+    source = args.source
+    output = None
+    results_path = args.results
+    if args.replay:
+        source = ReplayFrameSource(args.replay, realtime=not args.fast)
+        output = RecordingSink()  # Capture controller output without touching the real keyboard/mouse
+        results_path = results_path or os.path.join(args.replay, 'results.jsonl')
+    elif results_path:
+        output = RecordingSink(forward=default_sink())
+    
+    system = LeaningControlSystem(parallel_inference=not args.sequential_inference, output=output,
+                                  hand_roi=args.hand_roi, scheme=args.scheme,
+                                  scheduler=args.scheduler, budget_ms=args.budget_ms,
+                                  max_cost_ms=args.max_cost_ms, face_flow=not args.no_face_flow,
+                                  cursor_predictor=args.cursor_predictor,
+                                  landmark_filter=not args.no_landmark_filter,
+                                  backend=args.backend, model_dir=args.model_dir,
+                                  runtime=parse_runtime(args.threads, args.cpus), face_model=args.face_model,
+                                  warm_up_runs=args.warm_up_runs, gesture_config=args.gesture_config,
+                                  gesture_model=args.gesture_model, cursor_rate=args.cursor_rate,
+                                  model_sizes={'hands': parse_size(args.hand_size),
+                                               'pose': parse_size(args.pose_size),
+                                               'face': parse_size(args.face_size)})
+    system.run(source, threaded=not args.serial,
+               queue_size=args.queue_size, drop_policy=args.drop_policy,
+               record_path=args.record, results_path=results_path, trace_path=args.trace,
+               headless=args.headless, hotkeys=args.hotkeys, control_port=args.control_port,
+               schedule_log_path=args.schedule_log)
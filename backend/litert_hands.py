@@ -0,0 +1,266 @@
+"""
+LITERT HANDS
+MediaPipe's own palm detection + hand landmark models (.tflite) run directly
+on the LiteRT / TensorFlow Lite interpreter with its default XNNPACK CPU
+delegate, instead of inside a MediaPipe graph. The interpreter takes an
+explicit thread count, which the MediaPipe graphs don't expose.
+
+The per-frame logic follows the Hands graph in tracking mode:
+- Hands found on the previous frame give this frame's ROIs (rotated squares
+  around the palm). Palm detection only runs while fewer than max_hands hands
+  are tracked, and its detections are merged into the tracked ROIs.
+- Each ROI is warped to 224x224 and sent to the landmark model. Hands with a
+  presence score below min_tracking_confidence are dropped.
+- Landmarks are projected back to normalized frame coordinates.
+
+process() returns the same shape as mp.solutions Hands (multi_hand_landmarks,
+multi_handedness), so it drops into ParallelInferenceRunner unchanged.
+
+The models come from the mediapipe package (modules/palm_detection,
+modules/hand_landmark) or from a directory holding the same file names.
+"""
+
+import math
+import os
+
+import cv2
+import numpy as np
+
+from landmark_trace import Classification, ClassificationList, LegacyResults, to_landmark_list
+
+PALM_MODEL = os.path.join('palm_detection', 'palm_detection_full.tflite')
+LANDMARK_MODEL = os.path.join('hand_landmark', 'hand_landmark_full.tflite')
+
+PALM_SIZE = 192
+LANDMARK_SIZE = 224
+
+
+def load_interpreter(path, threads=None):
+    """LiteRT interpreter (XNNPACK is its default CPU delegate) from whichever package is installed"""
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            try:
+                from tensorflow.lite import Interpreter
+            except ImportError:
+                raise ImportError("The litert backend needs ai-edge-litert (pip install ai-edge-litert), "
+                                  "tflite-runtime or tensorflow")
+    interpreter = Interpreter(model_path=path, num_threads=threads)
+    interpreter.allocate_tensors()
+    return interpreter
+
+
+def model_file(relative_path, model_dir=None):
+    """Path of a MediaPipe .tflite model: model_dir/<file name>, else the copy inside the mediapipe package"""
+    if model_dir:
+        return os.path.join(model_dir, os.path.basename(relative_path))
+    import mediapipe
+    path = os.path.join(os.path.dirname(mediapipe.__file__), 'modules', relative_path)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{path} not found - pass a directory holding {os.path.basename(relative_path)}")
+    return path
+
+
+def _ssd_anchors(input_size=PALM_SIZE, strides=(8, 16, 16, 16)):
+    """Anchor centers of the palm detector (SsdAnchorsCalculator with fixed anchor size)"""
+    anchors = []
+    layer = 0
+    while layer < len(strides):
+        stride = strides[layer]
+        per_cell = 0
+        # Consecutive layers with the same stride share one grid
+        while layer < len(strides) and strides[layer] == stride:
+            per_cell += 2  # Aspect ratio 1.0 + the interpolated scale
+            layer += 1
+        size = int(math.ceil(input_size / stride))
+        ys, xs = np.meshgrid((np.arange(size) + 0.5) / size, (np.arange(size) + 0.5) / size, indexing='ij')
+        centers = np.stack([xs.ravel(), ys.ravel()], axis=1)
+        anchors.append(np.repeat(centers, per_cell, axis=0))
+    return np.concatenate(anchors).astype(np.float32)
+
+
+def _normalize_angle(angle):
+    return angle - 2 * math.pi * math.floor((angle + math.pi) / (2 * math.pi))
+
+
+def _rotation(x0, y0, x1, y1):
+    """Rotation (radians) that makes the wrist -> finger direction point up"""
+    return _normalize_angle(math.pi / 2 - math.atan2(-(y1 - y0), x1 - x0))
+
+
+def _transform_rect(cx, cy, width, height, rotation, scale, shift_y):
+    """RectTransformationCalculator: shift along the rotated y axis, square the long side, scale"""
+    cx += -height * shift_y * math.sin(rotation)
+    cy += height * shift_y * math.cos(rotation)
+    side = max(width, height) * scale
+    return cx, cy, side, rotation
+
+
+def _weighted_nms(boxes, keypoints, scores, threshold=0.3):
+    """Weighted non-max suppression (boxes as x0, y0, x1, y1): overlapping detections are averaged"""
+    order = np.argsort(-scores)
+    results = []
+    while len(order):
+        top = boxes[order[0]]
+        x0 = np.maximum(top[0], boxes[order, 0])
+        y0 = np.maximum(top[1], boxes[order, 1])
+        x1 = np.minimum(top[2], boxes[order, 2])
+        y1 = np.minimum(top[3], boxes[order, 3])
+        intersection = np.clip(x1 - x0, 0, None) * np.clip(y1 - y0, 0, None)
+        areas = (boxes[order, 2] - boxes[order, 0]) * (boxes[order, 3] - boxes[order, 1])
+        iou = intersection / np.maximum(areas + areas[0] - intersection, 1e-9)
+        group = order[iou > threshold]
+        weights = scores[group][:, None]
+        results.append((np.sum(boxes[group] * weights, axis=0) / weights.sum(),
+                        np.sum(keypoints[group] * weights[:, :, None], axis=0) / weights.sum(),
+                        float(scores[order[0]])))
+        order = order[iou <= threshold]
+    return results
+
+
+class LiteRTHands:
+    """Palm detection + hand landmarks on the LiteRT interpreter, tracking hands between frames"""
+    def __init__(self, threads=None, model_dir=None, max_num_hands=2,
+                 min_detection_confidence=0.7, min_tracking_confidence=0.5):
+        self.palm = load_interpreter(model_file(PALM_MODEL, model_dir), threads)
+        self.landmark = load_interpreter(model_file(LANDMARK_MODEL, model_dir), threads)
+        self.max_num_hands = max_num_hands
+        self.min_detection_confidence = min_detection_confidence
+        self.min_tracking_confidence = min_tracking_confidence
+        self.anchors = _ssd_anchors()
+        self.tracked = []  # ROIs (cx, cy, side, rotation) in pixels from the previous frame
+
+        self.palm_input = self.palm.get_input_details()[0]
+        palm_outputs = sorted(self.palm.get_output_details(), key=lambda d: d['shape'][-1], reverse=True)
+        self.palm_boxes, self.palm_scores = palm_outputs[0]['index'], palm_outputs[1]['index']
+        self.landmark_input = self.landmark.get_input_details()[0]
+        # Outputs by name: Identity = landmarks, Identity_1 = hand presence, Identity_2 = handedness
+        self.landmark_outputs = [d['index'] for d in sorted(self.landmark.get_output_details(),
+                                                            key=lambda d: d['name'])]
+
+    @staticmethod
+    def _tensor(image, detail):
+        if detail['dtype'] == np.uint8:
+            return image[None]
+        return (image.astype(np.float32) / 255.0)[None]
+
+    def _detect_palms(self, rgb_frame):
+        """Palm detections as ROIs (cx, cy, side, rotation) in frame pixels"""
+        h, w = rgb_frame.shape[:2]
+        # Letterbox to a square, as the detector was trained on
+        scale = PALM_SIZE / max(w, h)
+        resized = cv2.resize(rgb_frame, (int(round(w * scale)), int(round(h * scale))), interpolation=cv2.INTER_AREA)
+        pad_x, pad_y = (PALM_SIZE - resized.shape[1]) // 2, (PALM_SIZE - resized.shape[0]) // 2
+        square = np.zeros((PALM_SIZE, PALM_SIZE, 3), dtype=np.uint8)
+        square[pad_y:pad_y + resized.shape[0], pad_x:pad_x + resized.shape[1]] = resized
+
+        self.palm.set_tensor(self.palm_input['index'], self._tensor(square, self.palm_input))
+        self.palm.invoke()
+        raw = self.palm.get_tensor(self.palm_boxes)[0]
+        scores = 1.0 / (1.0 + np.exp(-np.clip(self.palm.get_tensor(self.palm_scores)[0, :, 0], -100, 100)))
+        keep = scores >= self.min_detection_confidence
+        if not keep.any():
+            return []
+        raw, scores, anchors = raw[keep], scores[keep], self.anchors[keep]
+
+        # Box centers and keypoints are offsets from the anchor, in input pixels
+        centers = raw[:, :2] / PALM_SIZE + anchors
+        sizes = raw[:, 2:4] / PALM_SIZE
+        boxes = np.concatenate([centers - sizes / 2, centers + sizes / 2], axis=1)
+        keypoints = raw[:, 4:18].reshape(-1, 7, 2) / PALM_SIZE + anchors[:, None, :]
+
+        rois = []
+        to_frame = np.array([PALM_SIZE / scale, PALM_SIZE / scale])
+        offset = np.array([pad_x / scale, pad_y / scale])
+        for box, points, score in _weighted_nms(boxes, keypoints, scores):
+            (x0, y0), (x1, y1) = box[:2] * to_frame - offset, box[2:] * to_frame - offset
+            points = points * to_frame - offset
+            # Keypoint 0 = wrist center, 2 = middle finger MCP
+            rotation = _rotation(points[0, 0], points[0, 1], points[2, 0], points[2, 1])
+            rois.append(_transform_rect((x0 + x1) / 2, (y0 + y1) / 2, x1 - x0, y1 - y0, rotation,
+                                        scale=2.6, shift_y=-0.5))
+        return rois
+
+    def _roi_from_landmarks(self, points):
+        """Next frame's ROI from this frame's hand landmarks (pixels), like HandLandmarksToRect"""
+        # Wrist -> weighted point between index, middle and ring MCPs
+        x1 = (points[5, 0] + points[13, 0]) / 4 + points[9, 0] / 2
+        y1 = (points[5, 1] + points[13, 1]) / 4 + points[9, 1] / 2
+        rotation = _rotation(points[0, 0], points[0, 1], x1, y1)
+        palm = points[[0, 1, 2, 3, 5, 6, 9, 10, 13, 14, 17, 18]]
+        # Box of the palm points in the hand's own (rotated) frame
+        cos, sin = math.cos(rotation), math.sin(rotation)
+        local = palm @ np.array([[cos, -sin], [sin, cos]])
+        low, high = local.min(axis=0), local.max(axis=0)
+        center = ((low + high) / 2) @ np.array([[cos, sin], [-sin, cos]])
+        width, height = high - low
+        return _transform_rect(center[0], center[1], width, height, rotation, scale=2.0, shift_y=-0.1)
+
+    def _landmarks(self, rgb_frame, roi):
+        """(21, 3) normalized landmarks, presence score and handedness score for one ROI"""
+        h, w = rgb_frame.shape[:2]
+        cx, cy, side, rotation = roi
+        cos, sin = math.cos(rotation), math.sin(rotation)
+        half = side / 2
+
+        def corner(u, v):
+            return (cx + u * half * cos - v * half * sin, cy + u * half * sin + v * half * cos)
+
+        source = np.float32([corner(-1, -1), corner(1, -1), corner(-1, 1)])
+        target = np.float32([(0, 0), (LANDMARK_SIZE, 0), (0, LANDMARK_SIZE)])
+        crop = cv2.warpAffine(rgb_frame, cv2.getAffineTransform(source, target), (LANDMARK_SIZE, LANDMARK_SIZE),
+                              flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT)
+
+        self.landmark.set_tensor(self.landmark_input['index'], self._tensor(crop, self.landmark_input))
+        self.landmark.invoke()
+        landmarks, presence, handedness = (self.landmark.get_tensor(index) for index in self.landmark_outputs[:3])
+        local = landmarks.reshape(21, 3) / LANDMARK_SIZE
+
+        # Crop coordinates -> frame pixels -> normalized
+        u, v = (local[:, 0] - 0.5) * side, (local[:, 1] - 0.5) * side
+        points = np.empty((21, 3), dtype=np.float32)
+        points[:, 0] = (cx + u * cos - v * sin) / w
+        points[:, 1] = (cy + u * sin + v * cos) / h
+        points[:, 2] = local[:, 2] * side / w
+        return points, float(presence.ravel()[0]), float(handedness.ravel()[0])
+
+    @staticmethod
+    def _overlaps(a, b, threshold=0.5):
+        """IoU of the axis-aligned squares around two ROIs"""
+        ax0, ay0, bx0, by0 = a[0] - a[2] / 2, a[1] - a[2] / 2, b[0] - b[2] / 2, b[1] - b[2] / 2
+        iw = max(0.0, min(ax0 + a[2], bx0 + b[2]) - max(ax0, bx0))
+        ih = max(0.0, min(ay0 + a[2], by0 + b[2]) - max(ay0, by0))
+        intersection = iw * ih
+        return intersection / (a[2] ** 2 + b[2] ** 2 - intersection + 1e-9) > threshold
+
+    def process(self, rgb_frame):
+        h, w = rgb_frame.shape[:2]
+        rois = list(self.tracked)
+        if len(rois) < self.max_num_hands:
+            for roi in self._detect_palms(rgb_frame):
+                # Tracked hands win over new detections of the same hand
+                if not any(self._overlaps(roi, existing) for existing in rois):
+                    rois.append(roi)
+        rois = rois[:self.max_num_hands]
+
+        hands, handedness, self.tracked = [], [], []
+        for roi in rois:
+            points, presence, right_score = self._landmarks(rgb_frame, roi)
+            if presence < self.min_tracking_confidence:
+                continue
+            hands.append(points)
+            # Handedness as the Hands graph reports it for a mirrored (selfie) image
+            label, score = ('Right', right_score) if right_score > 0.5 else ('Left', 1.0 - right_score)
+            handedness.append(ClassificationList([Classification(len(hands) - 1, label, score)]))
+            self.tracked.append(self._roi_from_landmarks(points[:, :2] * (w, h)))
+
+        if not hands:
+            return LegacyResults()
+        return LegacyResults(multi_hand_landmarks=[to_landmark_list(points) for points in hands],
+                             multi_handedness=handedness)
+
+    def close(self):
+        self.tracked = []
@@ -0,0 +1,308 @@
+"""
+STAGED PIPELINE EXECUTOR
+Runs the control loop as explicit stages connected by bounded queues:
+
+    capture -> preprocess -> inference -> decision -> output -> render
+
+Each stage runs on its own thread, so stages overlap across frames and the
+frame rate approaches the slowest single stage instead of the sum of all of
+them. The last stage can be pinned to the main thread (OpenCV windows must be
+driven from the main thread on macOS). Setting threaded=False runs every stage
+inline on the calling thread, which reproduces the old serial loop.
+
+Drop policies for the queue feeding a stage:
+    'block'       - producer waits until there is room (nothing is lost)
+    'drop_oldest' - newest item replaces the oldest queued one (latest-frame-wins)
+    'drop_newest' - new item is discarded when the queue is full
+"""
+
+import collections
+import threading
+import time
+
+DROP_POLICIES = ('block', 'drop_oldest', 'drop_newest')
+
+# End-of-stream marker passed down the pipeline (never dropped)
+END_OF_STREAM = object()
+
+
+class FramePacket:
+    """Everything the stages know about one camera frame"""
+    def __init__(self, frame_id, frame, capture_time, arrival_time=None):
+        self.frame_id = frame_id
+        self.frame = frame
+        self.capture_time = capture_time  # time.monotonic() at grab
+        # Latency is measured from here: the grab, or when a fast replay handed the frame out
+        # (its capture_time is the recorded timestamp, not a moment on this run's clock)
+        self.arrival_time = capture_time if arrival_time is None else arrival_time
+        self.rgb_frame = None
+        self.model_inputs = None  # Per-model images (PyramidFrame)
+
+        # Inference results (MediaPipe result objects)
+        self.hand_results = None
+        self.pose_results = None
+        self.face_results = None
+        self.tracked_face = None  # Flow-tracked face keypoints on frames without FaceMesh
+
+        # Decision / output state (filled by the control system stages)
+        self.state = {}
+        self.recorded_control = None  # Control ON/OFF a replayed frame was recorded with
+
+
+class BoundedQueue:
+    """Bounded FIFO between two stages with a configurable drop policy"""
+    def __init__(self, maxsize=2, drop_policy='block'):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy '{drop_policy}' (expected one of {DROP_POLICIES})")
+        self.maxsize = max(1, maxsize)
+        self.drop_policy = drop_policy
+        self.items = collections.deque()
+        self.cond = threading.Condition()
+        self.closed = False
+        self.dropped = 0
+
+    def put(self, item):
+        """Queue an item. Returns False if an item had to be dropped"""
+        with self.cond:
+            if item is END_OF_STREAM:
+                # Always deliver end-of-stream, even past maxsize
+                self.items.append(item)
+                self.cond.notify_all()
+                return True
+
+            dropped = False
+            if len(self.items) >= self.maxsize:
+                if self.drop_policy == 'drop_newest':
+                    self.dropped += 1
+                    return False
+                elif self.drop_policy == 'drop_oldest':
+                    self.items.popleft()
+                    self.dropped += 1
+                    dropped = True
+                else:
+                    while len(self.items) >= self.maxsize and not self.closed:
+                        self.cond.wait(0.1)
+                    if self.closed:
+                        return False
+
+            self.items.append(item)
+            self.cond.notify_all()
+            return not dropped
+
+    def get(self, timeout=0.1):
+        """Return the next item, or None on timeout"""
+        with self.cond:
+            if not self.items:
+                self.cond.wait(timeout)
+                if not self.items:
+                    return None
+            item = self.items.popleft()
+            self.cond.notify_all()
+            return item
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+
+class Stage:
+    """One pipeline stage: fn(packet) returns the packet to pass on, or None to drop it"""
+    def __init__(self, name, fn, queue_size=2, drop_policy='block', main_thread=False):
+        self.name = name
+        self.fn = fn
+        self.queue_size = queue_size
+        self.drop_policy = drop_policy
+        self.main_thread = main_thread
+
+        # Timing stats for the current report window
+        self.count = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def process(self, packet):
+        start = time.perf_counter()
+        try:
+            result = self.fn(packet)
+        except Exception as e:
+            print(f"Error in {self.name} stage: {e}")
+            result = None
+        elapsed = time.perf_counter() - start
+        self.count += 1
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+        return result
+
+    def take_stats(self):
+        """Return (avg_ms, max_ms) for the current window and reset it"""
+        avg_ms = (self.total_time / self.count * 1000) if self.count else 0.0
+        max_ms = self.max_time * 1000
+        self.count = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        return avg_ms, max_ms
+
+
+class Pipeline:
+    """
+    Runs a source function and a list of stages.
+    source() returns a FramePacket, None to retry, or END_OF_STREAM when finished.
+    """
+    def __init__(self, source, stages, threaded=True, report_interval=1.0, verbose=True):
+        self.source_stage = Stage('capture', lambda _: source())
+        self.stages = stages
+        self.threaded = threaded
+        self.report_interval = report_interval
+        self.verbose = verbose
+
+        # queues[i] feeds stages[i]
+        self.queues = [BoundedQueue(stage.queue_size, stage.drop_policy) for stage in stages]
+        self.threads = []
+        self.running = False
+
+        # Throughput and glass-to-output latency, measured at the last stage
+        self.lock = threading.Lock()
+        self.completed = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.window_start = None
+        self.last_report = None
+
+    def stop(self):
+        """Ask every stage to finish (safe to call from inside a stage)"""
+        self.running = False
+        for q in self.queues:
+            q.close()
+
+    def run(self):
+        """Run until the source ends or stop() is called. Blocks the calling thread"""
+        self.running = True
+        self.window_start = time.monotonic()
+        try:
+            if self.threaded:
+                self._run_threaded()
+            else:
+                self._run_serial()
+        except KeyboardInterrupt:
+            print("Interrupted by user")
+        finally:
+            self.stop()
+            for t in self.threads:
+                t.join(timeout=1.0)
+            self.threads = []
+
+    def _run_serial(self):
+        """Old-style loop: every stage inline, one frame at a time"""
+        while self.running:
+            packet = self.source_stage.process(None)
+            if packet is END_OF_STREAM:
+                break
+            if packet is None:
+                continue
+            for stage in self.stages:
+                packet = stage.process(packet)
+                if packet is None or not self.running:
+                    break
+            else:
+                self._complete(packet)
+
+    def _run_threaded(self):
+        main_index = None
+        for i, stage in enumerate(self.stages):
+            if stage.main_thread:
+                main_index = i
+                continue
+            t = threading.Thread(target=self._stage_loop, args=(i,), daemon=True, name=f"stage-{stage.name}")
+            t.start()
+            self.threads.append(t)
+
+        source_thread = threading.Thread(target=self._source_loop, daemon=True, name="stage-capture")
+        source_thread.start()
+        self.threads.append(source_thread)
+
+        if main_index is not None:
+            self._stage_loop(main_index)
+        else:
+            while self.running:
+                time.sleep(0.05)
+
+    def _source_loop(self):
+        first_queue = self.queues[0] if self.queues else None
+        while self.running:
+            packet = self.source_stage.process(None)
+            if packet is None:
+                continue
+            if first_queue is None:
+                if packet is END_OF_STREAM:
+                    break
+                self._complete(packet)
+                continue
+            first_queue.put(packet)
+            if packet is END_OF_STREAM:
+                break
+
+    def _stage_loop(self, index):
+        stage = self.stages[index]
+        in_queue = self.queues[index]
+        out_queue = self.queues[index + 1] if index + 1 < len(self.queues) else None
+
+        while self.running:
+            packet = in_queue.get()
+            if packet is None:
+                continue
+            if packet is END_OF_STREAM:
+                if out_queue is not None:
+                    out_queue.put(END_OF_STREAM)
+                else:
+                    self.stop()
+                break
+
+            packet = stage.process(packet)
+            if packet is None:
+                continue
+            if out_queue is not None:
+                out_queue.put(packet)
+            else:
+                self._complete(packet)
+
+    def _complete(self, packet):
+        """Record a frame that made it through every stage"""
+        now = time.monotonic()
+        report = None
+        with self.lock:
+            self.completed += 1
+            if packet.arrival_time is not None:
+                latency = now - packet.arrival_time
+                self.latency_sum += latency
+                self.latency_max = max(self.latency_max, latency)
+            if now - self.window_start >= self.report_interval:
+                report = self._roll(now)
+        if report and self.verbose:
+            self._print_report(report)
+
+    def _roll(self, now):
+        elapsed = max(now - self.window_start, 1e-6)
+        report = {
+            'fps': self.completed / elapsed,
+            'latency_avg_ms': (self.latency_sum / self.completed * 1000) if self.completed else 0.0,
+            'latency_max_ms': self.latency_max * 1000,
+            'stages': {},
+            'dropped': {},
+        }
+        for stage in [self.source_stage] + self.stages:
+            report['stages'][stage.name] = stage.take_stats()
+        for stage, q in zip(self.stages, self.queues):
+            report['dropped'][stage.name] = q.dropped
+        self.completed = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.window_start = now
+        self.last_report = report
+        return report
+
+    def _print_report(self, report):
+        stage_times = " | ".join(f"{name} {avg:.1f}ms" for name, (avg, _) in report['stages'].items())
+        drops = ", ".join(f"{name}:{n}" for name, n in report['dropped'].items() if n)
+        print(f"⚙️  Pipeline FPS: {report['fps']:.1f} | latency avg {report['latency_avg_ms']:.1f}ms "
+              f"max {report['latency_max_ms']:.1f}ms | {stage_times}"
+              + (f" | dropped {drops}" if drops else ""))
@@ -0,0 +1,251 @@
+"""
+PREPROCESSING
+Mirroring / color conversion into reused buffers, and per-model input resolutions.
+
+FrameBufferPool hands out frame-sized arrays from a ring per buffer kind, so
+flip, cvtColor and the pyramid levels write into existing memory (dst=)
+instead of allocating ~2.7 MB per 720p image per frame. The ring must be
+deeper than the number of frames in flight in the pipeline; the control
+system sizes it from its stage queues. allocations / reuses show whether the
+steady state is allocation-free.
+
+Pose and FaceMesh only feed a handful of coarse landmarks into
+calculate_head_pose / detect_mouth_open, and both graphs shrink their input to
+~256px internally anyway, so giving them the full 1280x720 frame mostly costs
+image conversion time. FramePyramid keeps one downscaled level per configured
+size, built at most once per frame into reusable buffers. Landmarks are
+normalized, so results from any level need no remapping.
+
+Benchmark latency saved and landmark error against full resolution:
+    python3 preprocess.py clip.mp4 --size 640x360 --size 480x270
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+from gestures import FACE_KEYPOINTS
+
+# Default input size per model: None = full camera resolution
+DEFAULT_MODEL_SIZES = {
+    'hands': None,
+    'pose': (640, 360),
+    'face': (640, 360),
+}
+
+# Pose torso points used by calculate_lean_pose
+POSE_KEYPOINTS = [11, 12, 23, 24]
+
+
+def parse_size(text):
+    """'640x360' -> (640, 360); 'full' -> None"""
+    if text is None or text.lower() == 'full':
+        return None
+    width, height = text.lower().split('x')
+    return int(width), int(height)
+
+
+def readonly(array):
+    """Read-only view of an array (MediaPipe can then use the memory without copying it)"""
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+class FrameBufferPool:
+    """Ring of reusable frame-sized buffers per (key, shape, dtype)"""
+    def __init__(self, depth=8):
+        self.depth = depth
+        self.rings = {}  # (key, shape, dtype) -> [buffers, next index]
+        self.allocations = 0
+        self.allocated_bytes = 0
+        self.reuses = 0
+
+    def acquire(self, key, shape, dtype=np.uint8):
+        """Next buffer for this key; reused once the ring is full"""
+        ring_key = (key, tuple(shape), np.dtype(dtype).str)
+        ring = self.rings.get(ring_key)
+        if ring is None:
+            ring = self.rings[ring_key] = [[], 0]
+        buffers, index = ring
+        if len(buffers) < self.depth:
+            buffer = np.empty(shape, dtype=dtype)
+            buffers.append(buffer)
+            self.allocations += 1
+            self.allocated_bytes += buffer.nbytes
+        else:
+            buffer = buffers[index]
+            ring[1] = (index + 1) % self.depth
+            self.reuses += 1
+        return buffer
+
+    def stats(self):
+        return {
+            'allocations': self.allocations,
+            'allocated_mb': self.allocated_bytes / 1e6,
+            'reuses': self.reuses,
+        }
+
+
+def mirror_to_rgb(frame, pool):
+    """Mirror a BGR frame and convert it to RGB, both into pooled buffers -> (bgr, read-only rgb)"""
+    bgr = cv2.flip(frame, 1, dst=pool.acquire('bgr', frame.shape, frame.dtype))
+    rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB, dst=pool.acquire('rgb', frame.shape, frame.dtype))
+    return bgr, readonly(rgb)
+
+
+class PyramidFrame:
+    """One frame's pyramid: levels are materialized on first use and cached"""
+    def __init__(self, pyramid, base, buffers):
+        self.pyramid = pyramid
+        self.base = base
+        self.buffers = buffers  # size -> preallocated buffer for this frame slot
+        self.built = {}
+
+    def level(self, size):
+        """Image at the given (width, height); None = full resolution"""
+        if size is None or size == (self.base.shape[1], self.base.shape[0]):
+            return self.base
+        image = self.built.get(size)
+        if image is None:
+            # Build from the smallest already-available level that is still larger (cheaper resize)
+            source = self.base
+            for built_size, built_image in self.built.items():
+                if built_size[0] >= size[0] and built_size[1] >= size[1] and built_image.shape[1] < source.shape[1]:
+                    source = built_image
+            image = self.buffers.get(size)
+            image = readonly(cv2.resize(source, size, dst=image, interpolation=cv2.INTER_AREA))
+            self.pyramid.resizes += 1
+            self.built[size] = image
+        return image
+
+    def for_model(self, name):
+        return self.level(self.pyramid.model_sizes.get(name))
+
+    def __getitem__(self, name):
+        # Lets ParallelInferenceRunner treat the pyramid like {model name: image}
+        return self.for_model(name)
+
+
+class FramePyramid:
+    """Per-model downscaled inputs, built into pooled buffers"""
+    def __init__(self, model_sizes=None, depth=4, pool=None, names=None):
+        self.model_sizes = dict(DEFAULT_MODEL_SIZES)
+        if model_sizes:
+            self.model_sizes.update(model_sizes)
+        if names is not None:
+            # Only the models that actually run get pyramid levels
+            self.model_sizes = {name: size for name, size in self.model_sizes.items() if name in names}
+        # Frames in flight (preprocess -> queue -> inference) must not share buffers
+        self.pool = pool if pool is not None else FrameBufferPool(depth)
+        self.resizes = 0
+
+    def build(self, rgb_frame):
+        """Start a pyramid for this frame (levels are built lazily, once)"""
+        buffers = {}
+        for size in set(self.model_sizes.values()):
+            if size is None:
+                continue
+            shape = (size[1], size[0]) + rgb_frame.shape[2:]
+            buffers[size] = self.pool.acquire(('pyramid', size), shape, rgb_frame.dtype)
+        return PyramidFrame(self, rgb_frame, buffers)
+
+    def describe(self):
+        return ", ".join(f"{name} {'full' if size is None else f'{size[0]}x{size[1]}'}"
+                         for name, size in self.model_sizes.items())
+
+
+def _keypoints(landmark_list, indices, w, h):
+    return np.array([(landmark_list.landmark[i].x * w, landmark_list.landmark[i].y * h) for i in indices])
+
+
+def benchmark(source, sizes, max_frames=150):
+    """Latency saved and landmark error of Pose/FaceMesh at reduced resolution vs full resolution"""
+    from inference import build_models
+    from gestures import calculate_head_pose, detect_mouth_open
+
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        print(f"Error: Could not open {source}")
+        return None
+    frames = []
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(cv2.cvtColor(cv2.flip(frame, 1), cv2.COLOR_BGR2RGB))
+    cap.release()
+    if not frames:
+        print("No frames read")
+        return None
+    h, w = frames[0].shape[:2]
+    print(f"Loaded {len(frames)} frames ({w}x{h}) from {source}")
+
+    def run(size):
+        models = build_models(('pose', 'face'))
+        pyramid = FramePyramid({'face': size, 'pose': size}, depth=1)
+        times = {'face': [], 'pose': []}
+        outputs = []
+        for rgb_frame in frames:
+            levels = pyramid.build(rgb_frame)
+            frame_out = {}
+            for name in ('face', 'pose'):
+                start = time.perf_counter()
+                result = models[name].process(levels.for_model(name))
+                times[name].append(time.perf_counter() - start)
+                frame_out[name] = result
+            outputs.append(frame_out)
+        for model in models.values():
+            model.close()
+        return times, outputs
+
+    ref_times, ref_outputs = run(None)
+    report = {'full': {name: float(np.mean(t) * 1000) for name, t in ref_times.items()}}
+    print(f"{'full':>10}: face {report['full']['face']:.1f}ms | pose {report['full']['pose']:.1f}ms")
+
+    for size in sizes:
+        times, outputs = run(size)
+        face_err, pose_err, pitch_err, mouth_agree, mouth_total = [], [], [], 0, 0
+        for ref, out in zip(ref_outputs, outputs):
+            ref_face, out_face = ref['face'].multi_face_landmarks, out['face'].multi_face_landmarks
+            if ref_face and out_face:
+                a, b = ref_face[0], out_face[0]
+                face_err.append(np.mean(np.linalg.norm(_keypoints(a, FACE_KEYPOINTS, w, h) -
+                                                       _keypoints(b, FACE_KEYPOINTS, w, h), axis=1)))
+                pitch_err.append(abs(calculate_head_pose(a, w, h)[1] - calculate_head_pose(b, w, h)[1]))
+                mouth_agree += detect_mouth_open(a) == detect_mouth_open(b)
+                mouth_total += 1
+            if ref['pose'].pose_landmarks and out['pose'].pose_landmarks:
+                pose_err.append(np.mean(np.linalg.norm(_keypoints(ref['pose'].pose_landmarks, POSE_KEYPOINTS, w, h) -
+                                                       _keypoints(out['pose'].pose_landmarks, POSE_KEYPOINTS, w, h), axis=1)))
+        label = f"{size[0]}x{size[1]}"
+        report[label] = {
+            'face': float(np.mean(times['face']) * 1000),
+            'pose': float(np.mean(times['pose']) * 1000),
+            'face_error_px': float(np.mean(face_err)) if face_err else None,
+            'pose_error_px': float(np.mean(pose_err)) if pose_err else None,
+            'pitch_error': float(np.mean(pitch_err)) if pitch_err else None,
+            'mouth_agreement': mouth_agree / mouth_total if mouth_total else None,
+        }
+        r = report[label]
+        print(f"{label:>10}: face {r['face']:.1f}ms ({report['full']['face'] - r['face']:+.1f} saved) | "
+              f"pose {r['pose']:.1f}ms ({report['full']['pose'] - r['pose']:+.1f} saved)")
+        if face_err:
+            print(f"{'':>10}  face keypoint error {r['face_error_px']:.2f}px | pitch error {r['pitch_error']:.2f} | "
+                  f"mouth state agreement {r['mouth_agreement'] * 100:.1f}%")
+        if pose_err:
+            print(f"{'':>10}  pose torso error {r['pose_error_px']:.2f}px")
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark reduced Pose/FaceMesh input resolution")
+    parser.add_argument("source", help="Recorded video clip")
+    parser.add_argument("--size", action="append", default=None,
+                        help="Reduced size to test, e.g. 640x360 (repeatable, default: 640x360 and 480x270)")
+    parser.add_argument("--frames", type=int, default=150, help="Max frames to use (default: 150)")
+    args = parser.parse_args()
+    benchmark(args.source, [parse_size(s) for s in (args.size or ['640x360', '480x270'])], args.frames)
@@ -0,0 +1,397 @@
+"""
+INFERENCE SCHEDULING
+Decides which models run on each frame. Hands run on every frame (the cursor
+needs them); the secondary models (face, pose) are scheduled.
+
+    FixedScheduler     secondary models every `interval` frames (the original 1-in-3 rule)
+    SlotScheduler      same cadence, but round-robin: each secondary model gets its own
+                       frame slot, so face and pose never land on the same frame and the
+                       per-frame cost is capped at hands + one secondary model
+    AdaptiveScheduler  per-frame time budget + online per-model latency. Each model's
+                       cadence follows how close its signals (head pitch / tilt, body
+                       lean) are to a WASD threshold, and how fast they are moving:
+                       near a threshold the model runs every frame, far from one it
+                       backs off to every max_interval frames.
+
+Decisions and inference frame times go to a ScheduleLog, which prints the
+frame-time distribution so policies can be compared. Benchmark on a clip or a
+recorded session:
+    python3 scheduler.py clip.mp4 --budget-ms 25
+    python3 scheduler.py sessions/run1 --scheme body-lean
+"""
+
+import json
+import os
+import time
+
+SCHEDULERS = ('fixed', 'slots', 'adaptive')
+
+# Which state values each secondary model feeds
+MODEL_SIGNALS = {
+    'face': ('head_pitch', 'head_yaw'),
+    'pose': ('body_lean',),
+}
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def wasd_thresholds(wasd_controller, scheme):
+    """Signal -> the WASD thresholds it is compared against (where a small change flips a key)"""
+    c = wasd_controller
+    lateral = (-c.strong_lean_threshold, -c.lean_threshold, c.lean_threshold, c.strong_lean_threshold)
+    thresholds = {}
+    if scheme.pitch:
+        thresholds['head_pitch'] = (-c.pitch_threshold, c.pitch_threshold_back)
+    if scheme.lateral == 'head':
+        thresholds['head_yaw'] = lateral
+    elif scheme.lateral == 'body':
+        thresholds['body_lean'] = lateral
+    return thresholds
+
+
+class FixedScheduler:
+    """Every secondary model on every `interval`-th frame (all on the same frame)"""
+    name = 'fixed'
+
+    def __init__(self, models, interval=3):
+        self.secondary = [name for name in models if name != 'hands']
+        self.interval = interval
+
+    def select(self, frame_id):
+        if frame_id % self.interval == 0:
+            return ['hands'] + self.secondary
+        return ['hands']
+
+    def observe(self, frame_id, state):
+        pass
+
+    def record(self, latencies_ms):
+        pass
+
+    def decision(self):
+        return None
+
+
+class SlotScheduler:
+    """
+    Round-robin slots: each secondary model runs once every `interval` frames, on its own frame.
+    At most per_frame secondary models share a frame. With max_cost_ms, a model whose measured
+    latency would push the frame over the cap is deferred to the next frame, for at most one
+    interval, so nothing starves.
+    """
+    name = 'slots'
+
+    def __init__(self, models, interval=3, per_frame=1, max_cost_ms=None, parallel=True):
+        self.secondary = [name for name in models if name != 'hands']
+        self.per_frame = per_frame
+        self.max_cost_ms = max_cost_ms
+        self.parallel = parallel
+
+        # Spread the models evenly over the period (face on slot 0, pose on slot 1 of 3, ...)
+        groups = -(-len(self.secondary) // per_frame)  # ceil
+        self.period = max(interval, groups)
+        self.slots = [[] for _ in range(self.period)]
+        for i, name in enumerate(self.secondary):
+            self.slots[(i // per_frame) * self.period // max(groups, 1)].append(name)
+
+        self.latency_ms = {name: None for name in models}
+        self.deferred = {}  # name -> frame it was originally due
+        self.last_decision = None
+
+    def select(self, frame_id):
+        names = ['hands']
+        cost = self.latency_ms.get('hands') or 0.0
+        for name in self.slots[frame_id % self.period]:
+            self.deferred.setdefault(name, frame_id)
+
+        # Oldest deferral first
+        deferred = []
+        for name, due in sorted(self.deferred.items(), key=lambda item: item[1]):
+            estimate = self.latency_ms[name] or 0.0
+            new_cost = max(cost, estimate) if self.parallel else cost + estimate
+            overdue = frame_id - due >= self.period
+            within_cap = self.max_cost_ms is None or new_cost <= self.max_cost_ms
+            if overdue or (len(names) - 1 < self.per_frame and within_cap):
+                names.append(name)
+                cost = new_cost
+            else:
+                deferred.append(name)
+        for name in names[1:]:
+            del self.deferred[name]
+
+        self.last_decision = {'slot': frame_id % self.period, 'estimate_ms': round(cost, 2), 'deferred': deferred}
+        return names
+
+    def observe(self, frame_id, state):
+        pass
+
+    def record(self, latencies_ms):
+        """Measured per-model latency (ms), used for the max_cost_ms check"""
+        for name, latency in latencies_ms.items():
+            previous = self.latency_ms.get(name)
+            self.latency_ms[name] = latency if previous is None else previous + 0.2 * (latency - previous)
+
+    def decision(self):
+        return self.last_decision
+
+
+class AdaptiveScheduler:
+    """Budget-driven cadence per model, from measured latency and distance to WASD thresholds"""
+    name = 'adaptive'
+
+    def __init__(self, models, budget_ms=30.0, thresholds=None, min_interval=1, max_interval=8,
+                 urgency_margin=6.0, parallel=True, smoothing=0.2):
+        self.secondary = [name for name in models if name != 'hands']
+        self.budget_ms = budget_ms
+        self.thresholds = thresholds or {}  # signal -> thresholds (see wasd_thresholds)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.urgency_margin = urgency_margin  # Within this distance of a threshold, urgency ramps to 1
+        self.parallel = parallel  # Parallel models cost max(latencies), sequential ones their sum
+        self.smoothing = smoothing
+
+        self.latency_ms = {name: None for name in models}  # Running average per model
+        self.last_run = {name: None for name in self.secondary}
+        self.urgency = {name: 1.0 for name in self.secondary}  # Unknown state: run often
+        self.signals = {}  # signal -> (value, frame_id, velocity per frame)
+        self.last_decision = None
+
+    def observe(self, frame_id, state):
+        """Update urgencies from the newest decision state (head pitch / tilt, body lean)"""
+        for signal, thresholds in self.thresholds.items():
+            value = state.get(signal)
+            if value is None:
+                continue
+            value = float(value)
+            previous = self.signals.get(signal)
+            velocity = previous[2] if previous else 0.0
+            if previous and value != previous[0] and frame_id > previous[1]:
+                velocity = (value - previous[0]) / (frame_id - previous[1])
+            if previous is None or value != previous[0]:
+                self.signals[signal] = (value, frame_id, velocity)
+
+        for name in self.secondary:
+            urgencies = []
+            for signal in MODEL_SIGNALS.get(name, ()):
+                if signal in self.signals and signal in self.thresholds:
+                    value, _, velocity = self.signals[signal]
+                    distance = min(abs(value - t) for t in self.thresholds[signal])
+                    # Where the signal could be by the time the model would next run anyway
+                    distance = max(0.0, distance - abs(velocity) * self.max_interval)
+                    urgencies.append(max(0.0, 1.0 - distance / self.urgency_margin))
+            if urgencies:
+                self.urgency[name] = max(urgencies)
+            elif not any(signal in self.thresholds for signal in MODEL_SIGNALS.get(name, ())):
+                # Model feeds no WASD threshold (e.g. face in a body-lean scheme only gives pitch
+                # and the scope): keep it at a middle cadence
+                self.urgency[name] = 0.5
+
+    def interval(self, name):
+        span = self.max_interval - self.min_interval
+        return max(self.min_interval, int(round(self.max_interval - span * self.urgency[name])))
+
+    def select(self, frame_id):
+        names = ['hands']
+        cost = self.latency_ms.get('hands') or 0.0
+
+        # Due models, most overdue (relative to their cadence) first
+        due = []
+        for name in self.secondary:
+            last = self.last_run[name]
+            staleness = frame_id - last if last is not None else self.max_interval
+            interval = self.interval(name)
+            if staleness >= interval:
+                due.append((staleness / interval, staleness, name))
+        due.sort(reverse=True)
+
+        skipped = []
+        for _, staleness, name in due:
+            estimate = self.latency_ms[name] or 0.0
+            new_cost = max(cost, estimate) if self.parallel else cost + estimate
+            # Over budget only if the model would otherwise starve
+            if new_cost <= self.budget_ms or staleness >= self.max_interval:
+                names.append(name)
+                cost = new_cost
+                self.last_run[name] = frame_id
+            else:
+                skipped.append(name)
+
+        self.last_decision = {
+            'estimate_ms': round(cost, 2),
+            'intervals': {name: self.interval(name) for name in self.secondary},
+            'skipped': skipped,
+        }
+        return names
+
+    def record(self, latencies_ms):
+        """Feed back measured per-model latency (ms) for the models that just ran"""
+        for name, latency in latencies_ms.items():
+            previous = self.latency_ms.get(name)
+            self.latency_ms[name] = latency if previous is None else (
+                previous + self.smoothing * (latency - previous))
+
+    def decision(self):
+        return self.last_decision
+
+
+def build_scheduler(kind, models, scheme=None, wasd_controller=None, budget_ms=30.0, parallel=True,
+                    max_cost_ms=None):
+    """Scheduler by name: 'fixed' (1-in-3), 'slots' (staggered 1-in-3) or 'adaptive'"""
+    if kind == 'fixed':
+        return FixedScheduler(models)
+    if kind == 'slots':
+        return SlotScheduler(models, max_cost_ms=max_cost_ms, parallel=parallel)
+    if kind == 'adaptive':
+        thresholds = wasd_thresholds(wasd_controller, scheme) if wasd_controller and scheme else None
+        return AdaptiveScheduler(models, budget_ms=budget_ms, thresholds=thresholds, parallel=parallel)
+    raise ValueError(f"Unknown scheduler '{kind}' (expected one of {SCHEDULERS})")
+
+
+class ScheduleLog:
+    """Per-frame scheduling decisions and inference frame times (optionally as JSON lines)"""
+    def __init__(self, path=None, name=''):
+        self.path = path
+        self.name = name
+        self.file = open(path, 'w') if path else None
+        self.frame_ms = []
+        self.runs = {}
+
+    def log(self, frame_id, names, frame_ms, decision=None):
+        self.frame_ms.append(frame_ms)
+        for name in names:
+            self.runs[name] = self.runs.get(name, 0) + 1
+        if self.file:
+            record = {'frame_id': frame_id, 'models': names, 'frame_ms': round(frame_ms, 3)}
+            if decision:
+                record['decision'] = decision
+            self.file.write(json.dumps(record) + '\n')
+
+    def summary(self):
+        times = self.frame_ms
+        if not times:
+            return {'frames': 0}
+        p50 = _percentile(times, 50)
+        p99 = _percentile(times, 99)
+        return {
+            'frames': len(times),
+            'mean_ms': sum(times) / len(times),
+            'p50_ms': p50,
+            'p90_ms': _percentile(times, 90),
+            'p99_ms': p99,
+            'max_ms': max(times),
+            'jitter_p99_ms': p99 - p50,  # How much slower the worst 1% of frames are than a typical one
+            'runs_per_frame': {name: count / len(times) for name, count in self.runs.items()},
+        }
+
+    def print_summary(self):
+        s = self.summary()
+        if not s['frames']:
+            return s
+        rates = ", ".join(f"{name} {rate:.2f}" for name, rate in s['runs_per_frame'].items())
+        print(f"🗓️  {self.name or 'Schedule'}: {s['frames']} frames | mean {s['mean_ms']:.1f}ms | "
+              f"p50 {s['p50_ms']:.1f} | p90 {s['p90_ms']:.1f} | p99 {s['p99_ms']:.1f} | "
+              f"max {s['max_ms']:.1f}ms | p99 jitter {s['jitter_p99_ms']:.1f}ms | runs/frame: {rates}")
+        return s
+
+    def close(self):
+        summary = self.print_summary()
+        if self.file:
+            self.file.write(json.dumps({'summary': summary}) + '\n')
+            self.file.close()
+            print(f"🗓️  Schedule log written to {self.path}")
+        return summary
+
+
+def _load_frames(source, max_frames):
+    """Mirrored RGB frames from a video clip or a recorded session directory"""
+    import cv2
+
+    if os.path.isdir(source):
+        from session_recorder import SessionReader
+        raw = SessionReader(source).frames[:max_frames]
+    else:
+        cap = cv2.VideoCapture(source)
+        if not cap.isOpened():
+            print(f"Error: Could not open {source}")
+            return []
+        raw = []
+        while len(raw) < max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            raw.append(frame)
+        cap.release()
+    return [cv2.cvtColor(cv2.flip(frame, 1), cv2.COLOR_BGR2RGB) for frame in raw]
+
+
+def benchmark(source, kinds=SCHEDULERS, budget_ms=30.0, scheme_name=None, max_frames=300, max_cost_ms=None):
+    """Run each scheduling policy over the same frames and compare inference frame times / jitter"""
+    from inference import build_models, ParallelInferenceRunner
+    from controllers import ControlCore
+    from input_sink import RecordingSink
+
+    frames = _load_frames(source, max_frames)
+    if not frames:
+        print("No frames read")
+        return None
+    h, w = frames[0].shape[:2]
+    print(f"Loaded {len(frames)} frames ({w}x{h}) from {source}")
+
+    report = {}
+    for kind in kinds:
+        core = ControlCore(output=RecordingSink(), scheme=scheme_name)
+        models = build_models(core.scheme.sources)
+        runner = ParallelInferenceRunner(models)
+        scheduler = build_scheduler(kind, models, core.scheme, core.wasd_controller, budget_ms,
+                                    max_cost_ms=max_cost_ms)
+        log = ScheduleLog(name=kind)
+        runner.run(-1, frames[0], list(models))  # Warm up
+
+        face_results = pose_results = None
+        for frame_id, rgb_frame in enumerate(frames):
+            names = scheduler.select(frame_id)
+            start = time.perf_counter()
+            results = runner.run(frame_id, rgb_frame, names)
+            frame_ms = (time.perf_counter() - start) * 1000
+            scheduler.record({name: runner.latencies[name] * 1000 for name in names})
+            log.log(frame_id, names, frame_ms, scheduler.decision())
+
+            face_results = results.get('face', face_results)
+            pose_results = results.get('pose', pose_results)
+            face = face_results.multi_face_landmarks[0] if face_results and face_results.multi_face_landmarks else None
+            pose = pose_results.pose_landmarks if pose_results else None
+            scheduler.observe(frame_id, core.decide(face, None, w, h, pose))
+
+        runner.close()
+        for model in models.values():
+            model.close()
+        report[kind] = log.close()
+
+    if 'fixed' in report and report['fixed']['frames']:
+        base = report['fixed']['jitter_p99_ms']
+        for kind in report:
+            if kind != 'fixed':
+                print(f"📉 p99 jitter {kind} vs fixed: {report[kind]['jitter_p99_ms']:.1f}ms vs {base:.1f}ms")
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare inference scheduling policies on a recorded clip")
+    parser.add_argument("source", help="Recorded video clip or session directory")
+    parser.add_argument("--scheduler", action="append", choices=SCHEDULERS, default=None,
+                        help="Policy to run (repeatable, default: all)")
+    parser.add_argument("--budget-ms", type=float, default=30.0, help="Adaptive per-frame budget (default: 30)")
+    parser.add_argument("--max-cost-ms", type=float, default=None, help="Slots: per-frame cost cap (default: none)")
+    parser.add_argument("--scheme", default=None, help="Control scheme (default: head-tilt)")
+    parser.add_argument("--frames", type=int, default=300, help="Max frames to use (default: 300)")
+    args = parser.parse_args()
+    benchmark(args.source, kinds=args.scheduler or SCHEDULERS, budget_ms=args.budget_ms,
+              scheme_name=args.scheme, max_frames=args.frames, max_cost_ms=args.max_cost_ms)
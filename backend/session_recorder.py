@@ -0,0 +1,267 @@
+"""
+SESSION RECORD & REPLAY
+Deterministic benchmarking without a webcam.
+
+A recorded session is a directory:
+    meta.json        - frame shape, frame count, duration
+    frames.raw       - raw BGR frames (uint8), back to back, as captured (not flipped)
+    timestamps.npy   - float64 monotonic capture time of every frame
+    control.npy      - uint8 control ON/OFF state at every frame
+
+ReplayFrameSource reads a session through a memory map and has the same
+interface as LatestFrameGrabber, so replayed frames go through exactly the
+same pipeline as live ones. It can replay at the original pacing (dropping
+frames like a real camera when the pipeline falls behind) or as fast as
+possible (every frame, in order).
+
+ResultsLog writes one JSON line per frame with the output of every controller
+and the input events they produced, plus a summary with FPS and latency.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+from frame_grabber import CaptureStats
+
+FORMAT_VERSION = 1
+
+
+class SessionRecorder:
+    """Writes raw frames and their capture timestamps to a session directory"""
+    def __init__(self, path, max_pending=64):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.frames_file = open(os.path.join(path, 'frames.raw'), 'wb')
+        self.timestamps = []
+        self.control_states = []
+        self.shape = None
+        self.dtype = None
+
+        # Disk writes happen on a background thread so capture isn't blocked by I/O spikes
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.thread = threading.Thread(target=self._write_loop, daemon=True)
+        self.thread.start()
+        print(f"🔴 Recording session to {path}")
+
+    def write(self, frame, capture_time, control_enabled=False):
+        """Queue one raw frame for writing"""
+        if self.shape is None:
+            self.shape = frame.shape
+            self.dtype = frame.dtype
+        elif frame.shape != self.shape:
+            print(f"⚠️  Skipping frame with shape {frame.shape} (session is {self.shape})")
+            return
+        self.timestamps.append(capture_time)
+        self.control_states.append(1 if control_enabled else 0)
+        self.pending.put(frame)
+
+    def _write_loop(self):
+        while True:
+            frame = self.pending.get()
+            if frame is None:
+                break
+            self.frames_file.write(np.ascontiguousarray(frame).tobytes())
+
+    def close(self):
+        """Flush frames and write the index files"""
+        self.pending.put(None)
+        self.thread.join()
+        self.frames_file.close()
+
+        timestamps = np.asarray(self.timestamps, dtype=np.float64)
+        np.save(os.path.join(self.path, 'timestamps.npy'), timestamps)
+        np.save(os.path.join(self.path, 'control.npy'), np.asarray(self.control_states, dtype=np.uint8))
+
+        height, width, channels = self.shape if self.shape else (0, 0, 0)
+        meta = {
+            'version': FORMAT_VERSION,
+            'width': width,
+            'height': height,
+            'channels': channels,
+            'dtype': str(self.dtype) if self.dtype else 'uint8',
+            'frame_count': len(timestamps),
+            'duration': float(timestamps[-1] - timestamps[0]) if len(timestamps) > 1 else 0.0,
+        }
+        with open(os.path.join(self.path, 'meta.json'), 'w') as f:
+            json.dump(meta, f, indent=2)
+        print(f"🔴 Recorded {meta['frame_count']} frames ({meta['duration']:.1f}s) to {self.path}")
+
+
+class SessionReader:
+    """Memory-mapped access to a recorded session"""
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'meta.json')) as f:
+            self.meta = json.load(f)
+        if self.meta.get('version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported session format version: {self.meta.get('version')}")
+
+        self.timestamps = np.load(os.path.join(path, 'timestamps.npy'))
+        control_path = os.path.join(path, 'control.npy')
+        self.control_states = np.load(control_path) if os.path.exists(control_path) else None
+
+        count = self.meta['frame_count']
+        shape = (count, self.meta['height'], self.meta['width'], self.meta['channels'])
+        self.frames = np.memmap(os.path.join(path, 'frames.raw'), dtype=self.meta['dtype'],
+                                mode='r', shape=shape) if count else np.zeros(shape, dtype=np.uint8)
+
+    def __len__(self):
+        return self.meta['frame_count']
+
+
+class ReplayFrameSource:
+    """Feeds a recorded session into the pipeline (same interface as LatestFrameGrabber)"""
+    def __init__(self, path, realtime=True, stats_interval=1.0, verbose=True):
+        self.path = path
+        self.realtime = realtime
+        self.stats_interval = stats_interval
+        self.verbose = verbose
+        self.stats = CaptureStats()
+        self.reader = None
+        self.running = False
+        self.finished = False
+        self.next_index = 0
+        self.start_time = None
+        self.frame_id = 0
+        self.frame_count = 0  # Frames in the recorded session
+        self.last_control_enabled = None  # Recorded control state of the last frame read
+
+    @property
+    def lossless(self):
+        """Without realtime pacing every recorded frame is meant to be processed, in order"""
+        return not self.realtime
+
+    def start(self):
+        try:
+            self.reader = SessionReader(self.path)
+        except (OSError, ValueError) as e:
+            print(f"Error: Could not open session {self.path}: {e}")
+            return False
+        self.running = True
+        self.frame_count = len(self.reader)
+        self.finished = self.frame_count == 0
+        self.next_index = 0
+        self.start_time = time.monotonic()
+        self.stats.reset(self.start_time)
+        print(f"⏯️  Replaying {len(self.reader)} frames from {self.path} "
+              f"({'original pacing' if self.realtime else 'as fast as possible'})")
+        return True
+
+    def read(self, timeout=1.0):
+        """Returns: (ret, frame, capture_time) like LatestFrameGrabber.read"""
+        if not self.running or self.next_index >= len(self.reader):
+            self.finished = True
+            return False, None, None
+
+        timestamps = self.reader.timestamps
+        if self.realtime:
+            # Frame i is "captured" at its original offset from the first frame
+            offsets = timestamps - timestamps[0]
+            now = time.monotonic()
+            elapsed = now - self.start_time
+            due = int(np.searchsorted(offsets, elapsed, side='right')) - 1
+            if due < self.next_index:
+                wait = offsets[self.next_index] - elapsed
+                if wait > timeout:
+                    time.sleep(timeout)
+                    return False, None, None
+                time.sleep(max(0.0, wait))
+                due = self.next_index
+            # Frames that became due while the pipeline was busy are dropped, like a camera would
+            skipped = due - self.next_index
+            self.stats.dropped += skipped
+            self.stats.captured += skipped + 1
+            index = due
+            capture_time = self.start_time + offsets[index]
+        else:
+            index = self.next_index
+            self.stats.captured += 1
+            # Recorded timestamps (rebased like above), so timing-dependent results don't depend on
+            # how fast this machine gets through the frames
+            capture_time = self.start_time + (timestamps[index] - timestamps[0])
+
+        self.next_index = index + 1
+        self.frame_id = index + 1
+        frame = self.reader.frames[index]
+        if self.reader.control_states is not None:
+            self.last_control_enabled = bool(self.reader.control_states[index])
+
+        now = time.monotonic()
+        if self.realtime:
+            self.stats.add_age(now - capture_time)
+        if now - self.stats.window_start >= self.stats_interval:
+            report = self.stats.roll(now)
+            if self.verbose:
+                print(f"⏯️  Replay: {report['delivered_fps']:.1f} fps delivered, "
+                      f"{report['dropped']} dropped, age avg {report['age_avg_ms']:.1f}ms")
+        return True, frame, capture_time
+
+    def get_stats(self):
+        return self.stats.last_report
+
+    def stop(self):
+        self.running = False
+        self.reader = None
+        print("⏯️  Replay stopped")
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    return float(np.percentile(np.asarray(values), pct))
+
+
+class ResultsLog:
+    """Per-frame controller results as JSON lines, plus an FPS/latency summary"""
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'w')
+        self.lock = threading.Lock()
+        self.latencies = []
+        self.first_time = None
+        self.last_time = None
+
+    def log(self, frame_id, capture_time, results, events=None):
+        now = time.monotonic()
+        latency = now - capture_time if capture_time is not None else None
+        record = {'frame_id': frame_id}
+        if latency is not None:
+            record['latency_ms'] = round(latency * 1000, 3)
+        record.update(results)
+        if events:
+            record['events'] = events
+        with self.lock:
+            if self.first_time is None:
+                self.first_time = now
+            self.last_time = now
+            if latency is not None:
+                self.latencies.append(latency * 1000)
+            self.file.write(json.dumps(record) + '\n')
+
+    def summary(self):
+        frames = len(self.latencies)
+        elapsed = (self.last_time - self.first_time) if frames > 1 else 0.0
+        return {
+            'frames': frames,
+            'fps': (frames - 1) / elapsed if elapsed > 0 else 0.0,
+            'latency_avg_ms': float(np.mean(self.latencies)) if frames else 0.0,
+            'latency_p50_ms': _percentile(self.latencies, 50),
+            'latency_p95_ms': _percentile(self.latencies, 95),
+            'latency_max_ms': float(np.max(self.latencies)) if frames else 0.0,
+        }
+
+    def close(self):
+        summary = self.summary()
+        with self.lock:
+            self.file.write(json.dumps({'summary': summary}) + '\n')
+            self.file.close()
+        print(f"📈 {summary['frames']} frames | {summary['fps']:.1f} FPS | latency avg "
+              f"{summary['latency_avg_ms']:.1f}ms p50 {summary['latency_p50_ms']:.1f}ms "
+              f"p95 {summary['latency_p95_ms']:.1f}ms max {summary['latency_max_ms']:.1f}ms")
+        print(f"📈 Controller results written to {self.path}")
+        return summary
@@ -6,7 +6,7 @@ from setuptools import setup
 import os
 
 APP = ['leaning_control_system.py']
-DATA_FILES = []
+DATA_FILES = ['gesture_config.json']
 
 # Check if icon exists
 icon_file = 'icon.icns' if os.path.exists('icon.icns') else None
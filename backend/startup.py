@@ -0,0 +1,130 @@
+"""
+STARTUP
+Cold-start helpers: build models concurrently, warm them up on a synthetic
+frame, and time each startup phase.
+
+- BackgroundBuild starts one thread per model as soon as it is created. The
+  camera can be opened while the graphs load, and result() joins the builds.
+  Graph construction mostly runs in native code without the GIL, so the builds
+  really overlap.
+- warm_up() runs every model a few times on a synthetic frame. The first
+  inference of a graph (executor threads, XNNPACK packing, lazy
+  sub-graphs) is much slower than steady state and otherwise lands on the
+  first real frames.
+- StartupTimer records (possibly overlapping) phases and prints a summary.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+
+class StartupTimer:
+    """Wall-clock phases of startup, relative to when the timer was created"""
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.phases = {}  # name -> (start, end) in seconds since origin
+        self.notes = {}
+        self.lock = threading.Lock()
+
+    def record(self, name, start, end, note=None):
+        with self.lock:
+            self.phases[name] = (start - self.origin, end - self.origin)
+            if note:
+                self.notes[name] = note
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter())
+
+    def note(self, name, text):
+        with self.lock:
+            self.notes[name] = text
+
+    def duration(self, name):
+        start, end = self.phases[name]
+        return end - start
+
+    def summary(self):
+        """{phase: {'start_s', 'end_s', 'duration_s'}} plus 'ready_s' (end of the last phase)"""
+        report = {name: {'start_s': start, 'end_s': end, 'duration_s': end - start}
+                  for name, (start, end) in self.phases.items()}
+        report['ready_s'] = max((end for _, end in self.phases.values()), default=0.0)
+        return report
+
+    def print_summary(self):
+        report = self.summary()
+        print(f"⏱️  Startup: ready in {report['ready_s']:.2f}s")
+        for name, (start, end) in sorted(self.phases.items(), key=lambda item: item[1][0]):
+            note = f"  ({self.notes[name]})" if name in self.notes else ""
+            print(f"   {name:<10} {end - start:5.2f}s  [{start:5.2f}s → {end:5.2f}s]{note}")
+
+
+class BackgroundBuild:
+    """Runs each {name: builder()} on its own thread right away; result() joins them"""
+    def __init__(self, builders, timer=None, phase='models'):
+        self.timer = timer
+        self.phase = phase
+        self.models = {}
+        self.errors = {}
+        self.durations = {}
+        self.start = time.perf_counter()
+        self.threads = [threading.Thread(target=self._build, args=(name, builder), daemon=True,
+                                         name=f"build-{name}")
+                        for name, builder in builders.items()]
+        self.order = list(builders)
+        for thread in self.threads:
+            thread.start()
+
+    def _build(self, name, builder):
+        start = time.perf_counter()
+        try:
+            self.models[name] = builder()
+        except Exception as e:
+            self.errors[name] = e
+        self.durations[name] = time.perf_counter() - start
+
+    def result(self):
+        """{name: model} in builder order (raises the first build error)"""
+        for thread in self.threads:
+            thread.join()
+        if self.timer and self.phase not in self.timer.phases:
+            end = self.start + max(self.durations.values(), default=0.0)
+            detail = " | ".join(f"{name} {self.durations[name]:.2f}s" for name in self.order)
+            self.timer.record(self.phase, self.start, end, f"{detail}, built concurrently")
+        for name in self.order:
+            if name in self.errors:
+                # Don't leak the graphs that did load
+                for model in self.models.values():
+                    model.close()
+                raise self.errors[name]
+        return {name: self.models[name] for name in self.order}
+
+
+def synthetic_frame(width=1280, height=720, seed=0):
+    """Mid-gray RGB frame with mild noise (enough texture for the detectors to do real work)"""
+    rng = np.random.default_rng(seed)
+    frame = np.full((height, width, 3), 128, dtype=np.uint8)
+    frame += rng.integers(0, 32, size=frame.shape, dtype=np.uint8)
+    return frame
+
+
+def warm_up(runner, inputs, names, runs=3, timer=None):
+    """Run every model `runs` times on the same input; returns {name: [latency ms per run]}"""
+    latencies = {name: [] for name in names}
+    start = time.perf_counter()
+    for run in range(runs):
+        # Negative frame ids never collide with real frames
+        runner.run(-1 - run, inputs, names)
+        for name in names:
+            latencies[name].append(runner.latencies.get(name, 0.0) * 1000)
+    if timer:
+        detail = " | ".join(f"{name} {values[0]:.0f}ms → {values[-1]:.0f}ms" for name, values in latencies.items())
+        timer.record('warm-up', start, time.perf_counter(), detail)
+    return latencies
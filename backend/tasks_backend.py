@@ -0,0 +1,296 @@
+"""
+MEDIAPIPE TASKS BACKEND
+Hands, Pose and FaceMesh on the MediaPipe Tasks API (HandLandmarker,
+PoseLandmarker, FaceLandmarker) in LIVE_STREAM mode, as an alternative to the
+legacy mp.solutions graphs.
+
+detect_async() returns immediately. MediaPipe runs the graph on its own thread
+and hands the result to a callback, so no worker threads are needed to overlap
+models. If a graph is still busy when the next frame arrives, MediaPipe drops
+that frame instead of queueing it. The runner then reports no result (None) for
+that model on the dropped frame, which it finds out about when a later frame's
+result comes back.
+
+Results are converted to the legacy result shapes (multi_hand_landmarks +
+multi_handedness, pose_landmarks, multi_face_landmarks), so the controllers,
+the trace writer and the preview work the same with either backend.
+
+The .task model files are downloaded into backend/models/ on first use
+(or pass a directory that already has them).
+
+Compare both backends on the same recorded input (throughput, end-to-end latency):
+    python3 tasks_backend.py clip.mp4
+    python3 tasks_backend.py sessions/run1 --fps 30
+"""
+
+import os
+import threading
+import time
+import urllib.request
+
+import mediapipe as mp
+import numpy as np
+from mediapipe.tasks.python import BaseOptions, vision
+
+from inference import ParallelInferenceRunner, _model_input, _percentile
+from landmark_trace import Classification, ClassificationList, LegacyResults, to_landmark_list
+
+COMPARED_BACKENDS = ('solutions', 'tasks')
+DEFAULT_MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models')
+
+MODEL_FILES = {
+    'hands': ('hand_landmarker.task',
+              'https://storage.googleapis.com/mediapipe-models/hand_landmarker/hand_landmarker/float16/latest/'
+              'hand_landmarker.task'),
+    'pose': ('pose_landmarker_lite.task',
+             'https://storage.googleapis.com/mediapipe-models/pose_landmarker/pose_landmarker_lite/float16/latest/'
+             'pose_landmarker_lite.task'),
+    'face': ('face_landmarker.task',
+             'https://storage.googleapis.com/mediapipe-models/face_landmarker/face_landmarker/float16/latest/'
+             'face_landmarker.task'),
+}
+
+
+def model_path(name, model_dir=None):
+    """Path of a model's .task file, downloaded on first use"""
+    model_dir = model_dir or DEFAULT_MODEL_DIR
+    filename, url = MODEL_FILES[name]
+    path = os.path.join(model_dir, filename)
+    if not os.path.exists(path):
+        os.makedirs(model_dir, exist_ok=True)
+        print(f"⬇️  Downloading {filename} from {url}")
+        urllib.request.urlretrieve(url, path + '.part')
+        os.replace(path + '.part', path)
+    return path
+
+
+def _landmark_list(landmarks):
+    """List of Tasks NormalizedLandmarks -> legacy landmark list"""
+    return to_landmark_list(np.array([(l.x, l.y, l.z, l.visibility or 0.0) for l in landmarks], dtype=np.float32))
+
+
+def _convert_hands(result):
+    if not result.hand_landmarks:
+        return LegacyResults()
+    handedness = [ClassificationList([Classification(c.index, c.category_name, c.score) for c in categories])
+                  for categories in result.handedness]
+    return LegacyResults(multi_hand_landmarks=[_landmark_list(hand) for hand in result.hand_landmarks],
+                         multi_handedness=handedness)
+
+
+def _convert_pose(result):
+    if not result.pose_landmarks:
+        return LegacyResults()
+    return LegacyResults(pose_landmarks=_landmark_list(result.pose_landmarks[0]))
+
+
+def _convert_face(result):
+    if not result.face_landmarks:
+        return LegacyResults()
+    return LegacyResults(multi_face_landmarks=[_landmark_list(face) for face in result.face_landmarks])
+
+
+def _create_landmarker(name, path, callback):
+    """Tasks landmarker in LIVE_STREAM mode, with the same settings as the legacy graphs"""
+    base = BaseOptions(model_asset_path=path)
+    live = vision.RunningMode.LIVE_STREAM
+    if name == 'hands':
+        return vision.HandLandmarker.create_from_options(vision.HandLandmarkerOptions(
+            base_options=base, running_mode=live, num_hands=2,
+            min_hand_detection_confidence=0.7, min_tracking_confidence=0.5, result_callback=callback))
+    if name == 'pose':
+        return vision.PoseLandmarker.create_from_options(vision.PoseLandmarkerOptions(
+            base_options=base, running_mode=live, num_poses=1,
+            min_pose_detection_confidence=0.5, min_tracking_confidence=0.5, result_callback=callback))
+    if name == 'face':
+        return vision.FaceLandmarker.create_from_options(vision.FaceLandmarkerOptions(
+            base_options=base, running_mode=live, num_faces=1,
+            min_face_detection_confidence=0.5, min_tracking_confidence=0.5, result_callback=callback))
+    raise ValueError(f"Unknown model '{name}'")
+
+
+_CONVERTERS = {'hands': _convert_hands, 'pose': _convert_pose, 'face': _convert_face}
+
+
+class TaskModel:
+    """One Tasks landmarker; results arrive on MediaPipe's callback thread"""
+    def __init__(self, name, path):
+        self.name = name
+        self.on_result = None  # Set by TasksInferenceRunner: on_result(name, timestamp_ms, results)
+        self.landmarker = _create_landmarker(name, path, self._callback)
+
+    def detect_async(self, rgb_frame, timestamp_ms):
+        image = mp.Image(image_format=mp.ImageFormat.SRGB, data=np.ascontiguousarray(rgb_frame))
+        self.landmarker.detect_async(image, timestamp_ms)
+
+    def _callback(self, result, image, timestamp_ms):
+        try:
+            results = _CONVERTERS[self.name](result)
+        except Exception as e:
+            print(f"Error converting {self.name} result: {e}")
+            results = None
+        if self.on_result:
+            self.on_result(self.name, timestamp_ms, results)
+
+    def close(self):
+        self.landmarker.close()
+
+
+def build_task_models(names=('hands', 'pose', 'face'), model_dir=None):
+    """Create the requested Tasks landmarkers in LIVE_STREAM mode: {'hands', 'pose', 'face'}"""
+    return {name: TaskModel(name, model_path(name, model_dir))
+            for name in ('hands', 'pose', 'face') if name in names}
+
+
+class TasksInferenceRunner(ParallelInferenceRunner):
+    """
+    ParallelInferenceRunner interface (submit / collect / run / latencies) over
+    detect_async. Frames are matched to callbacks by their detection timestamp.
+    """
+    def __init__(self, models):
+        super().__init__(models, parallel=False)
+        self.timestamps = {}  # detection timestamp (ms) -> (frame_id, submit time)
+        self.last_timestamp_ms = -1
+        self.dropped = {name: 0 for name in models}
+        self.lock = threading.Lock()
+        for model in models.values():
+            model.on_result = self._on_result
+
+    def submit(self, frame_id, rgb_frame, names):
+        """Start inference of the given models on a frame (never blocks on the graphs)"""
+        with self.cond:
+            self.frames[frame_id] = {'pending': set(names), 'results': {}}
+        inputs = {name: _model_input(rgb_frame, name) for name in names}
+
+        # LIVE_STREAM timestamps must increase strictly per landmarker
+        with self.lock:
+            timestamp_ms = max(self.last_timestamp_ms + 1, int(time.monotonic() * 1000))
+            self.last_timestamp_ms = timestamp_ms
+            self.timestamps[timestamp_ms] = (frame_id, time.perf_counter(), set(names))
+
+        for name in names:
+            try:
+                self.models[name].detect_async(inputs[name], timestamp_ms)
+            except Exception as e:
+                print(f"Error in {name} inference: {e}")
+                self._on_result(name, timestamp_ms, None)
+
+    def _on_result(self, name, timestamp_ms, results):
+        now = time.perf_counter()
+        delivered = []
+        with self.lock:
+            # Callbacks come in timestamp order: a frame still waiting on this model
+            # with an older timestamp was dropped by the graph
+            for ts in sorted(self.timestamps):
+                if ts > timestamp_ms:
+                    break
+                frame_id, submitted, waiting = self.timestamps[ts]
+                if name not in waiting:
+                    continue
+                waiting.discard(name)
+                if ts == timestamp_ms:
+                    self.latencies[name] = now - submitted
+                    delivered.append((frame_id, results))
+                else:
+                    self.dropped[name] += 1
+                    delivered.append((frame_id, None))
+                if not waiting:
+                    del self.timestamps[ts]
+        for frame_id, frame_results in delivered:
+            self._deliver(frame_id, name, frame_results)
+
+    def close(self):
+        """Nothing to stop: the landmarkers own their threads (closed by their owner)"""
+        pass
+
+
+def stream(runner, frames, names, fps=30.0):
+    """
+    Submit frames at the source rate without waiting for results; a collector
+    thread takes them in order. Returns (per-frame latency s or None if a model
+    dropped the frame, elapsed s).
+    """
+    submit_times = {}
+    latencies = [None] * len(frames)
+
+    def collect():
+        for frame_id in range(len(frames)):
+            while frame_id not in submit_times:
+                time.sleep(0.0005)
+            results = runner.collect(frame_id, timeout=2.0)
+            if len(results) == len(names) and all(r is not None for r in results.values()):
+                latencies[frame_id] = time.perf_counter() - submit_times[frame_id]
+
+    collector = threading.Thread(target=collect, daemon=True)
+    collector.start()
+    start = time.perf_counter()
+    for frame_id, rgb_frame in enumerate(frames):
+        if fps:
+            delay = start + frame_id / fps - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        submit_times[frame_id] = time.perf_counter()
+        runner.submit(frame_id, rgb_frame, names)
+    collector.join()
+    return latencies, time.perf_counter() - start
+
+
+def benchmark(source, backends=COMPARED_BACKENDS, scheme_name=None, fps=30.0, max_frames=300, model_dir=None):
+    """Run both backends over the same frames: completed frames/s, drops and submit-to-result latency"""
+    from control_schemes import get_scheme
+    from inference_backends import build_backend
+    from scheduler import _load_frames
+
+    frames = _load_frames(source, max_frames)
+    if not frames:
+        print("No frames read")
+        return None
+    names = get_scheme(scheme_name).sources
+    pacing = f"{fps:g} FPS" if fps else "as fast as possible"
+    print(f"Loaded {len(frames)} frames from {source} | models: {', '.join(names)} every frame | {pacing}")
+
+    report = {}
+    for backend in backends:
+        try:
+            models, runner = build_backend(backend, names, model_dir=model_dir)
+        except Exception as e:
+            print(f"{backend:>9}: unavailable ({e})")
+            continue
+
+        # Warm up so graph initialization isn't counted
+        runner.run(-1, frames[0], names)
+        latencies, elapsed = stream(runner, frames, names, fps)
+        runner.close()
+        for model in models.values():
+            model.close()
+
+        completed = [latency for latency in latencies if latency is not None]
+        report[backend] = {
+            'frames': len(frames),
+            'completed': len(completed),
+            'dropped': len(frames) - len(completed),
+            'throughput_fps': len(completed) / elapsed,
+            'latency_p50_ms': _percentile(completed, 50) * 1000,
+            'latency_p95_ms': _percentile(completed, 95) * 1000,
+        }
+        r = report[backend]
+        print(f"{backend:>9}: {r['throughput_fps']:.1f} frames/s complete ({r['dropped']} dropped) | "
+              f"latency p50 {r['latency_p50_ms']:.1f}ms p95 {r['latency_p95_ms']:.1f}ms")
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the legacy solutions backend vs MediaPipe Tasks LIVE_STREAM")
+    parser.add_argument("source", help="Recorded video clip or session directory")
+    parser.add_argument("--backend", action="append", choices=COMPARED_BACKENDS,
+                        help="Backend to run (repeatable, default: both)")
+    parser.add_argument("--scheme", default=None, help="Control scheme whose models run (default: head-tilt)")
+    parser.add_argument("--fps", type=float, default=30.0, help="Submit rate, 0 = as fast as possible (default: 30)")
+    parser.add_argument("--frames", type=int, default=300, help="Max frames to use (default: 300)")
+    parser.add_argument("--model-dir", metavar="DIR", default=None,
+                        help="Directory with the .task model files (default: backend/models, downloaded if missing)")
+    args = parser.parse_args()
+    benchmark(args.source, tuple(args.backend or COMPARED_BACKENDS), args.scheme, args.fps, args.frames,
+              args.model_dir)
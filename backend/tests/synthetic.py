@@ -0,0 +1,58 @@
+"""Synthetic hand landmarks and traces for the tests (no camera, no MediaPipe)"""
+
+import numpy as np
+
+from gesture_table import FINGERS
+from landmark_trace import TRACE_DTYPE, TraceWriter, HANDEDNESS_LEFT, HANDEDNESS_RIGHT
+
+# Landmark ids per finger: MCP, PIP, DIP, tip (thumb: MCP, IP, tip)
+_CHAINS = {'index': (5, 6, 7, 8), 'middle': (9, 10, 11, 12), 'ring': (13, 14, 15, 16), 'pinky': (17, 18, 19, 20)}
+
+
+def make_hand(fingers=(), wrist=(0.5, 0.8)):
+    """(21, 3) hand with the named fingers straight up and the others curled back toward the palm"""
+    unknown = set(fingers) - set(FINGERS)
+    assert not unknown, unknown
+    wx, wy = wrist
+    points = np.zeros((21, 3))
+    points[0] = (wx, wy, 0.0)
+    # Thumb: CMC, MCP, IP, tip, out to the left
+    points[1] = (wx - 0.03, wy - 0.03, 0.0)
+    points[2] = (wx - 0.06, wy - 0.06, 0.0)
+    if 'thumb' in fingers:
+        points[3] = (wx - 0.09, wy - 0.09, 0.0)
+        points[4] = (wx - 0.12, wy - 0.12, 0.0)
+    else:
+        points[3] = (wx - 0.07, wy - 0.10, 0.0)
+        points[4] = (wx - 0.05, wy - 0.06, 0.0)
+    for n, finger in enumerate(('index', 'middle', 'ring', 'pinky')):
+        mcp, pip, dip, tip = _CHAINS[finger]
+        x = wx - 0.03 + n * 0.02
+        points[mcp] = (x, wy - 0.10, 0.0)
+        if finger in fingers:
+            points[pip] = (x, wy - 0.14, 0.0)
+            points[dip] = (x, wy - 0.17, 0.0)
+            points[tip] = (x, wy - 0.20, 0.0)
+        else:
+            points[pip] = (x, wy - 0.13, 0.0)
+            points[dip] = (x, wy - 0.11, 0.0)
+            points[tip] = (x, wy - 0.09, 0.0)
+    return points
+
+
+def write_trace(path, left_hands, right_hands, fps=30.0, start=100.0):
+    """Trace with one left and one right hand per frame (None = hand not visible)"""
+    records = np.zeros(len(left_hands), dtype=TRACE_DTYPE)
+    records['frame_id'] = np.arange(1, len(left_hands) + 1)
+    records['timestamp'] = start + np.arange(len(left_hands)) / fps
+    for index, (left, right) in enumerate(zip(left_hands, right_hands)):
+        for slot, (hand, label) in enumerate(((left, HANDEDNESS_LEFT), (right, HANDEDNESS_RIGHT))):
+            if hand is not None:
+                records[index]['hand_present'][slot] = 1
+                records[index]['handedness'][slot] = label
+                records[index]['hand_score'][slot] = 1.0
+                records[index]['hands'][slot] = hand
+    writer = TraceWriter(path)
+    writer.write_array(records)
+    writer.close()
+    return path
@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+from gesture_model import GestureModel
+from gesture_table import compile_gestures, finger_mask
+from gestures import (CURLED_RATIO, EXTENDED_ANGLE, HandFeatures, are_bottom_fingers_curled, classify_hands,
+                      default_gesture_table, detect_left_hand_gestures, is_finger_extended, is_gun_gesture,
+                      is_thumb_down, left_hand_gesture)
+from landmark_trace import LandmarkListView
+from synthetic import make_hand
+
+# Landmark ids (tip, PIP, MCP) per finger, thumb..pinky
+_JOINTS = ((4, 3, 2), (8, 6, 5), (12, 10, 9), (16, 14, 13), (20, 18, 17))
+
+
+def _bend(points, finger, degrees):
+    """Move a finger's tip so the tip-PIP-MCP angle is the given number of degrees"""
+    tip, pip, mcp = _JOINTS[finger]
+    arm = points[mcp, :2] - points[pip, :2]
+    arm /= np.linalg.norm(arm)
+    theta = np.radians(degrees)
+    rotated = (arm[0] * np.cos(theta) - arm[1] * np.sin(theta), arm[0] * np.sin(theta) + arm[1] * np.cos(theta))
+    points[tip, :2] = points[pip, :2] + 0.04 * np.asarray(rotated)
+
+
+def _reach(points, finger, ratio):
+    """Move a finger's tip along wrist -> MCP to ratio x the MCP's distance from the wrist"""
+    tip, _, mcp = _JOINTS[finger]
+    points[tip, :2] = points[0, :2] + ratio * (points[mcp, :2] - points[0, :2])
+
+
+def _near_threshold_hands():
+    hands = []
+    for delta in (-0.01, 0.01):
+        for finger in range(5):
+            for fingers in ((), ('index',), ('thumb', 'index'), ('thumb', 'index', 'pinky')):
+                points = make_hand(fingers)
+                _bend(points, finger, EXTENDED_ANGLE + delta)
+                hands.append(points)
+        for fingers in ((), ('index',), ('index', 'middle')):
+            for curled in ((2,), (2, 3), (3, 4), (2, 3, 4)):
+                points = make_hand(fingers)
+                for finger in curled:
+                    _reach(points, finger, CURLED_RATIO * (1 + delta / 10))
+                hands.append(points)
+    # Thumb tip level with the IP joint, and just either side of it
+    for dy in (-1e-6, 0.0, 1e-6):
+        points = make_hand(('thumb', 'index'))
+        points[4, 1] = points[3, 1] + dy
+        hands.append(points)
+    return np.array(hands)
+
+
+@pytest.fixture(scope='module')
+def hands():
+    random = np.random.default_rng(0).random((2000, 21, 3))
+    return np.concatenate([random, _near_threshold_hands()])
+
+
+def test_matches_per_hand_predicates(hands):
+    lists = [LandmarkListView(hand) for hand in hands]
+    batch = classify_hands(hands)
+    names = default_gesture_table().names
+    assert batch['gun'].tolist() == [is_gun_gesture(hand) for hand in lists]
+    assert batch['bottom_curled'].tolist() == [are_bottom_fingers_curled(hand) for hand in lists]
+    assert batch['thumb_down'].tolist() == [is_thumb_down(hand) for hand in lists]
+    assert [names[i] for i in batch['left_gesture'].tolist()] == \
+        [detect_left_hand_gestures(hand)[0] for hand in lists]
+
+
+def test_near_threshold_hands_straddle_thresholds():
+    hands = _near_threshold_hands()
+    batch = classify_hands(hands)
+    # The hand-built cases land on both sides of every threshold
+    for name in ('gun', 'bottom_curled', 'thumb_down'):
+        assert 0 < batch[name].sum() < len(hands), name
+    # And agree with the original per-finger angle test
+    lists = [LandmarkListView(hand) for hand in hands]
+    extended = [tuple(is_finger_extended(hand.landmark, *joints) for joints in _JOINTS) for hand in lists]
+    assert batch['left_gesture'].tolist() == [default_gesture_table().ids[finger_mask(flags)] for flags in extended]
+
+
+def test_table(hands):
+    table = compile_gestures({'version': 2, 'left_hand': {
+        'reload': {'fingers': ['index', 'middle'], 'action': 'key_press', 'key': 'r'},
+        'jump': {'fingers': ['index'], 'any': ['thumb'], 'action': 'key_press', 'key': 'space'},
+    }})
+    batch = classify_hands(hands, table=table)
+    expected = [left_hand_gesture(HandFeatures(hand).extended, table=table)[0] for hand in hands]
+    assert [table.names[i] for i in batch['left_gesture'].tolist()] == expected
+    assert {'reload', 'jump', 'unknown'} <= set(expected)
+
+
+def test_model(hands):
+    model = GestureModel.initialize(seed=1)
+    batch = classify_hands(hands, model=model)
+    features = [HandFeatures(hand, model=model) for hand in hands]
+    names = default_gesture_table().names
+    assert batch['gun'].tolist() == [hand.is_gun for hand in features]
+    assert batch['bottom_curled'].tolist() == [hand.bottom_curled for hand in features]
+    assert batch['thumb_down'].tolist() == [hand.thumb_down for hand in features]
+    assert [names[i] for i in batch['left_gesture'].tolist()] == \
+        [left_hand_gesture(hand.extended)[0] for hand in features]
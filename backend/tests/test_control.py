@@ -0,0 +1,22 @@
+from controllers import ControlCore
+from input_sink import RecordingSink
+
+
+def test_set_control_releases_like_toggle():
+    sink = RecordingSink()
+    core = ControlCore(output=sink)
+    core.set_control(False)  # Starts off: nothing happens
+    assert not core.control_enabled
+
+    core.set_control(True)
+    core.wasd_controller.current_keys = {'w'}
+    core.shooting_controller.is_pressed = True
+    core.set_control(True)
+    assert core.control_enabled and sink.events == []
+
+    core.set_control(False)
+    assert not core.control_enabled
+    assert sorted(event[1:] for event in sink.events) == [['keyUp', 'w'], ['mouseUp', 'left']]
+
+    core.toggle_control()
+    assert core.control_enabled
@@ -0,0 +1,28 @@
+import json
+
+import pytest
+
+from gesture_table import compile_gestures, load_gesture_table
+
+JUMP = {'jump': {'fingers': ['index'], 'action': 'key_press', 'key': 'space'}}
+
+
+def test_current_version():
+    table = compile_gestures({'version': 2, 'left_hand': JUMP})
+    assert table.names == ('unknown', 'jump')
+
+
+@pytest.mark.parametrize('version', [None, 1, 3, '2'])
+def test_unsupported_version(version):
+    config = {'left_hand': JUMP}
+    if version is not None:
+        config['version'] = version
+    with pytest.raises(ValueError, match=r"Unsupported gesture config version .* \(supported: 2\)"):
+        compile_gestures(config)
+
+
+def test_load_names_the_file(tmp_path):
+    path = tmp_path / 'gestures.json'
+    path.write_text(json.dumps({'version': 1, 'left_hand': JUMP}))
+    with pytest.raises(ValueError, match=rf"^{path}: Unsupported gesture config version 1"):
+        load_gesture_table(str(path))
@@ -0,0 +1,26 @@
+from landmark_trace import replay_trace
+from synthetic import make_hand, write_trace
+
+FRAMES = 300
+SEGMENT = 4  # Frames per left hand gesture (133ms at 30 fps, longer than the 0.1s debounce)
+
+
+def _events(results):
+    """Input events without their wall-clock times"""
+    return [event[1:] for record in results for event in record.get('events', [])]
+
+
+def test_replay_is_deterministic_and_uses_trace_time(tmp_path):
+    jump, spray = make_hand(('index',), wrist=(0.3, 0.8)), make_hand(('thumb', 'index'), wrist=(0.3, 0.8))
+    fist = make_hand((), wrist=(0.7, 0.8))
+    lefts = [jump if index // SEGMENT % 2 == 0 else spray for index in range(FRAMES)]
+    path = write_trace(str(tmp_path / 'alternating.fgt'), lefts, [fist] * FRAMES)
+
+    first, _ = replay_trace(path)
+    second, _ = replay_trace(path)
+    events = _events(first)
+    assert events == _events(second)
+    # Every gesture change is a press: the debounce runs on trace time, not on replay speed
+    presses = [event for event in events if event[0] == 'press']
+    assert len(presses) == FRAMES // SEGMENT
+    assert presses[:2] == [['press', 'space'], ['press', 't']]
@@ -0,0 +1,30 @@
+import numpy as np
+
+from session_recorder import SessionRecorder, ReplayFrameSource
+
+
+def test_fast_replay_keeps_recorded_timestamps(tmp_path):
+    path = str(tmp_path / 'session')
+    recorder = SessionRecorder(path)
+    timestamps = 50.0 + np.cumsum(np.full(12, 1 / 30) + np.linspace(0, 0.01, 12))
+    for index, timestamp in enumerate(timestamps):
+        recorder.write(np.full((8, 8, 3), index, dtype=np.uint8), float(timestamp), control_enabled=index > 5)
+    recorder.close()
+
+    source = ReplayFrameSource(path, realtime=False, verbose=False)
+    assert source.lossless
+    assert source.start()
+    frames, times, control = [], [], []
+    while True:
+        ok, frame, capture_time = source.read()
+        if not ok:
+            break
+        frames.append(int(frame[0, 0, 0]))
+        times.append(capture_time)
+        control.append(source.last_control_enabled)
+    source.stop()
+
+    assert frames == list(range(12))
+    # Rebased onto this run's clock, spaced exactly as recorded
+    np.testing.assert_allclose(np.diff(times), np.diff(timestamps), atol=1e-9)
+    assert control == [index > 5 for index in range(12)]